@@ -1,7 +1,7 @@
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, HTTPException, Response, status
 
 from app.models.dto import PricingRequest, PricingResponse
-from app.services.experiments_pricing_engine import ExperimentsPricingEngine
+from app.services.experiments_pricing_engine import get_pricing_engine
 
 router = APIRouter(prefix="/pricing", tags=["pricing"])
 
@@ -23,17 +23,12 @@ def quote(req: PricingRequest):
             detail=f"Date range cannot exceed 90 days. Requested range: {date_range} days"
         )
     
-    # Call ExperimentsPricingEngine and convert date objects to ISO format strings
-    engine = ExperimentsPricingEngine()
-    items, model_version = engine.quote(
+    # Call ExperimentsPricingEngine; the PricingResponse JSON is written straight from its columnar result
+    engine = get_pricing_engine()
+    body = engine.quote_json(
         hotel_id=req.hotel_id,
         room_type_code=req.room_type_code,
         start_date=req.from_.isoformat(),
         end_date=req.to.isoformat()
     )
-    
-    # Map to PricingResponse DTO
-    return PricingResponse(
-        items=items,
-        modelVersion=model_version
-    )
\ No newline at end of file
+    return Response(content=body, media_type="application/json")
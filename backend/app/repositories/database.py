@@ -1,22 +1,98 @@
+from __future__ import annotations
+
+import os
+import threading
+from typing import Optional
+
 from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
-from dotenv import load_dotenv
-import os
-
-# Load environment variables
-load_dotenv()
 
-# Get connection string from .env
-DATABASE_URL = os.getenv("DATABASE_URL")
+# The engine is created on first use (or by init_db() in the app lifespan), never at import, so
+# importing a controller does not need DATABASE_URL and pricing-only workers never touch the database.
+# FORESIGHT_DB: "auto" (default) uses the database when DATABASE_URL is set, "on" requires it,
+# "off" runs without one.
 
-engine = create_engine(DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+_LOCK = threading.Lock()
+_engine: Optional[Engine] = None
+_session_factory: Optional[sessionmaker] = None
+
+
+class DatabaseNotConfigured(RuntimeError):
+    pass
+
+
+def _mode() -> str:
+    return os.getenv("FORESIGHT_DB", "auto").strip().lower()
+
+
+def db_enabled() -> bool:
+    mode = _mode()
+    if mode in ("off", "0", "false"):
+        return False
+    if mode in ("on", "1", "true"):
+        return True
+    return bool(os.getenv("DATABASE_URL"))
+
+
+def get_engine() -> Engine:
+    global _engine, _session_factory
+    if _engine is not None:
+        return _engine
+    with _LOCK:
+        if _engine is None:
+            if not db_enabled():
+                raise DatabaseNotConfigured("database disabled (FORESIGHT_DB=off or DATABASE_URL unset)")
+            url = os.getenv("DATABASE_URL")
+            if not url:
+                raise DatabaseNotConfigured("FORESIGHT_DB=on but DATABASE_URL is not set")
+            engine = create_engine(url)
+            _session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+            _engine = engine
+    return _engine
+
+
+def current_engine() -> Optional[Engine]:
+    """
+    The engine if one has been created, without creating it (for metrics).
+    """
+    return _engine
+
+
+def init_db() -> bool:
+    """
+    Lifespan startup: create the engine if the database is enabled. Returns whether it is.
+    Creating the engine does not connect; the pool opens connections on first checkout.
+    """
+    if not db_enabled():
+        return False
+    get_engine()
+    return True
+
+
+def dispose_db() -> None:
+    """
+    Lifespan shutdown: close pooled connections and forget the engine.
+    """
+    global _engine, _session_factory
+    with _LOCK:
+        engine, _engine, _session_factory = _engine, None, None
+    if engine is not None:
+        engine.dispose()
+
+
+def SessionLocal():
+    # kept under its old name: a Session bound to the lazily created engine
+    get_engine()
+    return _session_factory()
+
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+import os
+import sys
+from pathlib import Path
+from typing import List, Optional
+
+import pandas as pd
+
+
+def _feature_store():
+    """
+    The experiments feature store (SQLite under experiments/cache, or FORESIGHT_FEATURE_STORE_DIR).
+    """
+    repo_root = Path(__file__).resolve().parents[3]
+    if str(repo_root) not in sys.path:
+        sys.path.append(str(repo_root))
+    from experiments.pricing_engine.feature_store import get_feature_store  # type: ignore
+    cache_dir = os.getenv("FORESIGHT_FEATURE_STORE_DIR") or str(repo_root / "experiments" / "cache")
+    return get_feature_store(cache_dir)
+
+
+def fetch_features_for_dates(
+    *,
+    hotel_id: int,
+    room_type_code: str,
+    dates: List[str],
+    as_of: Optional[str] = None,
+) -> pd.DataFrame:
+    """
+    One row per requested date from `features_daily`, as of a feature version (or timestamp) when given.
+    Dates the store has never seen come back with only `date` set (feature columns and version None).
+    """
+    store = _feature_store()
+    from experiments.pricing_engine.feature_store import STORE_COLUMNS  # type: ignore
+    rows = store.read_dates(hotel_id, room_type_code, dates, as_of=as_of)
+    records = []
+    for d in dates:
+        row = rows.get(str(d)[:10], {})
+        records.append({"date": str(d)[:10], **{c: row.get(c) for c in STORE_COLUMNS}, "version": row.get("version")})
+    return pd.DataFrame.from_records(records, columns=["date", *STORE_COLUMNS, "version"])
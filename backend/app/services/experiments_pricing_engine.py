@@ -1,10 +1,17 @@
 from __future__ import annotations
 
+import json
+import logging
+import os
 import sys
+import threading
 from pathlib import Path
 from typing import List, Tuple
 
 from app.models.dto import PricingItem as PricingItemDTO
+from app.services.metrics_service import observe_engine_meta
+
+logger = logging.getLogger(__name__)
 
 
 def _import_experiments_engine():
@@ -21,6 +28,21 @@ def _import_experiments_engine():
     return score_dates, repo_root
 
 
+def _feature_store_enabled() -> bool:
+    # FORESIGHT_FEATURE_STORE=on serves daily features from experiments/cache/features.sqlite
+    return os.getenv("FORESIGHT_FEATURE_STORE", "off").strip().lower() in ("on", "1", "true")
+
+
+def _result_cache_enabled() -> bool:
+    # FORESIGHT_RESULT_CACHE=off rescores every request (e.g. load tests of the cold engine path)
+    return os.getenv("FORESIGHT_RESULT_CACHE", "on").strip().lower() not in ("off", "0", "false")
+
+
+def _events_enabled() -> bool:
+    # FORESIGHT_EVENTS=off scores without event signals (e.g. load tests, replay)
+    return os.getenv("FORESIGHT_EVENTS", "store").strip().lower() != "off"
+
+
 class ExperimentsPricingEngine:
     """
     Adapter to call experiments/pricing_engine from the backend.
@@ -33,38 +55,125 @@ class ExperimentsPricingEngine:
         self._default_data_dir = str(self._repo_root / "infra" / "foresight-data")
         self._default_cache_dir = str(self._repo_root / "experiments" / "cache")
 
-    def quote(
+        from experiments.pricing_engine.event_store import get_city_event_store  # type: ignore
+        from experiments.pricing_engine.hotels import load_hotel_configs  # type: ignore
+        # cached per file stamp: one stat per quote, a re-parse only when hotels.json changes
+        self._load_hotels = load_hotel_configs
+        # Shared per-city impacts: read from the event cache, refreshed in the background
+        self._event_store = get_city_event_store(self._default_cache_dir) if _events_enabled() else None
+        self._feature_store = None
+        if _feature_store_enabled():
+            from experiments.pricing_engine.feature_store import get_feature_store  # type: ignore
+            self._feature_store = get_feature_store(self._default_cache_dir)
+
+    def quote_result(
         self,
         *,
         hotel_id: int,
         room_type_code: str,
         start_date: str,
         end_date: str,
-    ) -> Tuple[List[PricingItemDTO], str]:
-        items, _meta = self._score_dates(
+    ):
+        """
+        The engine's columnar PricingResult for the range (read-only; may be shared with the result cache).
+        """
+        hotel = self._load_hotels().get(hotel_id)
+        location = hotel.location if (hotel and self._event_store is not None) else None
+        result, meta = self._score_dates(
             hotel_id=hotel_id,
             room_type_code=room_type_code,
             from_date=start_date,
             to_date=end_date,
-            location=None,  # backend path avoids external calls by default
+            location=location,
             data_dir=self._default_data_dir,
             cache_dir=self._default_cache_dir,
-            disable_perplexity=True,
+            disable_perplexity=True,  # request path never searches; the store refreshes in the background
+            event_store=self._event_store,
             disable_ml=False,
             ml_weight=0.6,
             smoothing_window=3,
+            result_cache=_result_cache_enabled(),
+            feature_store=self._feature_store,
         )
-        dto_items: List[PricingItemDTO] = [
-            PricingItemDTO(
-                date=i.date,
-                room_type_code=i.room_type_code,
-                price_rec=i.price_rec,
-                price_min=i.price_min,
-                price_max=i.price_max,
-                drivers=list(i.drivers),
-            )
-            for i in items
-        ]
+        observe_engine_meta(meta)
+        return result
+
+    def quote(
+        self,
+        *,
+        hotel_id: int,
+        room_type_code: str,
+        start_date: str,
+        end_date: str,
+    ) -> Tuple[List[PricingItemDTO], str]:
+        result = self.quote_result(hotel_id=hotel_id, room_type_code=room_type_code, start_date=start_date, end_date=end_date)
+        dto_items: List[PricingItemDTO] = [PricingItemDTO(**row) for row in result.to_records()]
         return dto_items, self.version
 
+    def quote_json(
+        self,
+        *,
+        hotel_id: int,
+        room_type_code: str,
+        start_date: str,
+        end_date: str,
+    ) -> bytes:
+        """
+        PricingResponse as JSON bytes, serialized straight from the columns (no per-day DTOs).
+        """
+        result = self.quote_result(hotel_id=hotel_id, room_type_code=room_type_code, start_date=start_date, end_date=end_date)
+        return f'{{"items": {result.to_json()}, "modelVersion": {json.dumps(self.version)}}}'.encode("utf-8")
+
+
+_ENGINE: ExperimentsPricingEngine | None = None
+_ENGINE_LOCK = threading.Lock()
+
+
+def get_pricing_engine() -> ExperimentsPricingEngine:
+    """
+    The process-wide adapter (engine import, store handles and settings are set up once).
+    """
+    global _ENGINE
+    if _ENGINE is None:
+        with _ENGINE_LOCK:
+            if _ENGINE is None:
+                _ENGINE = ExperimentsPricingEngine()
+    return _ENGINE
+
+
+def start_background_warmup() -> threading.Thread | None:
+    """
+    Startup hook: if FORESIGHT_WARMUP_DAYS is set, load the data, models, city events (and feature
+    store rows, with FORESIGHT_FEATURE_STORE=on) for that many days ahead on a background thread
+    (FORESIGHT_WARMUP_WORKERS controls parallelism).
+    """
+    days = os.getenv("FORESIGHT_WARMUP_DAYS")
+    if not days:
+        return None
+    _, repo_root = _import_experiments_engine()
+    from experiments.pricing_engine.warmup import warm_up  # type: ignore
+
+    cache_dir = str(repo_root / "experiments" / "cache")
+
+    def _run() -> None:
+        try:
+            feature_store = None
+            if _feature_store_enabled():
+                # the same process-wide store quote_result scores with
+                from experiments.pricing_engine.feature_store import get_feature_store  # type: ignore
+                feature_store = get_feature_store(cache_dir)
+            summary = warm_up(
+                data_dir=str(repo_root / "infra" / "foresight-data"),
+                cache_dir=cache_dir,
+                days=int(days),
+                workers=int(os.getenv("FORESIGHT_WARMUP_WORKERS", "4")),
+                feature_store=feature_store,
+                progress=logger.info,
+            )
+            logger.info("Warm-up finished: %s/%s jobs, timings=%s", summary["succeeded"], summary["jobs"], summary["timings"])
+        except Exception as e:
+            logger.warning("Warm-up failed: %s", e)
 
+    t = threading.Thread(target=_run, name="pricing-warmup", daemon=True)
+    t.start()
+    return t
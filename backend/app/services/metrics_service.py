@@ -0,0 +1,199 @@
+from __future__ import annotations
+
+import bisect
+import sys
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+# In-process metrics in the Prometheus text format (served by GET /metrics).
+# Counters and histograms are plain dicts, each behind its own lock; cache, model and DB pool figures are
+# read from their owners at scrape time, so the request path only pays for a few additions.
+# Each worker process has its own registry: scrape every worker, or run one worker per port.
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STAGE_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+
+_ENGINE_MODULE = "experiments.pricing_engine.engine"
+
+
+class Histogram:
+    """
+    Cumulative-bucket histogram keyed by a tuple of label values.
+    """
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str], buckets: Sequence[float]):
+        self.name = name
+        self.help_text = help_text
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._series: Dict[Tuple[str, ...], List[float]] = {}  # counts per bucket (+Inf last), then sum
+
+    def observe(self, label_values: Tuple[str, ...], value: float) -> None:
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [0.0] * (len(self.buckets) + 2)
+            series[i] += 1
+            series[-1] += value
+
+    def render(self) -> List[str]:
+        out = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            snapshot = {k: list(v) for k, v in self._series.items()}
+        for label_values, series in sorted(snapshot.items()):
+            base = _labels(zip(self.labels, label_values))
+            cumulative = 0.0
+            for le, n in zip([*map(_num, self.buckets), "+Inf"], series[:-1]):
+                cumulative += n
+                out.append(f"{self.name}_bucket{_labels([*zip(self.labels, label_values), ('le', le)])} {_num(cumulative)}")
+            out.append(f"{self.name}_sum{base} {_num(series[-1])}")
+            out.append(f"{self.name}_count{base} {_num(cumulative)}")
+        return out
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str, labels: Sequence[str]):
+        self.name = name
+        self.help_text = help_text
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, label_values: Tuple[str, ...], amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0.0) + amount
+
+    def render(self) -> List[str]:
+        out = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            snapshot = dict(self._values)
+        for label_values, v in sorted(snapshot.items()):
+            out.append(f"{self.name}{_labels(zip(self.labels, label_values))} {_num(v)}")
+        return out
+
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template.",
+    ("method", "route", "status"), LATENCY_BUCKETS,
+)
+ENGINE_STAGE = Histogram(
+    "pricing_engine_stage_seconds", "Pricing engine time per score_dates stage.", ("stage",), STAGE_BUCKETS,
+)
+ENGINE_CALLS = Counter(
+    "pricing_engine_calls_total", "score_dates calls, by whether the result cache served them.", ("result_cache_hit",),
+)
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware timing every HTTP request. Requests are labelled with the matched route
+    template (e.g. /api/pricing/quote), never the raw path, so label cardinality stays bounded.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        start = time.perf_counter()
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            REQUEST_LATENCY.observe((scope.get("method", ""), _route_template(scope), str(status["code"])), time.perf_counter() - start)
+
+
+def _route_template(scope) -> str:
+    # Newer FastAPI keeps included routes router-relative and records the full path separately
+    ctx = (scope.get("fastapi") or {}).get("effective_route_context")
+    path = getattr(ctx, "path", None) or getattr(scope.get("route"), "path", None)
+    return path or "unmatched"
+
+
+def observe_engine_meta(meta: Dict) -> None:
+    """
+    Record one score_dates call from its meta (stage timings are in milliseconds).
+    """
+    for stage, ms in (meta.get("timings") or {}).items():
+        ENGINE_STAGE.observe((stage,), ms / 1000.0)
+    ENGINE_CALLS.inc(("true" if meta.get("result_cache_hit") else "false",))
+
+
+def _samples(name: str, help_text: str, samples: Iterable[Tuple[Dict[str, str], Optional[float]]], kind: str = "gauge") -> List[str]:
+    out = [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+    for labels, v in samples:
+        if v is not None:
+            out.append(f"{name}{_labels(labels.items())} {_num(v)}")
+    return out
+
+
+def _engine_lines() -> List[str]:
+    # Only report the engine once a request has imported it; a scrape should not load it
+    engine = sys.modules.get(_ENGINE_MODULE)
+    if engine is None:
+        return []
+    stats = engine.cache_stats()
+    models = engine.model_stats()
+    out: List[str] = []
+    out += _samples("pricing_cache_hits_total", "Cache hits.", [({"cache": s["name"]}, s["hits"]) for s in stats], "counter")
+    out += _samples("pricing_cache_misses_total", "Cache misses.", [({"cache": s["name"]}, s["misses"]) for s in stats], "counter")
+    out += _samples("pricing_cache_hit_ratio", "Hits / (hits + misses) since process start.", [({"cache": s["name"]}, s["hit_ratio"]) for s in stats])
+    out += _samples("pricing_cache_entries", "Entries held.", [({"cache": s["name"]}, s["size"]) for s in stats])
+    out += _samples("pricing_cache_bytes", "Approximate bytes held (caches with a size budget).", [({"cache": s["name"]}, s["bytes"]) for s in stats])
+    out += _samples("pricing_cache_evictions_total", "Entries evicted.", [({"cache": s["name"]}, s["evictions"]) for s in stats], "counter")
+    out += _samples("pricing_model_loads_total", "Models loaded from disk (first use, promotion/rollback or reload after eviction).", [({}, models["loads"])], "counter")
+    out += _samples(
+        "pricing_model_info", "Model version last loaded from each model directory.",
+        [({"model_dir": d, "version": str(v)}, 1) for d, v in sorted(models["versions"].items())],
+    )
+    return out
+
+
+def _db_pool_lines() -> List[str]:
+    # The engine is created lazily (and never on pricing-only workers); a scrape must not create it
+    database = sys.modules.get("app.repositories.database")
+    engine = database.current_engine() if database is not None else None
+    pool = getattr(engine, "pool", None)
+    if pool is None:
+        return []
+    # QueuePool has all four; SQLite's pools only some of them
+    samples = []
+    for state, method in (("size", "size"), ("checked_out", "checkedout"), ("checked_in", "checkedin"), ("overflow", "overflow")):
+        fn = getattr(pool, method, None)
+        if fn is not None:
+            samples.append(({"state": state}, float(fn())))
+    return _samples("db_pool_connections", "SQLAlchemy connection pool state.", samples)
+
+
+def render() -> str:
+    lines: List[str] = []
+    lines += REQUEST_LATENCY.render()
+    lines += ENGINE_STAGE.render()
+    lines += ENGINE_CALLS.render()
+    lines += _engine_lines()
+    lines += _db_pool_lines()
+    return "\n".join(lines) + "\n"
+
+
+def _labels(pairs: Iterable[Tuple[str, str]]) -> str:
+    body = ",".join(f'{k}="{_escape(str(v))}"' for k, v in pairs)
+    return "{" + body + "}" if body else ""
+
+
+def _escape(v: str) -> str:
+    return v.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _num(v: float) -> str:
+    return repr(float(v)) if not float(v).is_integer() else str(int(v))
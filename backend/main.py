@@ -1,18 +1,40 @@
+from contextlib import asynccontextmanager
+from dotenv import load_dotenv
 from fastapi import FastAPI, Depends, APIRouter
 from sqlalchemy.orm import Session
 from sqlalchemy import text
-from app.repositories.database import get_db
 from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
 
+# .env first: DATABASE_URL, FORESIGHT_* and API keys are read from the environment later on
+load_dotenv()
+
+from app.repositories.database import get_db, db_enabled, init_db, dispose_db
+
 from app.controllers.user_controller import router as user_router
 from app.controllers.pricing_controller import router as pricing_router  
+from app.controllers.metrics_controller import router as metrics_router
+from app.services.experiments_pricing_engine import start_background_warmup
+from app.services.metrics_service import MetricsMiddleware
+
+# Startup/shutdown: the database engine is created here, not at import, and only when enabled
+# (FORESIGHT_DB=off or no DATABASE_URL gives a pricing-only worker that never touches the database).
+# Pricing caches are optionally warmed (FORESIGHT_WARMUP_DAYS) without delaying startup.
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    init_db()
+    start_background_warmup()
+    try:
+        yield
+    finally:
+        dispose_db()
 
 # Initialize FastAPI app
 app = FastAPI(
     title="FastAPI Backend",
     description="A simple FastAPI backend",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
 )
 
 # Add CORS middleware
@@ -24,6 +46,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Per-route latency histograms for GET /metrics
+app.add_middleware(MetricsMiddleware)
+
 # Create new APIRouter with prefix /api
 api = APIRouter(prefix="/api")
 
@@ -32,12 +57,10 @@ api = APIRouter(prefix="/api")
 async def hello():
     return {"message": "Hello, World!", "status": "success"}
 
-@app.get("/")
 def read_root(db: Session = Depends(get_db)):
     # Your database queries here
     return {"message": "Connected to Neon!"}
 
-@api.get("/db-info")
 def get_db_info(db: Session = Depends(get_db)):
     try:
         # Get database name
@@ -51,9 +74,14 @@ def get_db_info(db: Session = Depends(get_db)):
     except Exception as e:
         return {"status": "error", "message": str(e)}
 
-api.include_router(user_router)
+# Database-backed routes only exist when the database is enabled
+if db_enabled():
+    app.get("/")(read_root)
+    api.get("/db-info")(get_db_info)
+    api.include_router(user_router)
 api.include_router(pricing_router)
 app.include_router(api)
+app.include_router(metrics_router)
 
 if __name__ == "__main__":
     uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
@@ -0,0 +1,270 @@
+"""
+End-to-end and per-stage benchmark of the pricing engine on deterministic synthetic PMS data.
+
+  python experiments/benchmarks/bench_engine.py --json bench.json
+  python experiments/benchmarks/bench_engine.py --days 1460 --hotels 4 --room-types 3 --baseline bench.json
+
+Stages (median/p95/min wall ms over --repeat runs, cycling through the generated properties):
+  data_load       parse a property's data files (caches cleared)
+  events_replay   event impacts from a recorded search, external calls disabled
+  heuristics      compute_price_for_date over the scored range
+  model_load      resolve and load the model (caches cleared)
+  ml_predict      feature rows + batched point/interval predict
+  smoothing       rolling-median smoothing of the scored items
+  score_cold      score_dates with every process cache cleared
+  score_warm      score_dates with data/model caches warm
+  score_cached    score_dates served from the result cache
+  training_matrix load_training_matrix for one property
+  train           MLPriceModel.train_from_data_dir for one property (--train-repeat runs)
+
+Regression checks: --baseline compares medians with a previous report (fail above +--tolerance
+and more than --min-delta-ms slower),
+and thresholds.json holds absolute budgets for the default parameters. Exits 1 on any regression.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Dict, List
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from pricing_engine import engine  # noqa: E402
+from pricing_engine.heuristics import compute_price_for_date  # noqa: E402
+from pricing_engine.model import MLPriceModel, build_features_for_date, load_training_matrix  # noqa: E402
+from pricing_engine.perplexity_adapter import fetch_event_impacts_detailed, record_event_sources  # noqa: E402
+from pricing_engine.result import DriverTable  # noqa: E402
+from pricing_engine.utils import daterange, to_iso  # noqa: E402
+import synthetic_pms  # noqa: E402
+
+THRESHOLDS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "thresholds.json")
+LOCATION = "Benchville, Nowhere"
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Benchmark the pricing engine on synthetic data.")
+    p.add_argument("--days", type=int, default=730, help="History length per property")
+    p.add_argument("--files", type=int, default=2, help="Data files per property")
+    p.add_argument("--rows-per-day", type=int, default=1)
+    p.add_argument("--hotels", type=int, default=2)
+    p.add_argument("--room-types", type=int, default=2)
+    p.add_argument("--horizon", type=int, default=90, help="Days scored per call")
+    p.add_argument("--trainer", choices=["gbrt", "hist"], default="gbrt")
+    p.add_argument("--repeat", type=int, default=9)
+    p.add_argument("--train-repeat", type=int, default=1)
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--work-dir", type=str, default=None, help="Where to generate data/caches (default: temp dir, removed)")
+    p.add_argument("--json", dest="json_out", type=str, default=None, help="Write the report here")
+    p.add_argument("--baseline", type=str, default=None, help="Previous report to compare medians against")
+    p.add_argument("--tolerance", type=float, default=0.25, help="Allowed relative slowdown vs --baseline")
+    p.add_argument("--min-delta-ms", type=float, default=1.0, help="Ignore slowdowns smaller than this (timer noise)")
+    p.add_argument("--thresholds", type=str, default=THRESHOLDS_FILE, help="Absolute budgets (used when parameters match)")
+    p.add_argument("--no-fail", action="store_true", help="Report regressions but exit 0")
+    return p.parse_args()
+
+
+def _timed(fn: Callable[[], Any], runs: int) -> Dict[str, Any]:
+    samples: List[float] = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000.0)
+    samples.sort()
+    return {
+        "runs": runs,
+        "median_ms": round(statistics.median(samples), 3),
+        "p95_ms": round(samples[min(len(samples) - 1, int(round(0.95 * (len(samples) - 1))))], 3),
+        "min_ms": round(samples[0], 3),
+    }
+
+
+def _clear_caches() -> None:
+    engine.DATA_CACHE.clear()
+    engine.MODEL_CACHE.clear()
+    engine.RESULT_CACHE.clear()
+
+
+def run_suite(args: argparse.Namespace, work_dir: str) -> Dict[str, Any]:
+    data_root = os.path.join(work_dir, "data")
+    cache_dir = os.path.join(work_dir, "cache")
+    t0 = time.perf_counter()
+    manifest = synthetic_pms.generate(
+        data_root, days=args.days, files=args.files, rows_per_day=args.rows_per_day,
+        hotels=args.hotels, room_types_per_hotel=args.room_types, seed=args.seed,
+    )
+    generate_seconds = time.perf_counter() - t0
+    props = manifest["properties"]
+    first_day = date(2022, 1, 1)
+    end = first_day + timedelta(days=args.days - 1)
+    start = max(first_day, end - timedelta(days=args.horizon - 1))
+    days = list(daterange(start, end))
+    record_event_sources(
+        location=LOCATION, start=start, end=end, cache_dir=cache_dir,
+        sources=synthetic_pms.event_sources(start, end, seed=args.seed),
+    )
+
+    stages: Dict[str, Dict[str, Any]] = {}
+    cursor = {"i": 0}
+
+    def prop() -> Dict[str, Any]:
+        p = props[cursor["i"] % len(props)]
+        cursor["i"] += 1
+        return p
+
+    def score(p: Dict[str, Any], **kw: Any):
+        return engine.score_dates(
+            hotel_id=p["hotel_id"], room_type_code=p["room_type_code"],
+            from_date=to_iso(start), to_date=to_iso(end), location=LOCATION,
+            data_dir=p["data_dir"], cache_dir=cache_dir, disable_perplexity=True, **kw,
+        )
+
+    # Training first, so the ML stages have a model (one global model, as in a fresh deployment)
+    train_prop = props[0]
+    stages["training_matrix"] = _timed(lambda: load_training_matrix(train_prop["data_dir"]), args.repeat)
+    stages["train"] = _timed(
+        lambda: MLPriceModel.train_from_data_dir(train_prop["data_dir"], cache_dir, trainer=args.trainer),
+        args.train_repeat,
+    )
+
+    def data_load() -> None:
+        engine.DATA_CACHE.clear()
+        engine.load_data_snapshot(prop()["data_dir"])
+    stages["data_load"] = _timed(data_load, args.repeat)
+
+    stages["events_replay"] = _timed(lambda: fetch_event_impacts_detailed(
+        location=LOCATION, start=start, end=end, cache_dir=cache_dir, disable_external=True,
+    ), args.repeat)
+
+    p0 = props[0]
+    baseline, metrics, _ = engine.load_data_snapshot(p0["data_dir"])
+    impacts = fetch_event_impacts_detailed(location=LOCATION, start=start, end=end, cache_dir=cache_dir, disable_external=True).daily
+
+    def heuristics():
+        out = []
+        for d in days:
+            iso = to_iso(d)
+            m = metrics.get(iso, {})
+            out.append(compute_price_for_date(
+                date_str=iso, room_type_code=p0["room_type_code"], published_rate=baseline.get(iso),
+                occupancy_pct=m.get("occupancy_pct"), pickup_24h=m.get("pickup_24h"), event_impact=impacts.get(iso, 0.0),
+            ))
+        return out
+    stages["heuristics"] = _timed(heuristics, args.repeat)
+    heur = heuristics()
+
+    def model_load() -> None:
+        engine.MODEL_CACHE.clear()
+        p = prop()
+        engine.load_model_for(cache_dir, p["hotel_id"], p["room_type_code"])
+    stages["model_load"] = _timed(model_load, args.repeat)
+
+    model, _, _ = engine.load_model_for(cache_dir, p0["hotel_id"], p0["room_type_code"])
+
+    def ml_predict() -> None:
+        rows = []
+        for d, h in zip(days, heur):
+            iso = to_iso(d)
+            m = metrics.get(iso, {})
+            rows.append(build_features_for_date(
+                d=d, published_rate=baseline.get(iso) or h.price_rec, occupancy_pct=m.get("occupancy_pct"),
+                pickup_24h=m.get("pickup_24h"), event_impact=impacts.get(iso, 0.0),
+            ))
+        X = np.array([[r.get(k, 0.0) for k in model.feature_order] for r in rows], dtype=float)
+        model.predict_batch(X)
+        model.predict_interval_batch(X)
+    if model is not None:
+        stages["ml_predict"] = _timed(ml_predict, args.repeat)
+
+    items, _ = score(p0, smoothing_window=1)
+    band = [20.0] * len(items)
+
+    def smoothing() -> None:
+        engine._smooth_prices(
+            items.price_rec.tolist(), items.price_min.tolist(), items.price_max.tolist(),
+            items.driver_bits.tolist(), DriverTable().bit("Smoothing"), 3, band, band,
+        )
+    stages["smoothing"] = _timed(smoothing, args.repeat)
+
+    def score_cold() -> None:
+        _clear_caches()
+        score(prop())
+    stages["score_cold"] = _timed(score_cold, args.repeat)
+    for p in props:
+        score(p)
+        score(p, result_cache=True)
+    stages["score_warm"] = _timed(lambda: score(prop()), args.repeat)
+    stages["score_cached"] = _timed(lambda: score(prop(), result_cache=True), args.repeat)
+
+    return {
+        "generated_at": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "params": {
+            "days": args.days, "files": args.files, "rows_per_day": args.rows_per_day, "hotels": args.hotels,
+            "room_types": args.room_types, "horizon": args.horizon, "trainer": args.trainer, "seed": args.seed,
+        },
+        "dataset": {"properties": len(props), "rows": manifest["rows"], "bytes": manifest["bytes"], "generate_seconds": round(generate_seconds, 3)},
+        "stages": stages,
+    }
+
+
+def check_regressions(report: Dict[str, Any], args: argparse.Namespace) -> List[str]:
+    problems: List[str] = []
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            base = json.load(f)
+        if base.get("params") != report["params"]:
+            problems.append(f"baseline parameters differ: {base.get('params')} vs {report['params']}")
+        for name, cur in report["stages"].items():
+            prev = base.get("stages", {}).get(name)
+            if prev and cur["median_ms"] > prev["median_ms"] * (1.0 + args.tolerance) \
+                    and cur["median_ms"] - prev["median_ms"] > args.min_delta_ms:
+                problems.append(f"{name}: median {cur['median_ms']:.2f} ms vs baseline {prev['median_ms']:.2f} ms (+{args.tolerance:.0%} allowed)")
+    if args.thresholds and os.path.exists(args.thresholds):
+        with open(args.thresholds, "r", encoding="utf-8") as f:
+            budget = json.load(f)
+        if budget.get("params") == report["params"]:
+            for name, limit in budget.get("max_median_ms", {}).items():
+                cur = report["stages"].get(name)
+                if cur and cur["median_ms"] > float(limit):
+                    problems.append(f"{name}: median {cur['median_ms']:.2f} ms exceeds budget {float(limit):.2f} ms")
+    return problems
+
+
+def main() -> None:
+    args = parse_args()
+    work_dir = args.work_dir or tempfile.mkdtemp(prefix="pricing-bench-")
+    try:
+        report = run_suite(args, work_dir)
+    finally:
+        if args.work_dir is None:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    report["regressions"] = check_regressions(report, args)
+    ds = report["dataset"]
+    print(f"[bench] {ds['properties']} properties, {ds['rows']} rows, horizon {args.horizon} days, repeat {args.repeat}")
+    for name, st in report["stages"].items():
+        print(f"  {name:<16} median={st['median_ms']:>9.2f} ms  p95={st['p95_ms']:>9.2f} ms  min={st['min_ms']:>9.2f} ms")
+    for msg in report["regressions"]:
+        print(f"[bench] REGRESSION {msg}")
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    if report["regressions"] and not args.no_fail:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""
+Import-time benchmark with budgets: how long a fresh interpreter takes to import each entry point,
+and which heavy packages that import drags in.
+
+  python experiments/benchmarks/bench_imports.py
+  python experiments/benchmarks/bench_imports.py --repeat 9 --json imports.json
+
+Each target is imported --repeat times in a new `python -X importtime` process; the reported time
+is the median cumulative import time of the target module (interpreter start-up excluded).
+import_budgets.json holds, per target, the maximum median ms and the packages that must not be
+loaded by the import alone (pandas, sklearn, ...: those belong to the code paths that need them).
+Exits 1 when a budget is exceeded or a forbidden package is imported.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Any, Dict, List, Tuple
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.abspath(os.path.join(HERE, "..", ".."))
+BUDGETS_FILE = os.path.join(HERE, "import_budgets.json")
+
+# target -> (working directory, module); the working directory is put first on sys.path
+TARGETS: Dict[str, Dict[str, str]] = {
+    "engine": {"cwd": os.path.join(REPO_ROOT, "experiments"), "module": "pricing_engine.engine"},
+    "cli": {"cwd": os.path.join(REPO_ROOT, "experiments"), "module": "run_pricing_engine"},
+    "warmup": {"cwd": os.path.join(REPO_ROOT, "experiments"), "module": "pricing_engine.warmup"},
+    "backend": {"cwd": os.path.join(REPO_ROOT, "backend"), "module": "main"},
+}
+
+_PROBE = """
+import json, sys, time
+t0 = time.perf_counter()
+import {module}
+wall = time.perf_counter() - t0
+print("__PROBE__" + json.dumps({{"wall_ms": wall * 1000.0, "modules": sorted({{m.split('.')[0] for m in sys.modules}})}}))
+"""
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Measure cold import times of the pricing entry points.")
+    p.add_argument("--targets", type=str, default=",".join(TARGETS), help="Comma-separated subset of " + ", ".join(TARGETS))
+    p.add_argument("--repeat", type=int, default=5)
+    p.add_argument("--top", type=int, default=5, help="Show the slowest N imported packages per target")
+    p.add_argument("--budgets", type=str, default=BUDGETS_FILE)
+    p.add_argument("--json", dest="json_out", type=str, default=None, help="Write the report here")
+    p.add_argument("--no-fail", action="store_true", help="Report budget breaches but exit 0")
+    return p.parse_args()
+
+
+def _parse_importtime(stderr: str, module: str) -> Tuple[int, Dict[str, int]]:
+    """
+    From `-X importtime` output: (cumulative us of `module`, {package: cumulative us} for the
+    packages imported underneath it). Nested imports are indented and printed before their parent,
+    so the target's subtree is the indented block right above its own line.
+    """
+    rows: List[Tuple[int, str, int]] = []  # (depth, name, cumulative us)
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[1].strip().isdigit():
+            continue
+        name = parts[2].rstrip()
+        rows.append(((len(name) - len(name.lstrip())) // 2, name.strip(), int(parts[1])))
+    for i in range(len(rows) - 1, -1, -1):
+        depth, name, total = rows[i]
+        if name != module:
+            continue
+        packages: Dict[str, int] = {}
+        j = i - 1
+        while j >= 0 and rows[j][0] > depth:
+            sub = rows[j][1]
+            if "." not in sub:
+                packages[sub] = max(packages.get(sub, 0), rows[j][2])
+            j -= 1
+        return total, packages
+    return 0, {}
+
+
+def measure(target: str, repeat: int, env: Dict[str, str]) -> Dict[str, Any]:
+    spec = TARGETS[target]
+    samples: List[float] = []
+    walls: List[float] = []
+    modules: List[str] = []
+    heaviest: Dict[str, int] = {}
+    for _ in range(repeat):
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", _PROBE.format(module=spec["module"])],
+            cwd=spec["cwd"], env=env, capture_output=True, text=True,
+        )
+        probe = [line for line in proc.stdout.splitlines() if line.startswith("__PROBE__")]
+        if proc.returncode != 0 or not probe:
+            raise SystemExit(f"[imports] importing {spec['module']} failed:\n{proc.stderr[-2000:]}")
+        total, packages = _parse_importtime(proc.stderr, spec["module"])
+        samples.append(total / 1000.0)
+        info = json.loads(probe[0][len("__PROBE__"):])
+        walls.append(info["wall_ms"])
+        modules = info["modules"]
+        for name, us in packages.items():
+            heaviest[name] = max(heaviest.get(name, 0), us)
+    return {
+        "module": spec["module"],
+        "runs": repeat,
+        "median_ms": round(statistics.median(samples), 3),
+        "min_ms": round(min(samples), 3),
+        "wall_median_ms": round(statistics.median(walls), 3),
+        "heaviest": [{"package": k, "cumulative_ms": round(v / 1000.0, 3)} for k, v in sorted(heaviest.items(), key=lambda kv: -kv[1])],
+        "loaded_packages": modules,
+    }
+
+
+def check_budgets(report: Dict[str, Any], budgets_path: str) -> List[str]:
+    if not budgets_path or not os.path.exists(budgets_path):
+        return []
+    with open(budgets_path, "r", encoding="utf-8") as f:
+        budgets = json.load(f).get("targets", {})
+    problems: List[str] = []
+    for target, res in report["targets"].items():
+        b = budgets.get(target)
+        if not b:
+            continue
+        if "max_median_ms" in b and res["median_ms"] > float(b["max_median_ms"]):
+            problems.append(f"{target}: import {res['median_ms']:.1f} ms exceeds budget {float(b['max_median_ms']):.1f} ms")
+        loaded = set(res["loaded_packages"])
+        for pkg in b.get("forbidden", []):
+            if pkg in loaded:
+                problems.append(f"{target}: importing {res['module']} loads {pkg}")
+    return problems
+
+
+def main() -> None:
+    args = parse_args()
+    wanted = [t.strip() for t in args.targets.split(",") if t.strip()]
+    unknown = [t for t in wanted if t not in TARGETS]
+    if unknown:
+        raise SystemExit(f"unknown targets {unknown}; expected some of {sorted(TARGETS)}")
+    env = dict(os.environ)
+
+    report: Dict[str, Any] = {"python": sys.version.split()[0], "targets": {}}
+    for t in wanted:
+        report["targets"][t] = measure(t, max(1, args.repeat), env)
+    report["regressions"] = check_budgets(report, args.budgets)
+
+    print(f"[imports] median of {args.repeat} cold imports")
+    for t, res in report["targets"].items():
+        heavy = ", ".join(f"{h['package']} {h['cumulative_ms']:.0f}" for h in res["heaviest"][: args.top])
+        print(f"  {t:<8} {res['module']:<24} {res['median_ms']:>8.1f} ms  (wall {res['wall_median_ms']:.1f} ms)  heaviest: {heavy}")
+    for msg in report["regressions"]:
+        print(f"[imports] REGRESSION {msg}")
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    if report["regressions"] and not args.no_fail:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Compare inference latency across batch sizes and in-memory size of the sklearn pipeline against
+the compiled tree evaluator, for the active model in --cache-dir. The largest batch where the compiled
+trees still win is the crossover that model.COMPILED_MAX_BATCH encodes per trainer.
+
+  python experiments/benchmarks/bench_inference.py --cache-dir experiments/cache
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import pickle
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from pricing_engine.compiled import compile_pipeline, max_abs_error  # noqa: E402
+from pricing_engine.model import COMPILED_MAX_BATCH, COMPILED_MAX_BATCH_DEFAULT, FEATURE_ORDER, MLPriceModel  # noqa: E402
+
+
+def _per_call(fn, X: np.ndarray, repeat: int) -> float:
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        fn(X)
+    return (time.perf_counter() - t0) / repeat
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description="Benchmark sklearn vs compiled tree inference.")
+    p.add_argument("--cache-dir", type=str, default=os.path.abspath(os.path.join(os.getcwd(), "experiments/cache")))
+    p.add_argument("--repeat", type=int, default=500)
+    args = p.parse_args()
+
+    model = MLPriceModel.load(args.cache_dir, mmap=False)
+    if model is None or model.pipeline is None:
+        print("[bench] no model found; train one with run_pricing_engine.py --train-model")
+        return
+    compiled = model.compiled or compile_pipeline(model.pipeline)
+
+    rng = np.random.default_rng(0)
+    X = np.column_stack([
+        rng.integers(0, 7, 365), rng.integers(1, 13, 365), rng.integers(0, 2, 365),
+        rng.uniform(60, 300, 365), rng.uniform(0, 1, 365), rng.uniform(0, 20, 365),
+        rng.uniform(0, 0.9, 365), rng.choice([0.0, 5.0, 10.0, 15.0], 365),
+    ]).astype(float)
+    assert X.shape[1] == len(FEATURE_ORDER)
+
+    print(f"[bench] model {model.version}  max |compiled - sklearn| = {max_abs_error(compiled, model.pipeline, X):.2e}")
+    crossover, winning = 0, True
+    for n in (1, 16, 32, 64, 128, 192, 256, 365):
+        rows = X[:n]
+        a = _per_call(model.pipeline.predict, rows, args.repeat)
+        b = _per_call(compiled.predict, rows, args.repeat)
+        winning = winning and b < a
+        crossover = n if winning else crossover
+        print(f"[bench] {n:>4} rows  sklearn {a * 1e6:8.0f}us   compiled {b * 1e6:8.0f}us   x{a / b:.1f}")
+    trainer = model.meta.get("trainer", "")
+    print(f"[bench] compiled faster up to ~{crossover} rows; COMPILED_MAX_BATCH[{trainer or '?'}] = "
+          f"{COMPILED_MAX_BATCH.get(trainer, COMPILED_MAX_BATCH_DEFAULT)}")
+    print(f"[bench] size: pipeline pickle {len(pickle.dumps(model.pipeline)) / 1024:.0f} KiB, "
+          f"compiled arrays {compiled.nbytes / 1024:.0f} KiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,342 @@
+"""
+Load test for the pricing API: starts the backend (main:app under uvicorn) as a pricing-only
+worker (FORESIGHT_DB=off, no database), with event lookups off (location=None), and drives
+POST /api/pricing/quote.
+
+  python experiments/benchmarks/load_test.py --concurrency 8 --duration 20
+  python experiments/benchmarks/load_test.py --sweep 1,2,4,8,16,32 --workers 2 --json sweep.json
+  python experiments/benchmarks/load_test.py --url http://127.0.0.1:8000 --concurrency 16   # existing server
+
+Requests cycle deterministically through the hotels/room types in hotels.json, a mix of range
+lengths (--ranges days:weight,...) and --distinct-starts start dates, so the result-cache hit rate
+is controlled by --distinct-starts (or disabled with --no-result-cache). Each level reports
+throughput and p50/p95/p99 latency overall and per range length; --sweep runs several
+concurrency levels and reports where throughput stops growing (gain below --saturation-gain).
+Before the first level the server is primed with one blocking quote, so cold start (data and model
+loads) doesn't land in a measured window. Requests still in flight when a window closes are
+reported as `in_flight`; a level with no completed requests is flagged invalid and left out of the
+saturation search.
+
+The client is a thread per connection with HTTP keep-alive (stdlib only); at high concurrency
+run it on a separate machine from the server, or it competes with uvicorn for CPU.
+"""
+from __future__ import annotations
+
+import argparse
+import http.client
+import json
+import os
+import platform
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+BACKEND_DIR = os.path.join(REPO_ROOT, "backend")
+HOTELS_FILE = os.path.join(REPO_ROOT, "experiments", "hotels.json")
+QUOTE_PATH = "/api/pricing/quote"
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Load-test POST /api/pricing/quote.")
+    p.add_argument("--url", type=str, default=None, help="Target an already running server instead of starting one")
+    p.add_argument("--port", type=int, default=0, help="Port for the started server (default: a free one)")
+    p.add_argument("--workers", type=int, default=1, help="uvicorn worker processes for the started server")
+    p.add_argument("--database-url", type=str, default=None, help="DATABASE_URL for the started server (default: none, pricing-only)")
+    p.add_argument("--events", choices=["off", "store"], default="off", help="off: location=None; store: replay cached events")
+    p.add_argument("--no-result-cache", action="store_true", help="Start the server with the engine result cache off")
+    p.add_argument("--concurrency", type=int, default=8)
+    p.add_argument("--sweep", type=str, default=None, help="Comma-separated concurrency levels, e.g. 1,2,4,8,16")
+    p.add_argument("--duration", type=float, default=15.0, help="Measured seconds per level")
+    p.add_argument("--warmup", type=float, default=3.0, help="Unmeasured seconds before each level")
+    p.add_argument("--ranges", type=str, default="7:0.5,30:0.3,90:0.2", help="Range lengths in days with weights")
+    p.add_argument("--start", type=str, default=None, help="First start date (default: today)")
+    p.add_argument("--distinct-starts", type=int, default=60, help="Start dates drawn from this many consecutive days")
+    p.add_argument("--timeout", type=float, default=30.0, help="Per-request timeout in seconds")
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--saturation-gain", type=float, default=0.10, help="Sweep: saturated once throughput grows less than this")
+    p.add_argument("--json", dest="json_out", type=str, default=None, help="Write the report here")
+    return p.parse_args()
+
+
+def _parse_ranges(spec: str) -> List[Tuple[int, float]]:
+    out = []
+    for part in spec.split(","):
+        days, _, weight = part.partition(":")
+        n = int(days)
+        if not 1 <= n <= 91:
+            raise SystemExit(f"range length {n} outside 1..91 days (the API rejects longer ranges)")
+        out.append((n, float(weight or 1.0)))
+    return out
+
+
+def _targets() -> List[Tuple[int, str]]:
+    with open(HOTELS_FILE, "r", encoding="utf-8") as f:
+        hotels = json.load(f)
+    return [(int(h["hotel_id"]), room) for h in hotels for room in h.get("room_types", [])] or [(1, "DLX-QUEEN")]
+
+
+def build_requests(args: argparse.Namespace, n: int = 4096) -> List[Tuple[int, bytes]]:
+    """
+    A fixed, seeded request mix: (range length, JSON body) pairs cycled through by the clients.
+    """
+    rng = random.Random(args.seed)
+    ranges = _parse_ranges(args.ranges)
+    lengths = [d for d, _ in ranges]
+    weights = [w for _, w in ranges]
+    targets = _targets()
+    first = date.fromisoformat(args.start) if args.start else date.today()
+    out = []
+    for _ in range(n):
+        days = rng.choices(lengths, weights)[0]
+        hotel_id, room = rng.choice(targets)
+        start = first + timedelta(days=rng.randrange(max(1, args.distinct_starts)))
+        body = {"hotel_id": hotel_id, "room_type_code": room, "from_": start.isoformat(), "to": (start + timedelta(days=days - 1)).isoformat()}
+        out.append((days, json.dumps(body).encode("utf-8")))
+    return out
+
+
+# -------- server --------
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _wait_ready(host: str, port: int, proc: Optional[subprocess.Popen], timeout: float = 120.0) -> None:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if proc is not None and proc.poll() is not None:
+            raise SystemExit(f"server exited with code {proc.returncode} before becoming ready")
+        try:
+            conn = http.client.HTTPConnection(host, port, timeout=2.0)
+            conn.request("GET", "/hello")
+            if conn.getresponse().status == 200:
+                conn.close()
+                return
+        except OSError:
+            pass
+        time.sleep(0.2)
+    raise SystemExit(f"server on {host}:{port} not ready after {timeout:.0f}s")
+
+
+def prime(url: str, requests: List[Tuple[int, bytes]], timeout: float = 300.0) -> float:
+    """
+    Block until one quote succeeds (the first one pays for data/model loading). Returns its seconds.
+    """
+    target = urlparse(url)
+    host, port = target.hostname or "127.0.0.1", target.port or 80
+    t0 = time.perf_counter()
+    deadline = t0 + timeout
+    last = "no response"
+    while time.perf_counter() < deadline:
+        try:
+            conn = http.client.HTTPConnection(host, port, timeout=max(1.0, deadline - time.perf_counter()))
+            conn.request("POST", QUOTE_PATH, body=requests[0][1], headers={"Content-Type": "application/json"})
+            resp = conn.getresponse()
+            body = resp.read()
+            conn.close()
+            if resp.status == 200:
+                return time.perf_counter() - t0
+            last = f"HTTP {resp.status}: {body[:200].decode('utf-8', 'replace')}"
+        except (OSError, http.client.HTTPException) as e:
+            last = f"{type(e).__name__}: {e}"
+        time.sleep(0.5)
+    raise SystemExit(f"no successful quote within {timeout:.0f}s ({last})")
+
+
+def start_server(args: argparse.Namespace, work_dir: str) -> Tuple[subprocess.Popen, str]:
+    port = args.port or _free_port()
+    env = dict(os.environ)
+    if args.database_url:
+        env["DATABASE_URL"] = args.database_url
+        env["FORESIGHT_DB"] = "on"
+    else:
+        env["FORESIGHT_DB"] = "off"
+    env["FORESIGHT_EVENTS"] = args.events
+    if args.no_result_cache:
+        env["FORESIGHT_RESULT_CACHE"] = "off"
+    env.pop("FORESIGHT_WARMUP_DAYS", None)
+    cmd = [
+        sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port),
+        "--workers", str(max(1, args.workers)), "--log-level", "warning", "--no-access-log",
+    ]
+    with open(os.path.join(work_dir, "server.log"), "wb") as log:
+        proc = subprocess.Popen(cmd, cwd=BACKEND_DIR, env=env, stdout=log, stderr=subprocess.STDOUT)
+    url = f"http://127.0.0.1:{port}"
+    try:
+        _wait_ready("127.0.0.1", port, proc)
+    except SystemExit:
+        proc.terminate()
+        with open(os.path.join(work_dir, "server.log"), "r", encoding="utf-8", errors="replace") as f:
+            sys.stderr.write(f.read()[-4000:])
+        raise
+    return proc, url
+
+
+# -------- client --------
+def _percentile(sorted_ms: List[float], q: float) -> Optional[float]:
+    if not sorted_ms:
+        return None
+    return round(sorted_ms[min(len(sorted_ms) - 1, int(round(q * (len(sorted_ms) - 1))))], 3)
+
+
+def _summary(samples: List[Tuple[int, float, bool]], seconds: float, in_flight: int = 0) -> Dict[str, Any]:
+    ok = sorted(ms for _, ms, good in samples if good)
+    return {
+        "requests": len(samples),
+        "in_flight": in_flight,
+        "errors": sum(1 for _, _, good in samples if not good),
+        "throughput_rps": round(len(ok) / seconds, 2) if seconds > 0 else None,
+        "mean_ms": round(sum(ok) / len(ok), 3) if ok else None,
+        "p50_ms": _percentile(ok, 0.50),
+        "p95_ms": _percentile(ok, 0.95),
+        "p99_ms": _percentile(ok, 0.99),
+        "max_ms": round(ok[-1], 3) if ok else None,
+    }
+
+
+def run_level(url: str, concurrency: int, requests: List[Tuple[int, bytes]], args: argparse.Namespace) -> Dict[str, Any]:
+    """
+    `concurrency` closed-loop clients for --warmup + --duration seconds; only the latter is measured.
+    Requests that started before the window closed but finished after it are counted as in_flight
+    (per range length too), not dropped.
+    """
+    target = urlparse(url)
+    host, port = target.hostname or "127.0.0.1", target.port or 80
+    headers = {"Content-Type": "application/json"}
+    t_start = time.perf_counter()
+    t_measure = t_start + args.warmup
+    t_stop = t_measure + args.duration
+    results: List[List[Tuple[int, float, bool]]] = [[] for _ in range(concurrency)]
+    unfinished: List[List[int]] = [[] for _ in range(concurrency)]  # range lengths in flight at window close
+
+    def client(k: int) -> None:
+        conn = http.client.HTTPConnection(host, port, timeout=args.timeout)
+        i = k
+        out = results[k]
+        while True:
+            t0 = time.perf_counter()
+            if t0 >= t_stop:
+                break
+            days, body = requests[i % len(requests)]
+            i += concurrency
+            good = False
+            try:
+                conn.request("POST", QUOTE_PATH, body=body, headers=headers)
+                resp = conn.getresponse()
+                resp.read()
+                good = resp.status == 200
+            except (OSError, http.client.HTTPException):
+                conn.close()
+                conn = http.client.HTTPConnection(host, port, timeout=args.timeout)
+            t1 = time.perf_counter()
+            if t1 > t_stop:
+                unfinished[k].append(days)
+            elif t0 >= t_measure:
+                out.append((days, (t1 - t0) * 1000.0, good))
+        conn.close()
+
+    threads = [threading.Thread(target=client, args=(k,), daemon=True) for k in range(concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    samples = [s for r in results for s in r]
+    in_flight = [d for u in unfinished for d in u]
+    level = {"concurrency": concurrency, **_summary(samples, args.duration, len(in_flight))}
+    level["valid"] = level["requests"] > 0
+    level["by_range_days"] = {
+        str(d): _summary([s for s in samples if s[0] == d], args.duration, in_flight.count(d))
+        for d in sorted({s[0] for s in samples} | set(in_flight))
+    }
+    return level
+
+
+def find_saturation(levels: List[Dict[str, Any]], min_gain: float) -> Optional[int]:
+    """
+    The first concurrency level whose throughput grew less than `min_gain` over the previous one.
+    Invalid levels (nothing completed in the window) are skipped.
+    """
+    levels = [lv for lv in levels if lv.get("valid", True)]
+    for prev, cur in zip(levels, levels[1:]):
+        if prev["throughput_rps"] and (cur["throughput_rps"] or 0.0) < prev["throughput_rps"] * (1.0 + min_gain):
+            return cur["concurrency"]
+    return None
+
+
+def _print_level(level: Dict[str, Any]) -> None:
+    def ms(v: Optional[float]) -> str:
+        return f"{v:>8.1f}" if v is not None else "     n/a"
+    print(f"  c={level['concurrency']:<4} {level['throughput_rps'] or 0.0:>8.1f} req/s  "
+          f"p50={ms(level['p50_ms'])}  p95={ms(level['p95_ms'])}  p99={ms(level['p99_ms'])} ms  "
+          f"n={level['requests']} errors={level['errors']} in_flight={level['in_flight']}")
+    for d, st in level["by_range_days"].items():
+        print(f"      {d:>3}d  p50={ms(st['p50_ms'])}  p95={ms(st['p95_ms'])}  p99={ms(st['p99_ms'])} ms  "
+              f"n={st['requests']} in_flight={st['in_flight']}")
+    if not level["valid"]:
+        print(f"  [warn] c={level['concurrency']}: no request completed inside the measured window "
+              f"({level['in_flight']} still in flight); raise --duration or --timeout. Excluded from the saturation search.")
+
+
+def main() -> None:
+    args = parse_args()
+    levels_wanted = [int(x) for x in args.sweep.split(",")] if args.sweep else [args.concurrency]
+    requests = build_requests(args)
+    work_dir = tempfile.mkdtemp(prefix="pricing-load-")
+    proc = None
+    url = args.url
+    try:
+        if url is None:
+            proc, url = start_server(args, work_dir)
+        else:
+            target = urlparse(url)
+            _wait_ready(target.hostname or "127.0.0.1", target.port or 80, None, timeout=10.0)
+        print(f"[load] primed in {prime(url, requests):.1f}s")
+        print(f"[load] {url}{QUOTE_PATH}  ranges {args.ranges}  {args.distinct_starts} start dates  "
+              f"{args.warmup:.0f}s warm-up + {args.duration:.0f}s per level")
+        levels = []
+        for c in levels_wanted:
+            level = run_level(url, c, requests, args)
+            _print_level(level)
+            levels.append(level)
+    finally:
+        if proc is not None:
+            proc.terminate()
+            try:
+                proc.wait(timeout=15)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    saturation = find_saturation(levels, args.saturation_gain) if len(levels) > 1 else None
+    if len(levels) > 1 and any(lv["valid"] for lv in levels):
+        best = max((lv for lv in levels if lv["valid"]), key=lambda lv: lv["throughput_rps"] or 0.0)
+        print(f"[load] peak {best['throughput_rps']:.1f} req/s at c={best['concurrency']}; "
+              + (f"saturates at c={saturation} (<{args.saturation_gain:.0%} gain)" if saturation else "no saturation within the sweep"))
+    elif len(levels) > 1:
+        print("[load] no level completed a request inside its window; no saturation estimate")
+    if args.json_out:
+        report = {
+            "url": url if args.url else None,
+            "server": None if args.url else {"workers": args.workers, "events": args.events, "result_cache": not args.no_result_cache},
+            "python": platform.python_version(),
+            "cpu_count": os.cpu_count(),
+            "params": {"ranges": args.ranges, "distinct_starts": args.distinct_starts, "duration": args.duration, "warmup": args.warmup, "seed": args.seed},
+            "levels": levels,
+            "saturation_concurrency": saturation,
+        }
+        with open(args.json_out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Deterministic synthetic PMS exports for benchmarks.
+
+  python experiments/benchmarks/synthetic_pms.py --out /tmp/pms --days 730 --files 2 --hotels 3 --room-types 2
+
+Writes <out>/hotel_<h>/<ROOM>/pms_<k>.csv: each property's history split across --files files,
+with --rows-per-day snapshot rows per day, in the shape of the bundled exports (dd/mm/yyyy
+dates, ARR target, Occ in percent, Pickup, plus columns the engine ignores).
+"""
+from __future__ import annotations
+
+import argparse
+import os
+from datetime import date, timedelta
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+ROOM_TYPES = ["DLX-QUEEN", "STD-TWIN", "STD-DOUBLE", "SUITE", "FAMILY", "ECONOMY"]
+MONTH_UPLIFT = np.array([0, -10, -8, 0, 5, 10, 20, 25, 20, 8, 0, -5, 15], dtype=float)  # index 1..12
+
+# Titles that parse into date spans, used to record replayable event searches
+EVENT_TITLES = [
+    "City marathon on {d:%d %B %Y}",
+    "Music festival {d:%d}-{e:%d %B %Y}",
+    "International rugby match {d:%B %d, %Y}",
+    "Tech conference from {d:%d %B} to {e:%d %B %Y}",
+]
+
+
+def room_types(n: int) -> List[str]:
+    return [ROOM_TYPES[i] if i < len(ROOM_TYPES) else f"ROOM-{i}" for i in range(n)]
+
+
+def property_dir(out_dir: str, hotel_id: int, room_type_code: str) -> str:
+    return os.path.join(out_dir, f"hotel_{hotel_id}", room_type_code)
+
+
+def generate(
+    out_dir: str,
+    *,
+    days: int = 365,
+    files: int = 1,
+    rows_per_day: int = 1,
+    hotels: int = 1,
+    room_types_per_hotel: int = 1,
+    start: date = date(2022, 1, 1),
+    seed: int = 0,
+) -> Dict[str, object]:
+    """
+    Write the dataset and return a manifest ({properties: [{hotel_id, room_type_code, data_dir}], rows, bytes}).
+    The same arguments always produce byte-identical files.
+    """
+    manifest: Dict[str, object] = {"properties": [], "rows": 0, "bytes": 0}
+    dates = pd.date_range(start, periods=days, freq="D")
+    dow = dates.dayofweek.to_numpy()
+    month = dates.month.to_numpy()
+    for h in range(1, hotels + 1):
+        for r, room in enumerate(room_types(room_types_per_hotel)):
+            rng = np.random.default_rng([seed, h, r])
+            base = 90.0 + 15.0 * h + 25.0 * r
+            occ = np.clip(0.55 + 0.2 * np.isin(dow, (4, 5)) + MONTH_UPLIFT[month] / 100 + rng.normal(0, 0.08, days), 0.05, 1.0)
+            arr = base + 20.0 * np.isin(dow, (4, 5)) + MONTH_UPLIFT[month] + 60.0 * (occ - 0.6) + rng.normal(0, 6.0, days)
+            pickup = rng.poisson(3.0 * occ)
+            frame = pd.DataFrame({
+                "Date": dates.strftime("%d/%m/%Y"),
+                "DayOfWeek": dates.day_name().str[:3],
+                "Avail": rng.integers(0, 40, days),
+                "Occ": np.round(occ * 100.0, 1),
+                "ARR": np.round(arr, 2),
+                "Pickup": pickup,
+                "Revenue": np.round(arr * occ * 80, 2),
+                "Notes": "",
+            })
+            if rows_per_day > 1:
+                # later snapshots of the same day, with small revisions
+                frame = frame.loc[frame.index.repeat(rows_per_day)].reset_index(drop=True)
+                frame["ARR"] = np.round(frame["ARR"] + rng.normal(0, 0.5, len(frame)), 2)
+            pdir = property_dir(out_dir, h, room)
+            os.makedirs(pdir, exist_ok=True)
+            for k, part in enumerate(np.array_split(np.arange(len(frame)), max(1, files))):
+                path = os.path.join(pdir, f"pms_{k}.csv")
+                frame.iloc[part].to_csv(path, index=False)
+                manifest["bytes"] = int(manifest["bytes"]) + os.path.getsize(path)
+            manifest["rows"] = int(manifest["rows"]) + len(frame)
+            manifest["properties"].append({"hotel_id": h, "room_type_code": room, "data_dir": pdir})  # type: ignore[union-attr]
+    return manifest
+
+
+def event_sources(start: date, end: date, *, n: int = 8, seed: int = 0) -> List[Dict[str, str]]:
+    """
+    Deterministic fake search results with parseable dates inside [start, end].
+    """
+    rng = np.random.default_rng([seed, 99])
+    span = max(1, (end - start).days)
+    out: List[Dict[str, str]] = []
+    for i in range(n):
+        d = start + timedelta(days=int(rng.integers(0, span)))
+        e = min(end, d + timedelta(days=int(rng.integers(1, 4))))
+        title = EVENT_TITLES[i % len(EVENT_TITLES)].format(d=d, e=e)
+        out.append({"title": title, "url": f"https://example.invalid/event/{i}"})
+    return out
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description="Generate synthetic PMS exports for benchmarks.")
+    p.add_argument("--out", type=str, required=True)
+    p.add_argument("--days", type=int, default=365)
+    p.add_argument("--files", type=int, default=1)
+    p.add_argument("--rows-per-day", type=int, default=1)
+    p.add_argument("--hotels", type=int, default=1)
+    p.add_argument("--room-types", type=int, default=1)
+    p.add_argument("--seed", type=int, default=0)
+    args = p.parse_args()
+    m = generate(
+        args.out, days=args.days, files=args.files, rows_per_day=args.rows_per_day,
+        hotels=args.hotels, room_types_per_hotel=args.room_types, seed=args.seed,
+    )
+    print(f"[synthetic] {len(m['properties'])} properties, {m['rows']} rows, {int(m['bytes']) / 1e6:.1f} MB under {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+import csv
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+from .engine import load_data_snapshot, load_model_cached, score_dates
+from .hotels import HotelConfig, load_hotel_configs
+from .result import PricingResult
+
+
+@dataclass
+class BatchJob:
+    hotel_id: int
+    room_type_code: str
+    from_date: str
+    to_date: str
+    location: Optional[str] = None
+    name: str = ""
+
+    def label(self) -> str:
+        return self.name or f"{self.hotel_id}_{self.room_type_code}_{self.from_date}_{self.to_date}"
+
+
+def _job_from_row(row: Dict[str, Any], n: int) -> BatchJob:
+    def get(*keys: str) -> Any:
+        for k in keys:
+            v = row.get(k)
+            if v is not None and str(v).strip() != "":
+                return v
+        return None
+
+    hotel_id, room_type = get("hotel_id"), get("room_type", "room_type_code")
+    from_date, to_date = get("from", "from_date"), get("to", "to_date")
+    if hotel_id is None or room_type is None or from_date is None or to_date is None:
+        raise ValueError(f"job {n}: hotel_id, room_type, from and to are required (got {sorted(row)})")
+    return BatchJob(
+        hotel_id=int(hotel_id),
+        room_type_code=str(room_type).strip(),
+        # YAML parses unquoted dates into date objects
+        from_date=str(from_date).strip(),
+        to_date=str(to_date).strip(),
+        location=str(get("location")).strip() if get("location") is not None else None,
+        name=str(get("name") or "").strip(),
+    )
+
+
+def load_jobs(path: str) -> List[BatchJob]:
+    """
+    Read jobs from a CSV with a header row, or from YAML (a list of mappings, or {"jobs": [...]}).
+    Keys: hotel_id, room_type, from, to, and optionally location and name.
+    """
+    ext = os.path.splitext(path)[1].lower()
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        if ext in (".yaml", ".yml"):
+            try:
+                import yaml  # only needed for YAML job files
+            except ImportError as e:
+                raise SystemExit("YAML job files need PyYAML (pip install pyyaml); or use a CSV") from e
+            raw = yaml.safe_load(f) or []
+            rows = raw.get("jobs", []) if isinstance(raw, dict) else raw
+        else:
+            rows = list(csv.DictReader(f))
+    return [_job_from_row(dict(r), n) for n, r in enumerate(rows, start=1)]
+
+
+def run_jobs(
+    jobs: List[BatchJob],
+    *,
+    data_dir: str,
+    cache_dir: str,
+    workers: int = 4,
+    default_location: Optional[str] = None,
+    hotels: Optional[Dict[int, HotelConfig]] = None,
+    disable_ml: bool = False,
+    on_result: Optional[Callable[[BatchJob, PricingResult, Dict], None]] = None,
+    progress: Optional[Callable[[str], None]] = print,
+    **score_kwargs: Any,
+) -> Dict:
+    """
+    Score `jobs` in this process on `workers` threads. The data snapshot and model are loaded once up
+    front and shared through the engine caches. A job's location is its own, else the hotel's in
+    hotels.json, else `default_location`. `on_result(job, items, meta)` is called in job order as
+    results become available (for writing outputs); a failed job is recorded and skipped.
+    Extra keyword arguments go to every score_dates call.
+    Returns a summary with per-job seconds, days, cache hits and stage timings.
+    """
+    log = progress or (lambda _msg: None)
+    hotels = hotels if hotels is not None else load_hotel_configs()
+    timings: Dict[str, float] = {}
+
+    t0 = time.perf_counter()
+    load_data_snapshot(data_dir)
+    timings["data_snapshot"] = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    if not disable_ml:
+        load_model_cached(cache_dir)
+    timings["model"] = time.perf_counter() - t0
+
+    def _location(job: BatchJob) -> Optional[str]:
+        cfg = hotels.get(job.hotel_id)
+        return job.location or (cfg.location if cfg and cfg.location else None) or default_location
+
+    def _run(job: BatchJob):
+        t = time.perf_counter()
+        items, meta = score_dates(
+            hotel_id=job.hotel_id,
+            room_type_code=job.room_type_code,
+            from_date=job.from_date,
+            to_date=job.to_date,
+            location=_location(job),
+            data_dir=data_dir,
+            cache_dir=cache_dir,
+            disable_ml=disable_ml,
+            **score_kwargs,
+        )
+        return items, meta, time.perf_counter() - t
+
+    results: List[Dict] = []
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = [pool.submit(_run, job) for job in jobs]
+        # Collect in job order so outputs are deterministic whatever the completion order
+        for n, (job, fut) in enumerate(zip(jobs, futures), start=1):
+            r: Dict[str, Any] = {"job": job.label(), "hotel_id": job.hotel_id, "room_type_code": job.room_type_code,
+                                 "from": job.from_date, "to": job.to_date}
+            try:
+                items, meta, seconds = fut.result()
+                if on_result is not None:
+                    on_result(job, items, meta)
+            except Exception as e:
+                r.update(ok=False, error=f"{type(e).__name__}: {e}")
+                log(f"[batch] {n}/{len(jobs)} {job.label()} failed: {r['error']}")
+            else:
+                r.update(ok=True, num_items=len(items), seconds=round(seconds, 4),
+                         cache_hit=bool(meta.get("result_cache_hit")), timings=meta.get("timings", {}))
+                log(f"[batch] {n}/{len(jobs)} {job.label()} days={len(items)} {seconds * 1000:.1f} ms"
+                    f"{' (cached)' if r['cache_hit'] else ''}")
+            results.append(r)
+    timings["scoring"] = time.perf_counter() - t0
+
+    done = [r for r in results if r["ok"]]
+    return {
+        "jobs": len(jobs),
+        "succeeded": len(done),
+        "failed": len(jobs) - len(done),
+        "workers": max(1, workers),
+        "days": sum(r["num_items"] for r in done),
+        "job_seconds_total": round(sum(r["seconds"] for r in done), 4),
+        "results": results,
+        "timings": {k: round(v, 4) for k, v in timings.items()},
+    }
@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional
+
+from .utils import sha1_of_obj
+
+
+class LRUCache:
+    """
+    Small thread-safe LRU with hit/miss counters, used for the process-wide data, model and result caches.
+    With `max_bytes` and a `sizeof(value)` function, entries are also evicted to keep their total size
+    under the budget (the newest entry is always kept, even if it alone exceeds it).
+    """
+
+    def __init__(
+        self,
+        name: str,
+        maxsize: int = 128,
+        max_bytes: Optional[int] = None,
+        sizeof: Optional[Callable[[Any], int]] = None,
+    ):
+        self.name = name
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._sizes: Dict[Hashable, int] = {}
+        self._bytes = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+            return None
+
+    def put(self, key: Hashable, value: Any) -> None:
+        size = int(self.sizeof(value)) if self.sizeof is not None else 0
+        with self._lock:
+            self._bytes -= self._sizes.pop(key, 0)
+            self._data[key] = value
+            self._data.move_to_end(key)
+            self._sizes[key] = size
+            self._bytes += size
+            while len(self._data) > self.maxsize or (
+                self.max_bytes is not None and self._bytes > self.max_bytes and len(self._data) > 1
+            ):
+                old, _ = self._data.popitem(last=False)
+                self._bytes -= self._sizes.pop(old, 0)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._sizes.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "name": self.name,
+                "size": len(self._data),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": (self.hits / total) if total else None,
+                "evictions": self.evictions,
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+
+def files_fingerprint(paths: Iterable[str]) -> str:
+    """
+    Cheap content proxy for a set of files: (name, size, mtime_ns) of each, hashed.
+    """
+    parts = []
+    for p in sorted(paths):
+        try:
+            st = os.stat(p)
+            parts.append((os.path.basename(p), st.st_size, st.st_mtime_ns))
+        except OSError:
+            parts.append((os.path.basename(p), None, None))
+    return sha1_of_obj(parts)
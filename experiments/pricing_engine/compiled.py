@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+
+COMPILED_FILENAME = "compiled.npz"
+
+
+@dataclass
+class CompiledTrees:
+    """
+    A fitted tree ensemble flattened into NumPy arrays, evaluated without sklearn's
+    validation/dispatch overhead. Nodes of all trees are concatenated; `left`/`right` hold
+    absolute node indices and leaves have left == -1. `value` already includes shrinkage.
+    An optional standard-scaling step (mean/scale) is applied first, as in the pipeline.
+    """
+    feature: np.ndarray       # int32 per node
+    threshold: np.ndarray     # float64 per node
+    left: np.ndarray          # int32 per node, -1 for leaves
+    right: np.ndarray         # int32 per node
+    missing_left: np.ndarray  # bool per node: NaN goes left
+    value: np.ndarray         # float64 per node (leaf contribution)
+    roots: np.ndarray         # int32 root node index per tree
+    base: float               # initial prediction
+    max_depth: int
+    float32_inputs: bool      # GBRT trees compare float32 inputs, HGB float64
+    mean: Optional[np.ndarray] = None
+    scale: Optional[np.ndarray] = None
+    _route: Optional[np.ndarray] = field(default=None, repr=False, compare=False)
+
+    @property
+    def nbytes(self) -> int:
+        arrays = [self.feature, self.threshold, self.left, self.right, self.missing_left, self.value, self.roots]
+        arrays += [a for a in (self.mean, self.scale) if a is not None]
+        return int(sum(a.nbytes for a in arrays))
+
+    def _routing(self) -> np.ndarray:
+        # Interleaved [left, right] children per node; leaves loop back to themselves so every
+        # row can take exactly max_depth steps without a leaf check.
+        if self._route is None:
+            nodes = np.arange(len(self.left), dtype=np.intp)
+            leaf = self.left < 0
+            kids = np.empty(2 * len(nodes), dtype=np.intp)
+            kids[0::2] = np.where(leaf, nodes, self.left)
+            kids[1::2] = np.where(leaf, nodes, self.right)
+            self._route = kids
+        return self._route
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            X = X[None, :]
+        if self.mean is not None:
+            X = X - self.mean
+        if self.scale is not None:
+            X = X / self.scale
+        if self.float32_inputs:
+            X = X.astype(np.float32)
+        n, n_features = X.shape
+        kids = self._routing()
+        flat_x = np.ascontiguousarray(X).ravel()
+        row_base = (np.arange(n, dtype=np.intp) * n_features)[:, None]
+        idx = np.broadcast_to(self.roots.astype(np.intp), (n, len(self.roots)))
+        check_nan = bool(self.missing_left.any())
+        for _ in range(self.max_depth):
+            x = flat_x[row_base + self.feature[idx]]
+            go_right = ~(x <= self.threshold[idx])  # NaN goes right unless the split says otherwise
+            if check_nan:
+                go_right &= ~(np.isnan(x) & self.missing_left[idx])
+            idx = kids[2 * idx + go_right]
+        return self.base + self.value[idx].sum(axis=1)
+
+    def save(self, path: str) -> None:
+        arrays: Dict[str, Any] = {
+            "feature": self.feature, "threshold": self.threshold, "left": self.left, "right": self.right,
+            "missing_left": self.missing_left, "value": self.value, "roots": self.roots,
+            "scalars": np.array([self.base, self.max_depth, float(self.float32_inputs)]),
+        }
+        if self.mean is not None:
+            arrays["mean"] = self.mean
+        if self.scale is not None:
+            arrays["scale"] = self.scale
+        with open(path, "wb") as f:
+            np.savez(f, **arrays)
+
+    @staticmethod
+    def load(path: str) -> "CompiledTrees":
+        with np.load(path) as z:
+            base, max_depth, f32 = z["scalars"]
+            return CompiledTrees(
+                feature=z["feature"], threshold=z["threshold"], left=z["left"], right=z["right"],
+                missing_left=z["missing_left"], value=z["value"], roots=z["roots"],
+                base=float(base), max_depth=int(max_depth), float32_inputs=bool(f32),
+                mean=z["mean"] if "mean" in z.files else None,
+                scale=z["scale"] if "scale" in z.files else None,
+            )
+
+
+def _concat(parts: list, dtype) -> np.ndarray:
+    return np.concatenate(parts).astype(dtype) if parts else np.empty(0, dtype=dtype)
+
+
+def compile_pipeline(pipeline: Any) -> CompiledTrees:
+    """
+    Flatten a fitted [StandardScaler +] GradientBoostingRegressor or HistGradientBoostingRegressor
+    pipeline. Raises ValueError for anything else (e.g. categorical HGB splits).
+    """
+    from sklearn.ensemble import GradientBoostingRegressor, HistGradientBoostingRegressor
+    from sklearn.preprocessing import StandardScaler
+
+    steps = [step for _, step in pipeline.steps] if hasattr(pipeline, "steps") else [pipeline]
+    mean = scale = None
+    for step in steps[:-1]:
+        if isinstance(step, StandardScaler):
+            mean = np.asarray(step.mean_, dtype=np.float64) if step.with_mean else None
+            scale = np.asarray(step.scale_, dtype=np.float64) if step.with_std else None
+        else:
+            raise ValueError(f"unsupported pipeline step {type(step).__name__}")
+    est = steps[-1]
+
+    feature, threshold, left, right, missing, value, roots = [], [], [], [], [], [], []
+    offset = 0
+    max_depth = 0
+    if isinstance(est, GradientBoostingRegressor):
+        base = 0.0 if est.init_ == "zero" else float(np.ravel(est.init_.constant_)[0])
+        for tree in est.estimators_[:, 0]:
+            t = tree.tree_
+            n = t.node_count
+            is_leaf = t.children_left < 0
+            roots.append(offset)
+            feature.append(np.where(is_leaf, 0, t.feature))
+            threshold.append(t.threshold)
+            left.append(np.where(is_leaf, -1, t.children_left + offset))
+            right.append(np.where(is_leaf, -1, t.children_right + offset))
+            missing.append(np.asarray(getattr(t, "missing_go_to_left", np.zeros(n)), dtype=bool))
+            value.append(t.value[:, 0, 0] * est.learning_rate)
+            max_depth = max(max_depth, int(t.max_depth))
+            offset += n
+        float32_inputs = True
+    elif isinstance(est, HistGradientBoostingRegressor):
+        base = float(np.ravel(est._baseline_prediction)[0])
+        for (predictor,) in est._predictors:
+            nodes = predictor.nodes
+            if "is_categorical" in nodes.dtype.names and nodes["is_categorical"].any():
+                raise ValueError("categorical splits are not supported")
+            is_leaf = nodes["is_leaf"].astype(bool)
+            roots.append(offset)
+            feature.append(np.where(is_leaf, 0, nodes["feature_idx"]))
+            threshold.append(nodes["num_threshold"])
+            left.append(np.where(is_leaf, -1, nodes["left"].astype(np.int64) + offset))
+            right.append(np.where(is_leaf, -1, nodes["right"].astype(np.int64) + offset))
+            missing.append(nodes["missing_go_to_left"].astype(bool))
+            value.append(nodes["value"])
+            max_depth = max(max_depth, int(nodes["depth"].max()))
+            offset += len(nodes)
+        float32_inputs = False
+    else:
+        raise ValueError(f"unsupported estimator {type(est).__name__}")
+
+    return CompiledTrees(
+        feature=_concat(feature, np.int32),
+        threshold=_concat(threshold, np.float64),
+        left=_concat(left, np.int32),
+        right=_concat(right, np.int32),
+        missing_left=_concat(missing, bool),
+        value=_concat(value, np.float64),
+        roots=np.asarray(roots, dtype=np.int32),
+        base=base,
+        max_depth=max_depth,
+        float32_inputs=float32_inputs,
+        mean=mean,
+        scale=scale,
+    )
+
+
+def max_abs_error(compiled: CompiledTrees, pipeline: Any, X: np.ndarray) -> float:
+    """
+    Largest absolute difference between the compiled and sklearn predictions on X.
+    """
+    if len(X) == 0:
+        return 0.0
+    return float(np.max(np.abs(compiled.predict(X) - pipeline.predict(X))))
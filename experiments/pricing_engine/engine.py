@@ -1,26 +1,44 @@
 from __future__ import annotations
 
 import os
-from dataclasses import asdict, dataclass
-from datetime import date, datetime
-from typing import Dict, List, Tuple
+import threading
+from datetime import date, datetime, timedelta
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple
 
-import pandas as pd  # for optional baseline rate ingestion
+import numpy as np
 
+from .caches import LRUCache, files_fingerprint
+from .event_store import CityEventStore, event_store_stats
 from .heuristics import PriceOutput, compute_price_for_date
-from .perplexity_adapter import fetch_event_impacts
-from .model import MLPriceModel, build_features_for_date
-from .utils import daterange, ensure_dir, to_iso
+from .perplexity_adapter import fetch_event_impacts_detailed
+from .profiling import StageHook, StageTimer
+from .result import DriverTable, PricingResult
+from . import registry
+from .model import MODEL_FILENAME, MODEL_META_FILENAME, MLPriceModel, build_features_for_date
+from .utils import cache_path, daterange, ensure_dir, read_json, sha1_of_obj, to_iso, write_json
 
+if TYPE_CHECKING:
+    from .feature_store import FeatureStore
 
-@dataclass
-class PricingItem:
-    date: str
-    room_type_code: str
-    price_rec: float
-    price_min: float
-    price_max: float
-    drivers: List[str]
+
+# Process-wide caches: parsed data files and loaded models are keyed by file fingerprints,
+# so edits or retrains invalidate them; scored results are keyed by every input that affects them.
+# Models (global and per-(hotel, room type) shards) are loaded lazily on first use and evicted by
+# approximate size, so a worker only holds the shards it actually serves.
+MODEL_CACHE_BYTES = int(float(os.getenv("FORESIGHT_MODEL_CACHE_MB", "256")) * 1024 * 1024)
+DATA_CACHE = LRUCache("data", maxsize=8)
+MODEL_CACHE = LRUCache(
+    "model",
+    maxsize=256,
+    max_bytes=MODEL_CACHE_BYTES,
+    sizeof=lambda entry: entry[0].nbytes if entry[0] is not None else 0,
+)
+RESULT_CACHE = LRUCache("result", maxsize=512)
+
+# Model loads from disk (first use, retrain/rollback, or reload after eviction) and the version
+# each model directory last loaded, for monitoring
+_MODEL_LOADS_LOCK = threading.Lock()
+_MODEL_LOADS: Dict[str, Any] = {"loads": 0, "versions": {}}
 
 
 def _try_load_baseline_rates(data_dir: str) -> Dict[str, float]:
@@ -33,6 +51,8 @@ def _try_load_baseline_rates(data_dir: str) -> Dict[str, float]:
     if not os.path.exists(data_dir):
         return mapping
 
+    import pandas as pd  # only when there are data files to parse
+
     # search for candidate files
     candidates: List[str] = []
     for fname in os.listdir(data_dir):
@@ -92,6 +112,8 @@ def _try_load_operational_metrics(data_dir: str) -> Dict[str, Dict[str, float]]:
     if not os.path.exists(data_dir):
         return metrics
 
+    import pandas as pd
+
     candidates: List[str] = []
     for fname in os.listdir(data_dir):
         if fname.lower().endswith(".csv") or fname.lower().endswith(".xlsx"):
@@ -162,6 +184,97 @@ def _try_load_operational_metrics(data_dir: str) -> Dict[str, Dict[str, float]]:
     return metrics
 
 
+def _data_files(data_dir: str) -> List[str]:
+    if not data_dir or not os.path.exists(data_dir):
+        return []
+    return [
+        os.path.join(data_dir, f) for f in os.listdir(data_dir)
+        if f.lower().endswith(".csv") or f.lower().endswith(".xlsx")
+    ]
+
+
+def load_data_snapshot(
+    data_dir: str, timer: StageTimer | None = None,
+) -> Tuple[Dict[str, float], Dict[str, Dict[str, float]], str]:
+    """
+    Baseline rates and operational metrics for `data_dir`, parsed once per file fingerprint.
+    With a `timer`, records the "baseline_load" and "metrics_load" stages (near zero on a cache hit).
+    Returns (baseline, metrics, fingerprint).
+    """
+    if not data_dir:
+        return {}, {}, ""
+    fp = files_fingerprint(_data_files(data_dir))
+    key = (os.path.abspath(data_dir), fp)
+    hit = DATA_CACHE.get(key)
+    if hit is not None:
+        if timer is not None:
+            timer.lap("baseline_load")
+            timer.lap("metrics_load")
+        return hit[0], hit[1], fp
+    baseline = _try_load_baseline_rates(data_dir)
+    if timer is not None:
+        timer.lap("baseline_load")
+    metrics = _try_load_operational_metrics(data_dir)
+    if timer is not None:
+        timer.lap("metrics_load")
+    DATA_CACHE.put(key, (baseline, metrics))
+    return baseline, metrics, fp
+
+
+def load_model_cached(cache_dir: str) -> Tuple[MLPriceModel | None, str]:
+    """
+    Load the ML model once per artifact fingerprint. Returns (model or None, fingerprint).
+    The fingerprint is the active registry version (a promotion or rollback swaps it),
+    or the legacy flat files' stamps when no registry exists yet.
+    """
+    active = registry.active_version(cache_dir)
+    if active:
+        fp = f"registry:{active}"
+    else:
+        fp = files_fingerprint([os.path.join(cache_dir, MODEL_FILENAME), os.path.join(cache_dir, MODEL_META_FILENAME)])
+    key = (os.path.abspath(cache_dir), fp)
+    hit = MODEL_CACHE.get(key)
+    if hit is not None:
+        return hit[0], fp
+    model = MLPriceModel.load(cache_dir, lightweight=True)
+    MODEL_CACHE.put(key, (model,))
+    with _MODEL_LOADS_LOCK:
+        _MODEL_LOADS["loads"] += 1
+        if model is not None:
+            _MODEL_LOADS["versions"][os.path.abspath(cache_dir)] = model.version
+    return model, fp
+
+
+def load_model_for(cache_dir: str, hotel_id: int, room_type_code: str) -> Tuple[MLPriceModel | None, str, str]:
+    """
+    The model serving (hotel_id, room_type_code): its shard when one has been trained,
+    otherwise the global model. Returns (model or None, fingerprint, scope "shard"/"global"/"").
+    """
+    sdir = registry.shard_dir(cache_dir, hotel_id, room_type_code)
+    if os.path.isdir(sdir):
+        model, fp = load_model_cached(sdir)
+        if model is not None:
+            return model, f"shard:{hotel_id}/{room_type_code}:{fp}", "shard"
+    model, fp = load_model_cached(cache_dir)
+    return model, fp, ("global" if model is not None else "")
+
+
+def cache_stats() -> List[Dict]:
+    stats = [DATA_CACHE.stats(), MODEL_CACHE.stats(), RESULT_CACHE.stats()]
+    events = event_store_stats()
+    if events is not None:
+        stats.append(events)
+    return stats
+
+
+def model_stats() -> Dict[str, Any]:
+    """
+    {"loads": model loads from disk so far, "versions": {model dir: version last loaded from it}}.
+    """
+    with _MODEL_LOADS_LOCK:
+        return {"loads": _MODEL_LOADS["loads"], "versions": dict(_MODEL_LOADS["versions"])}
+
+
 def score_dates(
     *,
     hotel_id: int,
@@ -174,27 +287,59 @@ def score_dates(
     disable_perplexity: bool = False,
     max_perplexity_results: int = 8,
     force_refresh_perplexity: bool = False,
+    stale_while_revalidate: bool = False,
+    event_soft_ttl_seconds: float | None = None,
+    event_store: CityEventStore | None = None,
     disable_ml: bool = False,
     ml_weight: float = 0.6,
     smoothing_window: int = 3,
-) -> Tuple[List[PricingItem], Dict]:
+    result_cache: bool = False,
+    feature_store: "FeatureStore | None" = None,
+    stage_hook: StageHook | None = None,
+    chunk_days: int | None = None,
+    on_chunk: Callable[[PricingResult], None] | None = None,
+) -> Tuple[PricingResult, Dict]:
     """
     Score a date range using baseline rates (if any), Perplexity-derived event impact (if any), and heuristics.
-    Returns (items, metadata).
+    With `stale_while_revalidate`, cached event impacts are served as-is and refreshed in the background
+    once older than `event_soft_ttl_seconds` (default 24h), so scoring never blocks on the external search.
+    With an `event_store`, impacts are read from the shared per-city array instead.
+    With `result_cache`, results are reused (in memory, then from `cache_dir/results`) when the data files,
+    model artifact, event impacts and parameters are all unchanged.
+    With a `feature_store`, the data files and event impacts are ingested into it (only changed days
+    are written) and per-day rates, occupancy and pickup are read back from it.
+    meta["timings"] holds wall milliseconds per stage (baseline_load, metrics_load, event_fetch,
+    feature_store, model_load, result_cache, per_day_loop, ml_predict, smoothing, total);
+    `stage_hook(stage, ms)` is also called as each stage completes.
+    With `chunk_days` (scan mode), the horizon is scored `chunk_days` days at a time and each finished
+    span is passed to `on_chunk` as soon as smoothing allows, so per-day inputs, features and results are
+    only held for one chunk; prices are identical to a single pass. The returned result is then empty,
+    or all chunks concatenated when no `on_chunk` is given. Scan mode bypasses the result cache.
+    Returns (PricingResult, metadata); the result is a read-only sequence of per-day rows.
     """
+    timer = StageTimer(hook=stage_hook)
     start = datetime.fromisoformat(from_date).date()
     end = datetime.fromisoformat(to_date).date()
+    if chunk_days is not None and chunk_days < 1:
+        raise ValueError("chunk_days must be >= 1")
+    scan = chunk_days is not None
 
-    # Load baseline rates (ADR/published) if present
-    baseline = _try_load_baseline_rates(data_dir) if data_dir else {}
-    # Load optional operational metrics (occupancy & pickup)
-    metrics = _try_load_operational_metrics(data_dir) if data_dir else {}
+    # Load baseline rates (ADR/published) and optional operational metrics (occupancy & pickup)
+    baseline, metrics, data_fp = load_data_snapshot(data_dir, timer)
 
     # Fetch external event impact
     impacts: Dict[str, float] = {}
     sources: List[Dict[str, str]] = []
-    if location:
-        impacts, sources = fetch_event_impacts(
+    events_age: float | None = None
+    events_stale = False
+    events_refresh_scheduled = False
+    if location and event_store is not None:
+        impacts = event_store.get_range(location, start, end)
+        info = event_store.info(location)
+        sources = info["sources"]
+        events_age, events_stale, events_refresh_scheduled = info["age_seconds"], info["stale"], info["refresh_scheduled"]
+    elif location:
+        ev = fetch_event_impacts_detailed(
             location=location,
             start=start,
             end=end,
@@ -202,24 +347,141 @@ def score_dates(
             max_results=max_perplexity_results,
             disable_external=disable_perplexity,
             force_refresh=force_refresh_perplexity,
+            stale_while_revalidate=stale_while_revalidate,
+            soft_ttl_seconds=event_soft_ttl_seconds,
         )
+        impacts, sources = ev.daily, ev.sources
+        events_age, events_stale, events_refresh_scheduled = ev.age_seconds, ev.stale, ev.refresh_scheduled
+    timer.lap("event_fetch")
+
+    # Daily inputs from the feature store (kept in sync with the data files and event impacts)
+    stored: Dict[str, Dict] | None = None
+    if feature_store is not None:
+        feature_store.ingest_data_dir(hotel_id, room_type_code, data_dir)
+        if location:
+            feature_store.ingest_event_impacts(hotel_id, room_type_code, start, end, impacts)
+        # scan mode reads each chunk's rows as it goes
+        stored = {} if scan else feature_store.read_range(hotel_id, room_type_code, start, end)
+        timer.lap("feature_store")
 
     # Load ML model if enabled
     ml_model: MLPriceModel | None = None
+    model_fp = ""
+    model_scope = ""
     if not disable_ml:
-        ml_model = MLPriceModel.load(cache_dir)
+        ml_model, model_fp, model_scope = load_model_for(cache_dir, hotel_id, room_type_code)
+    timer.lap("model_load")
 
-    items: List[PricingItem] = []
-    recs_for_smoothing: List[float] = []
-    for d in daterange(start, end):
+    meta = {
+        "hotel_id": hotel_id,
+        "room_type_code": room_type_code,
+        "from": from_date,
+        "to": to_date,
+        "location": location,
+        "num_items": 0,
+        "baseline_days": len(baseline),
+        "metrics_days": len(metrics),
+        "sources": sources,
+        "disable_perplexity": disable_perplexity,
+        "max_perplexity_results": max_perplexity_results,
+        "events_age_seconds": events_age,
+        "events_stale": events_stale,
+        "events_refresh_scheduled": events_refresh_scheduled,
+        "feature_store_version": max((r["version"] for r in stored.values()), default=None) if stored is not None else None,
+        "ml_loaded": bool(ml_model is not None),
+        "model_scope": model_scope or None,
+        "ml_weight": ml_weight,
+        "smoothing_window": smoothing_window,
+        "result_cache_hit": False,
+    }
+
+    if scan:
+        return _scan_dates(
+            start, end, int(chunk_days), on_chunk, meta, timer,
+            hotel_id=hotel_id, room_type_code=room_type_code, impacts=impacts, feature_store=feature_store,
+            baseline=baseline, metrics=metrics, ml_model=ml_model, ml_weight=ml_weight, smoothing_window=smoothing_window,
+        )
+
+    result_key = None
+    if result_cache:
+        result_key = {
+            "kind": "score_dates",
+            "hotel_id": hotel_id,
+            "room_type_code": room_type_code,
+            "from": from_date,
+            "to": to_date,
+            "data": data_fp,
+            "features": meta["feature_store_version"],
+            "model": model_fp if ml_model is not None else None,
+            "impacts": sha1_of_obj(sorted(impacts.items())),
+            "ml_weight": ml_weight,
+            "smoothing_window": smoothing_window,
+        }
+        cached_items = _read_cached_result(cache_dir, result_key)
+        if cached_items is not None:
+            meta["num_items"] = len(cached_items)
+            meta["result_cache_hit"] = True
+            timer.lap("result_cache")
+            meta["timings"] = timer.finish()
+            return cached_items, meta
+        timer.lap("result_cache")
+
+    days = list(daterange(start, end))
+    n = len(days)
+    table = DriverTable()
+    rec, lo, hi, bits, band_down, band_up, meta["interval"] = _score_days(
+        days, table, timer, room_type_code=room_type_code, impacts=impacts, stored=stored,
+        baseline=baseline, metrics=metrics, ml_model=ml_model, ml_weight=ml_weight,
+    )
+
+    # Rolling-median smoothing
+    _smooth_prices(rec, lo, hi, bits, table.bit("Smoothing"), smoothing_window, band_down, band_up)
+    first = start.toordinal()
+    items = PricingResult(room_type_code, np.arange(first, first + n), rec, lo, hi, bits, table.names)
+    timer.lap("smoothing")
+
+    meta["num_items"] = len(items)
+    if result_key is not None:
+        _write_cached_result(cache_dir, result_key, items)
+        timer.lap("result_cache")
+    meta["timings"] = timer.finish()
+    return items, meta
+
+
+def _score_days(
+    days: List[date],
+    table: DriverTable,
+    timer: StageTimer,
+    *,
+    room_type_code: str,
+    impacts: Dict[str, float],
+    stored: Dict[str, Dict] | None,
+    baseline: Dict[str, float],
+    metrics: Dict[str, Dict[str, float]],
+    ml_model: MLPriceModel | None,
+    ml_weight: float,
+) -> Tuple[List[float], List[float], List[float], List[int], List[float], List[float], str]:
+    """
+    Heuristics, ML ensemble, guardrails and bands for consecutive `days`, before smoothing.
+    Every day depends only on its own inputs, so any split of a range into chunks gives the same values.
+    Returns (price_rec, price_min, price_max, driver bits over `table`, band below, band above, interval kind).
+    """
+    # Pass 1: heuristics and ML features per day
+    heur: List[PriceOutput] = []
+    feature_rows: List[Dict[str, float]] = []
+    for d in days:
         iso = to_iso(d)
-        published_rate = baseline.get(iso)
         event_impact = impacts.get(iso, 0.0)
-        occ = None
-        pick = None
-        if iso in metrics:
-            occ = metrics[iso].get("occupancy_pct")
-            pick = metrics[iso].get("pickup_24h")
+        if stored is not None:
+            row = stored.get(iso, {})
+            published_rate, occ, pick = row.get("published_rate"), row.get("occupancy_pct"), row.get("pickup_24h")
+        else:
+            published_rate = baseline.get(iso)
+            occ = None
+            pick = None
+            if iso in metrics:
+                occ = metrics[iso].get("occupancy_pct")
+                pick = metrics[iso].get("pickup_24h")
         heur_out: PriceOutput = compute_price_for_date(
             date_str=iso,
             room_type_code=room_type_code,
@@ -228,81 +490,259 @@ def score_dates(
             pickup_24h=pick,
             event_impact=event_impact,
         )
-        price_rec = heur_out.price_rec
-        drivers = list(heur_out.drivers)
-
-        # ML inference and ensemble
+        heur.append(heur_out)
         if ml_model is not None:
-            feats = build_features_for_date(
+            feature_rows.append(build_features_for_date(
                 d=d,
                 published_rate=published_rate if published_rate else heur_out.price_rec,
                 occupancy_pct=occ,
                 pickup_24h=pick,
                 event_impact=event_impact,
-            )
+            ))
+
+    timer.lap("per_day_loop")
+
+    # ML inference for the whole range: one point predict and (if trained) one interval predict
+    ml_prices = None
+    ml_bounds = None
+    if ml_model is not None and days:
+        X = np.array([[row.get(k, 0.0) for k in ml_model.feature_order] for row in feature_rows], dtype=float)
+        try:
+            ml_prices = ml_model.predict_batch(X)
+        except Exception:
+            ml_prices = None
+        # a broken interval model only costs the quantile band (back to ±20), not the point prediction
+        if ml_prices is not None:
             try:
-                ml_price = ml_model.predict_price(feats)
-                price_rec = round(float(ml_weight) * ml_price + (1.0 - float(ml_weight)) * heur_out.price_rec, 2)
-                drivers.append("ML model")
+                ml_bounds = ml_model.predict_interval_batch(X)
             except Exception:
-                pass
+                ml_bounds = None
+    timer.lap("ml_predict")
 
-        # Guardrails based on heuristic band (slightly expanded)
+    # Pass 2: ensemble, guardrails and bands, written column-wise. Band offsets below/above
+    # price_rec are kept per day so smoothing can shift the band with the price.
+    n = len(days)
+    ml_bit, gmin_bit, gmax_bit = table.bit("ML model"), table.bit("Guardrail min"), table.bit("Guardrail max")
+    rec: List[float] = [0.0] * n
+    lo: List[float] = [0.0] * n
+    hi: List[float] = [0.0] * n
+    bits: List[int] = [0] * n
+    band_down: List[float] = [20.0] * n
+    band_up: List[float] = [20.0] * n
+    w = float(ml_weight)
+    for i in range(n):
+        heur_out = heur[i]
+        price_rec = heur_out.price_rec
+        b = table.encode(heur_out.drivers)
+        down, up = 20.0, 20.0
+
+        # ML ensemble
         guard_min = max(0.0, heur_out.price_min * 0.9)
         guard_max = heur_out.price_max * 1.1
+        if ml_prices is not None:
+            ml_price = float(ml_prices[i])
+            price_rec = round(w * ml_price + (1.0 - w) * heur_out.price_rec, 2)
+            b |= ml_bit
+            if ml_bounds is not None:
+                q_lo, q_hi = float(ml_bounds[0][i]), float(ml_bounds[1][i])
+                # the model's interval widens the guardrails and replaces the ML share of the ±20 band
+                guard_min = max(0.0, min(guard_min, q_lo))
+                guard_max = max(guard_max, q_hi)
+                down = w * max(0.0, ml_price - q_lo) + (1.0 - w) * 20.0
+                up = w * max(0.0, q_hi - ml_price) + (1.0 - w) * 20.0
+
+        # Guardrails based on heuristic band (slightly expanded)
         if price_rec < guard_min:
             price_rec = round(guard_min, 2)
-            drivers.append("Guardrail min")
+            b |= gmin_bit
         elif price_rec > guard_max:
             price_rec = round(guard_max, 2)
-            drivers.append("Guardrail max")
+            b |= gmax_bit
 
-        price_min = round(max(0.0, price_rec - 20.0), 2)
-        price_max = round(price_rec + 20.0, 2)
+        rec[i] = price_rec
+        lo[i] = round(max(0.0, price_rec - down), 2)
+        hi[i] = round(price_rec + up, 2)
+        bits[i] = b
+        band_down[i] = down
+        band_up[i] = up
 
-        items.append(PricingItem(
-            date=iso,
-            room_type_code=room_type_code,
-            price_rec=price_rec,
-            price_min=price_min,
-            price_max=price_max,
-            drivers=drivers,
-        ))
-        recs_for_smoothing.append(price_rec)
+    timer.lap("per_day_loop")
+    return rec, lo, hi, bits, band_down, band_up, "quantile" if ml_bounds is not None else "fixed"
 
-    # Rolling-median smoothing
-    if smoothing_window and smoothing_window > 1 and len(items) >= smoothing_window:
-        k = int(smoothing_window)
-        half = k // 2
-        for i in range(len(items)):
-            lo = max(0, i - half)
-            hi = min(len(items), i + half + 1)
-            window_vals = [r.price_rec for r in items[lo:hi]]
-            window_vals.sort()
-            med = window_vals[len(window_vals) // 2]
-            blended = round(0.5 * items[i].price_rec + 0.5 * float(med), 2)
-            if abs(blended - items[i].price_rec) >= 0.01:
-                items[i].price_rec = blended
-                items[i].price_min = round(max(0.0, blended - 20.0), 2)
-                items[i].price_max = round(blended + 20.0, 2)
-                items[i].drivers.append("Smoothing")
 
-    meta = {
-        "hotel_id": hotel_id,
-        "room_type_code": room_type_code,
-        "from": from_date,
-        "to": to_date,
-        "location": location,
-        "num_items": len(items),
-        "baseline_days": len(baseline),
-        "metrics_days": len(metrics),
-        "sources": sources,
-        "disable_perplexity": disable_perplexity,
-        "max_perplexity_results": max_perplexity_results,
-        "ml_loaded": bool(ml_model is not None),
-        "ml_weight": ml_weight,
-        "smoothing_window": smoothing_window,
-    }
-    return items, meta
+def _smooth_prices(
+    rec: List[float],
+    lo: List[float],
+    hi: List[float],
+    bits: List[int],
+    smoothing_bit: int,
+    smoothing_window: int,
+    band_down: List[float],
+    band_up: List[float],
+) -> None:
+    """
+    Rolling-median smoothing in place: each price is blended 50/50 with the median of its window
+    (computed over the already-smoothed earlier days), and its band moves with it.
+    """
+    if not (smoothing_window and smoothing_window > 1 and len(rec) >= smoothing_window):
+        return
+    k = int(smoothing_window)
+    half = k // 2
+    n = len(rec)
+    for i in range(n):
+        window_vals = rec[max(0, i - half):min(n, i + half + 1)]
+        window_vals.sort()
+        med = window_vals[len(window_vals) // 2]
+        blended = round(0.5 * rec[i] + 0.5 * float(med), 2)
+        if abs(blended - rec[i]) >= 0.01:
+            rec[i] = blended
+            lo[i] = round(max(0.0, blended - band_down[i]), 2)
+            hi[i] = round(blended + band_up[i], 2)
+            bits[i] |= smoothing_bit
+
+
+class _StreamingSmoother:
+    """
+    _smooth_prices over a horizon that arrives in consecutive chunks, with identical results. A day's
+    window is the `half` smoothed days before it and the raw days up to `half` after it, so each day is
+    finalized once `half` later days have arrived (or the horizon ends), and the last `half` smoothed
+    prices are carried into the next chunk. Only `half` pending days are held between chunks.
+    """
+
+    def __init__(self, smoothing_bit: int, smoothing_window: int, total_days: int):
+        k = int(smoothing_window or 0)
+        # _smooth_prices skips horizons shorter than the window; the horizon length decides here too
+        self.enabled = k > 1 and total_days >= k
+        self.half = k // 2 if self.enabled else 0
+        self.bit = smoothing_bit
+        self._history: List[float] = []
+        self._pending: Tuple[List[float], List[float], List[float], List[int], List[float], List[float]] = ([], [], [], [], [], [])
+
+    def push(
+        self,
+        rec: List[float],
+        lo: List[float],
+        hi: List[float],
+        bits: List[int],
+        band_down: List[float],
+        band_up: List[float],
+        *,
+        final: bool = False,
+    ) -> Tuple[List[float], List[float], List[float], List[int]]:
+        """
+        Add the next days; returns (price_rec, price_min, price_max, bits) of the days now finalized.
+        """
+        for col, new in zip(self._pending, (rec, lo, hi, bits, band_down, band_up)):
+            col.extend(new)
+        p_rec, p_lo, p_hi, p_bits, p_down, p_up = self._pending
+        ready = len(p_rec) if final else max(0, len(p_rec) - self.half)
+        half = self.half
+        if self.enabled:
+            history = self._history
+            for j in range(ready):
+                before = half - j
+                window_vals = (history[max(0, len(history) - before):] if before > 0 else []) + p_rec[max(0, j - half):j + half + 1]
+                window_vals.sort()
+                med = window_vals[len(window_vals) // 2]
+                blended = round(0.5 * p_rec[j] + 0.5 * float(med), 2)
+                if abs(blended - p_rec[j]) >= 0.01:
+                    p_rec[j] = blended
+                    p_lo[j] = round(max(0.0, blended - p_down[j]), 2)
+                    p_hi[j] = round(blended + p_up[j], 2)
+                    p_bits[j] |= self.bit
+            self._history = (history + p_rec[:ready])[-half:] if half else []
+        out = (p_rec[:ready], p_lo[:ready], p_hi[:ready], p_bits[:ready])
+        for col in self._pending:
+            del col[:ready]
+        return out
+
+
+def _scan_dates(
+    start: date,
+    end: date,
+    chunk_days: int,
+    on_chunk: Optional[Callable[[PricingResult], None]],
+    meta: Dict,
+    timer: StageTimer,
+    *,
+    hotel_id: int,
+    room_type_code: str,
+    impacts: Dict[str, float],
+    feature_store: "FeatureStore | None",
+    baseline: Dict[str, float],
+    metrics: Dict[str, Dict[str, float]],
+    ml_model: MLPriceModel | None,
+    ml_weight: float,
+    smoothing_window: int,
+) -> Tuple[PricingResult, Dict]:
+    # Scan mode of score_dates: one chunk of days in memory at a time. All chunks share one driver
+    # table, which only ever appends names, so earlier chunks' bitmasks stay valid.
+    table = DriverTable()
+    smoother = _StreamingSmoother(table.bit("Smoothing"), smoothing_window, (end - start).days + 1)
+    parts: List[PricingResult] = []
+    next_ordinal = start.toordinal()
+    chunks = 0
+    emitted = 0
+    chunk_start = start
+    while chunk_start <= end:
+        chunk_end = min(end, chunk_start + timedelta(days=chunk_days - 1))
+        stored = None
+        if feature_store is not None:
+            stored = feature_store.read_range(hotel_id, room_type_code, chunk_start, chunk_end)
+            version = max((r["version"] for r in stored.values()), default=None)
+            if version is not None and (meta["feature_store_version"] is None or version > meta["feature_store_version"]):
+                meta["feature_store_version"] = version
+            timer.lap("feature_store")
+        cols = _score_days(
+            list(daterange(chunk_start, chunk_end)), table, timer, room_type_code=room_type_code, impacts=impacts,
+            stored=stored, baseline=baseline, metrics=metrics, ml_model=ml_model, ml_weight=ml_weight,
+        )
+        meta["interval"] = cols[6]
+        rec, lo, hi, bits = smoother.push(*cols[:6], final=chunk_end >= end)
+        part = PricingResult(room_type_code, np.arange(next_ordinal, next_ordinal + len(rec)), rec, lo, hi, bits, table.names)
+        next_ordinal += len(part)
+        timer.lap("smoothing")
+        chunks += 1
+        if len(part):
+            emitted += len(part)
+            if on_chunk is not None:
+                on_chunk(part)
+                timer.lap("emit")
+            else:
+                parts.append(part)
+        chunk_start = chunk_end + timedelta(days=1)
+
+    meta["num_items"] = emitted
+    meta["chunk_days"] = chunk_days
+    meta["chunks"] = chunks
+    meta["timings"] = timer.finish()
+    if on_chunk is not None:
+        return PricingResult.empty(room_type_code), meta
+    return PricingResult.concat(parts, room_type_code), meta
+
+
+def _read_cached_result(cache_dir: str, key: Dict) -> PricingResult | None:
+    # results are read-only, so the cached object itself is handed out
+    mem_key = sha1_of_obj(key)
+    hit = RESULT_CACHE.get(mem_key)
+    if hit is None:
+        try:
+            data = read_json(cache_path(os.path.join(cache_dir, "results"), key))
+        except Exception:
+            data = None
+        if not data:
+            return None
+        if "columns" in data:
+            hit = PricingResult.from_columns(data["columns"])
+        else:  # per-day rows, written before results were columnar
+            hit = PricingResult.from_records(data.get("items", []), key.get("room_type_code", ""))
+        RESULT_CACHE.put(mem_key, hit)
+    return hit
 
 
+def _write_cached_result(cache_dir: str, key: Dict, items: PricingResult) -> None:
+    RESULT_CACHE.put(sha1_of_obj(key), items)
+    try:
+        write_json(cache_path(os.path.join(cache_dir, "results"), key), {"columns": items.to_columns()})
+    except Exception:
+        pass
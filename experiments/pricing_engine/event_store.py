@@ -0,0 +1,182 @@
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import Dict, List, Optional
+
+from .perplexity_adapter import DEFAULT_SOFT_TTL_SECONDS, fetch_event_impacts_detailed
+
+
+@dataclass
+class _CityEntry:
+    origin: int  # date ordinal of values[0]
+    values: List[float]
+    sources: List[Dict[str, str]] = field(default_factory=list)
+    age_seconds: Optional[float] = None
+    stale: bool = False
+    refresh_scheduled: bool = False
+    loaded_at: float = 0.0
+
+
+class CityEventStore:
+    """
+    Shared, per-city daily event impact arrays.
+    Impacts only depend on (location, date), so every hotel in a city reads the same day-indexed
+    array instead of fetching and caching per scoring call. Each city covers a fixed horizon from
+    the first of the current month and is loaded from the event cache at most once per
+    `reload_seconds`; stale or missing cache entries are refreshed in the background
+    (stale-while-revalidate), so reads never wait on the external search.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str,
+        *,
+        horizon_days: int = 400,
+        soft_ttl_seconds: float = DEFAULT_SOFT_TTL_SECONDS,
+        reload_seconds: float = 300.0,
+        max_results: int = 8,
+        disable_external: bool = False,
+    ):
+        self.cache_dir = cache_dir
+        self.horizon_days = horizon_days
+        self.soft_ttl_seconds = soft_ttl_seconds
+        self.reload_seconds = reload_seconds
+        self.max_results = max_results
+        self.disable_external = disable_external
+        self._lock = threading.Lock()
+        self._cities: Dict[str, _CityEntry] = {}
+        self.hits = 0  # reads served from a loaded city array
+        self.misses = 0  # reads that (re)loaded the city from the event cache
+
+    def _window(self, today: Optional[date] = None) -> tuple[date, date]:
+        # Anchor on the month so the cache key (and thus the refresh) is shared for a whole month
+        start = (today or date.today()).replace(day=1)
+        return start, start + timedelta(days=self.horizon_days - 1)
+
+    def _load(self, location: str, *, force_refresh: bool = False) -> _CityEntry:
+        start, end = self._window()
+        ev = fetch_event_impacts_detailed(
+            location=location,
+            start=start,
+            end=end,
+            cache_dir=self.cache_dir,
+            max_results=self.max_results,
+            disable_external=self.disable_external,
+            force_refresh=force_refresh,
+            stale_while_revalidate=not force_refresh,
+            soft_ttl_seconds=self.soft_ttl_seconds,
+        )
+        origin = start.toordinal()
+        values = [0.0] * (end.toordinal() - origin + 1)
+        for iso, v in ev.daily.items():
+            i = date.fromisoformat(iso).toordinal() - origin
+            if 0 <= i < len(values):
+                values[i] = float(v)
+        return _CityEntry(
+            origin=origin,
+            values=values,
+            sources=ev.sources,
+            age_seconds=ev.age_seconds,
+            stale=ev.stale,
+            refresh_scheduled=ev.refresh_scheduled,
+            loaded_at=time.time(),
+        )
+
+    def _entry(self, location: str) -> _CityEntry:
+        key = location.strip().lower()
+        with self._lock:
+            entry = self._cities.get(key)
+            fresh = entry is not None and (time.time() - entry.loaded_at) <= self.reload_seconds
+            if fresh:
+                self.hits += 1
+            else:
+                self.misses += 1
+        if not fresh:
+            entry = self._load(location)
+            with self._lock:
+                self._cities[key] = entry
+        return entry
+
+    def refresh(self, location: str) -> None:
+        """
+        Blocking refresh of one city (warm-up jobs / cron), then swap it into the store.
+        """
+        entry = self._load(location, force_refresh=not self.disable_external)
+        with self._lock:
+            self._cities[location.strip().lower()] = entry
+
+    def get_array(self, location: str, start: date, end: date) -> List[float]:
+        """
+        Daily impacts for [start, end]; days outside the city horizon read as 0.0.
+        """
+        entry = self._entry(location)
+        lo = start.toordinal() - entry.origin
+        hi = end.toordinal() - entry.origin
+        n = len(entry.values)
+        return [entry.values[i] if 0 <= i < n else 0.0 for i in range(lo, hi + 1)]
+
+    def get_range(self, location: str, start: date, end: date) -> Dict[str, float]:
+        vals = self.get_array(location, start, end)
+        origin = start.toordinal()
+        return {date.fromordinal(origin + i).isoformat(): v for i, v in enumerate(vals)}
+
+    def stats(self) -> Dict:
+        # same shape as LRUCache.stats(), so monitoring can treat it as one more cache
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "name": "event",
+                "size": len(self._cities),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": (self.hits / total) if total else None,
+                "evictions": 0,
+                "bytes": 0,
+                "max_bytes": None,
+            }
+
+    def info(self, location: str) -> Dict:
+        entry = self._entry(location)
+        return {
+            "sources": entry.sources,
+            "age_seconds": entry.age_seconds,
+            "stale": entry.stale,
+            "refresh_scheduled": entry.refresh_scheduled,
+        }
+
+
+_STORES: Dict[str, CityEventStore] = {}
+_STORES_LOCK = threading.Lock()
+
+
+def get_city_event_store(cache_dir: str, **kwargs) -> CityEventStore:
+    """
+    Process-wide store per cache_dir, so all hotels (and requests) in a worker share it.
+    """
+    with _STORES_LOCK:
+        store = _STORES.get(cache_dir)
+        if store is None:
+            store = CityEventStore(cache_dir, **kwargs)
+            _STORES[cache_dir] = store
+        return store
+
+
+def event_store_stats() -> Dict | None:
+    """
+    CityEventStore.stats() summed over the process-wide stores, or None if none exists yet.
+    """
+    with _STORES_LOCK:
+        stores = list(_STORES.values())
+    if not stores:
+        return None
+    merged: Dict = {"name": "event", "size": 0, "hits": 0, "misses": 0, "evictions": 0, "bytes": 0, "max_bytes": None}
+    for store in stores:
+        st = store.stats()
+        for k in ("size", "hits", "misses"):
+            merged[k] += st[k]
+    total = merged["hits"] + merged["misses"]
+    merged["hit_ratio"] = (merged["hits"] / total) if total else None
+    return merged
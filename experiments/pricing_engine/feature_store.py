@@ -0,0 +1,290 @@
+from __future__ import annotations
+
+import os
+import sqlite3
+import threading
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+
+from .engine import load_data_snapshot
+from .model import FEATURE_ORDER, TrainingData, _month_seasonality, load_training_matrix
+from .utils import daterange, ensure_dir, to_iso
+
+
+FEATURE_STORE_FILENAME = "features.sqlite"
+
+# Columns: FEATURE_ORDER, with published_rate/occupancy_pct/pickup_24h/event_impact stored as observed
+# (NULL = unknown; model defaults are applied on read), then future signals and the training label.
+# Signals not produced yet; the columns exist so ingestion can start filling them without a migration.
+FUTURE_COLUMNS = ["weather_temp_max_c", "weather_precip_mm", "event_count"]
+# Training label as read by model.load_training_matrix (its column inference is wider than the baseline's)
+TARGET_COLUMN = "target_rate"
+STORE_COLUMNS = list(FEATURE_ORDER) + FUTURE_COLUMNS + [TARGET_COLUMN]
+
+_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS feature_versions (
+    version INTEGER PRIMARY KEY AUTOINCREMENT,
+    hotel_id INTEGER NOT NULL,
+    room_type_code TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    source TEXT,
+    n_rows INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS features_daily (
+    hotel_id INTEGER NOT NULL,
+    room_type_code TEXT NOT NULL,
+    date TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    {", ".join(f"{c} REAL" for c in STORE_COLUMNS)},
+    PRIMARY KEY (hotel_id, room_type_code, date, version)
+);
+CREATE TABLE IF NOT EXISTS data_syncs (
+    hotel_id INTEGER NOT NULL,
+    room_type_code TEXT NOT NULL,
+    data_dir TEXT NOT NULL,
+    fingerprint TEXT NOT NULL,
+    synced_at TEXT NOT NULL,
+    PRIMARY KEY (hotel_id, room_type_code, data_dir)
+);
+"""
+
+
+def _calendar(iso: str) -> Dict[str, float]:
+    d = datetime.fromisoformat(iso).date()
+    dow = d.weekday()
+    return {
+        "dow": float(dow),
+        "month": float(d.month),
+        "is_weekend": 1.0 if dow in (4, 5) else 0.0,
+        "seasonality_prior": float(_month_seasonality(d.month)),
+    }
+
+
+def _as_float(v: Any) -> Optional[float]:
+    try:
+        if v is None or (isinstance(v, float) and np.isnan(v)):
+            return None
+        return float(v)
+    except Exception:
+        return None
+
+
+class FeatureStore:
+    """
+    Day-indexed features per (hotel, room type) in a local SQLite file.
+    Every ingest that changes something writes the changed days under a new version, so a read
+    `as_of` a version (or timestamp) sees each day as it was then; by default reads see the latest.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        ensure_dir(os.path.dirname(os.path.abspath(path)))
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+
+    # -------- writes --------
+    def ingest(
+        self,
+        hotel_id: int,
+        room_type_code: str,
+        days: Dict[str, Dict[str, Any]],
+        *,
+        source: str = "",
+    ) -> Optional[int]:
+        """
+        Merge partial rows ({iso date: {column: value}}) over the latest stored rows and write the
+        days that changed as a new version. Returns the version, or None if nothing changed.
+        """
+        if not days:
+            return None
+        with self._lock:
+            isos = sorted(days)
+            latest = self._read_locked(hotel_id, room_type_code, isos[0], isos[-1], None)
+            changed: List[Dict[str, Optional[float]]] = []
+            for iso in isos:
+                prev = latest.get(iso)
+                row = {c: (prev or {}).get(c) for c in STORE_COLUMNS}
+                row.update({c: _as_float(v) for c, v in days[iso].items() if c in STORE_COLUMNS})
+                row.update(_calendar(iso))
+                if prev is None or any(row[c] != prev.get(c) for c in STORE_COLUMNS):
+                    row["date"] = iso
+                    changed.append(row)
+            if not changed:
+                return None
+            cur = self._conn.cursor()
+            cur.execute("BEGIN IMMEDIATE")
+            try:
+                cur.execute(
+                    "INSERT INTO feature_versions (hotel_id, room_type_code, created_at, source, n_rows) VALUES (?, ?, ?, ?, ?)",
+                    (hotel_id, room_type_code, datetime.now().isoformat(timespec="microseconds"), source, len(changed)),
+                )
+                version = int(cur.lastrowid)
+                cols = ["hotel_id", "room_type_code", "date", "version"] + STORE_COLUMNS
+                cur.executemany(
+                    f"INSERT INTO features_daily ({', '.join(cols)}) VALUES ({', '.join('?' * len(cols))})",
+                    [(hotel_id, room_type_code, r["date"], version, *[r[c] for c in STORE_COLUMNS]) for r in changed],
+                )
+                cur.execute("COMMIT")
+            except Exception:
+                cur.execute("ROLLBACK")
+                raise
+            return version
+
+    def ingest_data_dir(self, hotel_id: int, room_type_code: str, data_dir: str) -> Optional[int]:
+        """
+        Ingest published rates, occupancy, pickup and the training label from the data files
+        (skipped while their fingerprint is unchanged since this store last ingested them; the
+        fingerprint is kept in the store, so that holds across restarts).
+        """
+        baseline, metrics, fp = load_data_snapshot(data_dir)
+        source_dir = os.path.abspath(data_dir) if data_dir else ""
+        if not fp or self._synced_fingerprint(hotel_id, room_type_code, source_dir) == fp:
+            return None
+        days: Dict[str, Dict[str, Any]] = {}
+        for iso in set(baseline) | set(metrics):
+            m = metrics.get(iso, {})
+            days[iso] = {
+                "published_rate": baseline.get(iso),
+                "occupancy_pct": m.get("occupancy_pct"),
+                "pickup_24h": m.get("pickup_24h"),
+            }
+        data = load_training_matrix(data_dir)
+        if data is not None:
+            # the same day can appear in several files; like a dict update, the last one wins
+            for iso, target in zip(data.dates.astype(str), data.y):
+                days.setdefault(iso, {})[TARGET_COLUMN] = float(target)
+        version = self.ingest(hotel_id, room_type_code, days, source=f"data:{fp}")
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO data_syncs (hotel_id, room_type_code, data_dir, fingerprint, synced_at) VALUES (?, ?, ?, ?, ?)",
+                (hotel_id, room_type_code, source_dir, fp, datetime.now().isoformat(timespec="microseconds")),
+            )
+        return version
+
+    def _synced_fingerprint(self, hotel_id: int, room_type_code: str, source_dir: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT fingerprint FROM data_syncs WHERE hotel_id = ? AND room_type_code = ? AND data_dir = ?",
+                (hotel_id, room_type_code, source_dir),
+            ).fetchone()
+        return row[0] if row else None
+
+    def ingest_event_impacts(self, hotel_id: int, room_type_code: str, start: date, end: date, impacts: Dict[str, float]) -> Optional[int]:
+        # every day of the range is written, so an event that disappeared resets to 0
+        days = {to_iso(d): {"event_impact": impacts.get(to_iso(d), 0.0)} for d in daterange(start, end)}
+        return self.ingest(hotel_id, room_type_code, days, source="events")
+
+    # -------- reads --------
+    def _resolve_as_of(self, as_of: Any) -> Optional[int]:
+        if as_of is None:
+            return None
+        if isinstance(as_of, int) or (isinstance(as_of, str) and as_of.isdigit()):
+            return int(as_of)
+        if isinstance(as_of, datetime):
+            cutoff = as_of.isoformat(timespec="microseconds")
+        elif isinstance(as_of, date):
+            cutoff = (datetime.combine(as_of, datetime.min.time()) + timedelta(days=1)).isoformat()
+        else:
+            text = str(as_of)
+            # a bare date means "as of the end of that day"
+            cutoff = (datetime.fromisoformat(text) + timedelta(days=1)).isoformat() if len(text) == 10 else text
+        row = self._conn.execute("SELECT MAX(version) FROM feature_versions WHERE created_at < ?", (cutoff,)).fetchone()
+        return int(row[0]) if row and row[0] is not None else 0
+
+    def _read_locked(self, hotel_id: int, room_type_code: str, start_iso: str, end_iso: str, max_version: Optional[int]) -> Dict[str, Dict[str, Any]]:
+        cols = ", ".join(f"f.{c}" for c in STORE_COLUMNS)
+        vfilter = "" if max_version is None else "AND version <= ?"
+        params: List[Any] = [hotel_id, room_type_code, start_iso, end_iso]
+        if max_version is not None:
+            params.append(max_version)
+        rows = self._conn.execute(
+            f"""
+            SELECT f.date, f.version, {cols}
+            FROM features_daily f
+            JOIN (
+                SELECT date, MAX(version) AS v FROM features_daily
+                WHERE hotel_id = ? AND room_type_code = ? AND date BETWEEN ? AND ? {vfilter}
+                GROUP BY date
+            ) m ON f.date = m.date AND f.version = m.v
+            WHERE f.hotel_id = ? AND f.room_type_code = ?
+            """,
+            params + [hotel_id, room_type_code],
+        ).fetchall()
+        return {r[0]: {"version": r[1], **dict(zip(STORE_COLUMNS, r[2:]))} for r in rows}
+
+    def read_range(self, hotel_id: int, room_type_code: str, start: date, end: date, as_of: Any = None) -> Dict[str, Dict[str, Any]]:
+        """
+        {iso date: row} for stored days in [start, end]; each row carries STORE_COLUMNS and its version.
+        """
+        with self._lock:
+            return self._read_locked(hotel_id, room_type_code, to_iso(start), to_iso(end), self._resolve_as_of(as_of))
+
+    def read_dates(self, hotel_id: int, room_type_code: str, dates: Iterable[str], as_of: Any = None) -> Dict[str, Dict[str, Any]]:
+        wanted = sorted({to_iso(datetime.fromisoformat(str(d)).date()) for d in dates})
+        if not wanted:
+            return {}
+        with self._lock:
+            rows = self._read_locked(hotel_id, room_type_code, wanted[0], wanted[-1], self._resolve_as_of(as_of))
+        return {iso: rows[iso] for iso in wanted if iso in rows}
+
+    def versions(self, hotel_id: int, room_type_code: str) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT version, created_at, source, n_rows FROM feature_versions WHERE hotel_id = ? AND room_type_code = ? ORDER BY version",
+                (hotel_id, room_type_code),
+            ).fetchall()
+        return [{"version": r[0], "created_at": r[1], "source": r[2], "n_rows": r[3]} for r in rows]
+
+    def training_data(self, hotel_id: int, room_type_code: str, as_of: Any = None) -> Optional[TrainingData]:
+        """
+        Training matrix over stored days with a label, built as model.build_feature_matrix does
+        (the label doubles as the published-rate feature; unknown occupancy/pickup are 0, and
+        event_impact is 0 for every day, as for file-trained models, even where the store has one).
+        None if the store has no labelled days.
+        """
+        with self._lock:
+            rows = self._read_locked(hotel_id, room_type_code, "0000-01-01", "9999-12-31", self._resolve_as_of(as_of))
+        isos = [iso for iso in sorted(rows) if (rows[iso][TARGET_COLUMN] or 0) > 0]
+        if not isos:
+            return None
+        y = np.array([rows[iso][TARGET_COLUMN] for iso in isos], dtype=float)
+        cols = {c: np.array([rows[iso][c] for iso in isos], dtype=float) for c in FEATURE_ORDER}
+        cols["published_rate"] = y
+        for c in ("occupancy_pct", "pickup_24h"):
+            cols[c] = np.where(cols[c] >= 0, cols[c], 0.0)  # NULL (NaN) compares False → 0.0
+        # past event impacts are only stored from the days the store has been running, so training
+        # on them would skew the model toward those days; file training has none either
+        cols["event_impact"] = np.zeros(len(isos))
+        X = np.column_stack([cols[c] for c in FEATURE_ORDER])
+        return TrainingData(
+            X=X,
+            y=y,
+            dates=np.array(isos, dtype="datetime64[D]"),
+            schema={"source": "feature_store", "hotel_id": str(hotel_id), "room_type_code": room_type_code},
+            files={},
+        )
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_STORES: Dict[str, FeatureStore] = {}
+_STORES_LOCK = threading.Lock()
+
+
+def get_feature_store(cache_dir: str) -> FeatureStore:
+    """
+    Process-wide store at `cache_dir/features.sqlite`.
+    """
+    path = os.path.abspath(os.path.join(cache_dir, FEATURE_STORE_FILENAME))
+    with _STORES_LOCK:
+        store = _STORES.get(path)
+        if store is None:
+            store = FeatureStore(path)
+            _STORES[path] = store
+        return store
@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+
+# Used when no hotels file is configured; matches the CLI defaults
+DEFAULT_HOTELS = [
+    {"hotel_id": 1, "location": "Dublin, Ireland", "room_types": ["DLX-QUEEN"]},
+]
+
+
+@dataclass
+class HotelConfig:
+    hotel_id: int
+    location: Optional[str] = None
+    room_types: List[str] = field(default_factory=list)
+
+
+def default_hotels_path() -> str:
+    here = os.path.dirname(os.path.abspath(__file__))
+    return os.path.abspath(os.path.join(here, "..", "hotels.json"))
+
+
+# Parsed configs per file, keyed by (size, mtime): quotes call load_hotel_configs per request,
+# so the file is re-read only when it changes
+_CONFIGS_LOCK = threading.Lock()
+_CONFIGS: Dict[str, Tuple[Optional[Tuple[int, int]], Dict[int, HotelConfig]]] = {}
+
+
+def load_hotel_configs(path: str | None = None) -> Dict[int, HotelConfig]:
+    """
+    Load hotel_id -> HotelConfig from a JSON list of {hotel_id, location, room_types}.
+    Looks at `path`, then $FORESIGHT_HOTELS_FILE, then experiments/hotels.json.
+    Cached per file until its size or mtime changes; the returned dict is a fresh copy.
+    """
+    path = path or os.getenv("FORESIGHT_HOTELS_FILE") or default_hotels_path()
+    try:
+        st = os.stat(path)
+        stamp: Optional[Tuple[int, int]] = (st.st_size, st.st_mtime_ns)
+    except OSError:
+        stamp = None
+    with _CONFIGS_LOCK:
+        cached = _CONFIGS.get(path)
+    if cached is not None and cached[0] == stamp:
+        return dict(cached[1])
+    out = _parse_hotel_configs(path)
+    with _CONFIGS_LOCK:
+        _CONFIGS[path] = (stamp, out)
+    return dict(out)
+
+
+def _parse_hotel_configs(path: str) -> Dict[int, HotelConfig]:
+    raw = DEFAULT_HOTELS
+    if path and os.path.exists(path):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                raw = json.load(f)
+        except Exception:
+            raw = DEFAULT_HOTELS
+    out: Dict[int, HotelConfig] = {}
+    for h in raw:
+        try:
+            hid = int(h["hotel_id"])
+        except Exception:
+            continue
+        out[hid] = HotelConfig(
+            hotel_id=hid,
+            location=h.get("location") or None,
+            room_types=[str(r) for r in h.get("room_types", [])],
+        )
+    return out
+
+
+def resolve_location(hotel_id: int, configs: Dict[int, HotelConfig] | None = None) -> Optional[str]:
+    cfg = (configs if configs is not None else load_hotel_configs()).get(int(hotel_id))
+    return cfg.location if cfg else None
@@ -2,25 +2,48 @@ from __future__ import annotations
 
 import json
 import os
-from dataclasses import dataclass
-from datetime import date, datetime
-from typing import Any, Dict, List, Optional, Tuple
+import pickle
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional, Tuple
 
 import numpy as np
-import pandas as pd
-from sklearn.ensemble import GradientBoostingRegressor
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import mean_absolute_error
-from sklearn.pipeline import Pipeline
-from sklearn.preprocessing import StandardScaler
-import joblib
 
+from . import registry
+from .compiled import COMPILED_FILENAME, CompiledTrees, compile_pipeline, max_abs_error
 from .utils import ensure_dir, to_iso
 
+# pandas, sklearn and joblib are imported inside the functions that train or parse data files,
+# so serving from compiled trees (and heuristics-only runs) never pays for importing them.
+if TYPE_CHECKING:
+    import pandas as pd
+    from sklearn.pipeline import Pipeline
+
 
 MODEL_FILENAME = "pricing_model.pkl"
 MODEL_META_FILENAME = "pricing_model.meta.json"
 
+# Above this many rows predict_batch uses the sklearn pipeline instead of the compiled trees (loading
+# it on first use for lightweight models). Per trainer, from benchmarks/bench_inference.py: the
+# compiled evaluator is ~10x faster on single rows but falls behind sklearn at ~190 rows for gbrt and
+# ~60 for hist, so full-range scans go to sklearn.
+COMPILED_MAX_BATCH: Dict[str, int] = {"gbrt": 128, "hist": 32}
+COMPILED_MAX_BATCH_DEFAULT = 32
+
+# Rows per chunk when streaming data files into the training matrix
+TRAINING_CHUNK_ROWS = 50_000
+
+# trainer name -> model version recorded in the meta file
+TRAINERS = {
+    "gbrt": "gbrt-v1",  # StandardScaler + GradientBoostingRegressor (original)
+    "hist": "hgb-v1",   # HistGradientBoostingRegressor, early stopping, multi-threaded
+}
+
+# Quantile models trained alongside the point model; they give the price_min/price_max band
+QUANTILES = {"q10": 0.1, "q90": 0.9}
+
 
 def _safe_float(v: Any) -> Optional[float]:
     try:
@@ -100,128 +123,720 @@ FEATURE_ORDER = [
 ]
 
 
+def _parse_dates(col: pd.Series) -> pd.Series:
+    import pandas as pd
+
+    # prefer dayfirst=True for EU-style dates; fallback to default per element
+    dts = pd.to_datetime(col, dayfirst=True, errors="coerce", format="mixed")
+    retry = dts.isna() & col.notna()
+    if retry.any():
+        dts[retry] = pd.to_datetime(col[retry], errors="coerce", format="mixed")
+    return dts
+
+
+def build_feature_matrix(
+    df: pd.DataFrame,
+    *,
+    date_col: str,
+    target_col: str,
+    occ_col: Optional[str] = None,
+    pickup_col: Optional[str] = None,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Column-wise equivalent of running `build_features_for_date` over every usable row of `df`.
+    Rows without a parseable date or a positive target are dropped; occupancy given in percent
+    (>1.5) is rescaled to [0,1]. Returns (X in FEATURE_ORDER, y, dates as datetime64[D]).
+    """
+    import pandas as pd
+
+    dts = _parse_dates(df[date_col])
+    y = pd.to_numeric(df[target_col], errors="coerce")
+    keep = (dts.notna() & y.notna() & (y > 0)).to_numpy()
+    dts = dts[keep]
+    y = y.to_numpy(dtype=float)[keep]
+
+    n = int(keep.sum())
+    if occ_col:
+        occ = pd.to_numeric(df[occ_col], errors="coerce").to_numpy(dtype=float)[keep]
+        occ = np.where(occ > 1.5, occ / 100.0, occ)
+    else:
+        occ = np.full(n, np.nan)
+    pick = pd.to_numeric(df[pickup_col], errors="coerce").to_numpy(dtype=float)[keep] if pickup_col else np.full(n, np.nan)
+
+    dow = dts.dt.dayofweek.to_numpy(dtype=float)
+    month = dts.dt.month.to_numpy(dtype=float)
+    cols = {
+        "dow": dow,
+        "month": month,
+        "is_weekend": np.isin(dow, (4.0, 5.0)).astype(float),
+        "published_rate": y,  # using historical rate as published baseline proxy
+        "occupancy_pct": np.where(occ >= 0, occ, 0.0),  # NaN compares False → 0.0
+        "pickup_24h": np.where(pick >= 0, pick, 0.0),
+        "event_impact": np.zeros(n),  # historical unknown
+        "seasonality_prior": np.array([_month_seasonality(int(m)) for m in range(13)])[month.astype(int)],
+    }
+    X = np.column_stack([cols[k] for k in FEATURE_ORDER]) if n else np.empty((0, len(FEATURE_ORDER)))
+    dates = dts.to_numpy(dtype="datetime64[ns]").astype("datetime64[D]")
+    return X, y, dates
+
+
+def make_pipeline(trainer: str = "gbrt", params: Optional[Dict[str, Any]] = None) -> Pipeline:
+    """
+    Unfitted pipeline for a trainer in TRAINERS, with optional estimator `params` (e.g. from tuning).
+    Trees don't need feature scaling, so the histogram booster skips the scaler; it early-stops
+    on an internal validation split and fits with all cores (OpenMP).
+    """
+    pipeline = _base_pipeline(trainer)
+    if params:
+        pipeline.steps[-1][1].set_params(**params)
+    return pipeline
+
+
+def make_quantile_pipeline(trainer: str, alpha: float, params: Optional[Dict[str, Any]] = None) -> Pipeline:
+    """
+    Same pipeline as make_pipeline, fitted to the `alpha` quantile (pinball loss) instead of the mean.
+    """
+    from sklearn.ensemble import HistGradientBoostingRegressor
+
+    pipeline = make_pipeline(trainer, params)
+    est = pipeline.steps[-1][1]
+    if isinstance(est, HistGradientBoostingRegressor):
+        est.set_params(loss="quantile", quantile=alpha)
+    else:
+        est.set_params(loss="quantile", alpha=alpha)
+    return pipeline
+
+
+def _base_pipeline(trainer: str) -> Pipeline:
+    from sklearn.ensemble import GradientBoostingRegressor, HistGradientBoostingRegressor
+    from sklearn.pipeline import Pipeline
+    from sklearn.preprocessing import StandardScaler
+
+    if trainer == "hist":
+        return Pipeline([
+            ("hgb", HistGradientBoostingRegressor(
+                max_iter=500,
+                learning_rate=0.1,
+                early_stopping=True,
+                validation_fraction=0.1,
+                n_iter_no_change=20,
+                random_state=42,
+            )),
+        ])
+    if trainer == "gbrt":
+        return Pipeline([
+            ("scaler", StandardScaler()),
+            ("gbrt", GradientBoostingRegressor(random_state=42)),
+        ])
+    raise ValueError(f"unknown trainer {trainer!r}; expected one of {sorted(TRAINERS)}")
+
+
+@dataclass
+class TrainingData:
+    X: np.ndarray
+    y: np.ndarray
+    dates: np.ndarray  # datetime64[D], aligned with rows of X
+    schema: Dict[str, Optional[str]]  # inferred source columns
+    files: Dict[str, Dict[str, int]]  # file name -> {size, mtime_ns} of every file read
+
+
+def _data_file_paths(data_dir: str) -> List[str]:
+    return sorted(
+        os.path.join(data_dir, f) for f in os.listdir(data_dir)
+        if f.lower().endswith(".csv") or f.lower().endswith(".xlsx")
+    )
+
+
+def _file_stamp(path: str) -> Dict[str, int]:
+    st = os.stat(path)
+    return {"size": int(st.st_size), "mtime_ns": int(st.st_mtime_ns)}
+
+
+def _read_header(path: str) -> List[Any]:
+    # column labels exactly as pandas names them (incl. mangled duplicates), without reading rows
+    import pandas as pd
+
+    if path.lower().endswith(".csv"):
+        return list(pd.read_csv(path, nrows=0).columns)
+    return list(pd.read_excel(path, nrows=0).columns)
+
+
+def _iter_file_chunks(
+    path: str, header: List[Any], usecols: List[Any], date_col: Any, chunk_rows: int,
+) -> Iterator[pd.DataFrame]:
+    """
+    Stream the `usecols` columns of one data file in frames of at most `chunk_rows` rows.
+    CSV dates are read as text and numbers by the C parser; XLSX cells come as raw values
+    (openpyxl, read-only mode). build_feature_matrix coerces both, so the result matches
+    reading the whole file with pandas.
+    """
+    import pandas as pd
+
+    if path.lower().endswith(".csv"):
+        positions = sorted(header.index(c) for c in usecols)
+        names = [header[i] for i in positions]
+        dtypes = {i: str for i in positions if header[i] == date_col}
+        for chunk in pd.read_csv(path, usecols=positions, dtype=dtypes, chunksize=chunk_rows):
+            chunk.columns = names
+            yield chunk
+        return
+
+    import openpyxl
+
+    wb = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        ws = wb.worksheets[0]
+        positions = [header.index(c) for c in usecols]
+        rows = ws.iter_rows(min_row=2, values_only=True)
+        while True:
+            block = []
+            for row in rows:
+                block.append([row[i] if i < len(row) else None for i in positions])
+                if len(block) >= chunk_rows:
+                    break
+            if not block:
+                return
+            yield pd.DataFrame(block, columns=usecols, dtype=object)
+            if len(block) < chunk_rows:
+                return
+    finally:
+        wb.close()
+
+
+class _MatrixBuilder:
+    """
+    Appends feature-matrix chunks into preallocated arrays that grow geometrically,
+    so building never holds more than the final matrix plus one chunk.
+    """
+
+    def __init__(self, capacity: int = 4096):
+        self.n = 0
+        self.X = np.empty((capacity, len(FEATURE_ORDER)))
+        self.y = np.empty(capacity)
+        self.dates = np.empty(capacity, dtype="datetime64[D]")
+
+    def add(self, X: np.ndarray, y: np.ndarray, dates: np.ndarray) -> None:
+        need = self.n + len(y)
+        if need > len(self.y):
+            cap = max(need, 2 * len(self.y))
+            self.X = self._grow(self.X, cap)
+            self.y = self._grow(self.y, cap)
+            self.dates = self._grow(self.dates, cap)
+        self.X[self.n:need] = X
+        self.y[self.n:need] = y
+        self.dates[self.n:need] = dates
+        self.n = need
+
+    def _grow(self, arr: np.ndarray, cap: int) -> np.ndarray:
+        out = np.empty((cap,) + arr.shape[1:], dtype=arr.dtype)
+        out[:self.n] = arr[:self.n]
+        return out
+
+    def finish(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        # shrink in place rather than copying the filled prefix
+        for arr, shape in ((self.X, (self.n, len(FEATURE_ORDER))), (self.y, (self.n,)), (self.dates, (self.n,))):
+            arr.resize(shape, refcheck=False)
+        return self.X, self.y, self.dates
+
+
+def load_training_matrix(
+    data_dir: str,
+    only_files: Optional[List[str]] = None,
+    chunk_rows: int = TRAINING_CHUNK_ROWS,
+    after: Optional[np.datetime64] = None,
+) -> Optional[TrainingData]:
+    """
+    Read every CSV/XLSX under `data_dir` (or just `only_files`, by name) and build the training
+    matrix, or return None if nothing usable was found. With `after`, only rows dated after it
+    are kept (filtered per chunk, so older history never accumulates in memory).
+    Columns are inferred once over the union of all file headers (as if the files were
+    concatenated); each file then streams only those columns in `chunk_rows`-row chunks into
+    the matrix, so peak memory is the matrix plus one chunk rather than every file at once.
+    """
+    if not os.path.exists(data_dir):
+        return None
+
+    headers: Dict[str, List[Any]] = {}
+    files: Dict[str, Dict[str, int]] = {}
+    for path in _data_file_paths(data_dir):
+        fname = os.path.basename(path)
+        if only_files is not None and fname not in only_files:
+            continue
+        try:
+            headers[path] = _read_header(path)
+            files[fname] = _file_stamp(path)
+        except Exception:
+            continue
+
+    if not headers:
+        return None
+
+    union: List[Any] = []
+    for cols in headers.values():
+        union.extend(c for c in cols if c not in union)
+    import pandas as pd
+
+    date_col, target_col, occ_col, pickup_col = _infer_cols(pd.DataFrame(columns=union))
+    if not date_col or not target_col:
+        return None
+
+    builder = _MatrixBuilder()
+    for path, cols in headers.items():
+        # rows from files without the date or target column would be dropped anyway
+        if date_col not in cols or target_col not in cols:
+            continue
+        usecols = [c for c in (date_col, target_col, occ_col, pickup_col) if c is not None and c in cols]
+        try:
+            for chunk in _iter_file_chunks(path, cols, usecols, date_col, chunk_rows):
+                X, y, dates = build_feature_matrix(
+                    chunk,
+                    date_col=date_col,
+                    target_col=target_col,
+                    occ_col=occ_col if occ_col in chunk.columns else None,
+                    pickup_col=pickup_col if pickup_col in chunk.columns else None,
+                )
+                if after is not None:
+                    keep = dates > after
+                    X, y, dates = X[keep], y[keep], dates[keep]
+                builder.add(X, y, dates)
+        except Exception:
+            continue
+
+    X, y, dates = builder.finish()
+    if len(y) == 0:
+        return None
+    schema = {"date": str(date_col), "target": str(target_col), "occupancy": occ_col and str(occ_col), "pickup": pickup_col and str(pickup_col)}
+    return TrainingData(X=X, y=y, dates=dates, schema=schema, files=files)
+
+
+def fit_and_evaluate(
+    X: np.ndarray,
+    y: np.ndarray,
+    trainer: str = "gbrt",
+    params: Optional[Dict[str, Any]] = None,
+) -> Tuple[Pipeline, Dict[str, Any]]:
+    """
+    Fit `trainer` on a fixed 80/20 split. Returns (pipeline, training stats for the meta file).
+    """
+    from sklearn.metrics import mean_absolute_error
+    from sklearn.model_selection import train_test_split
+
+    # Train/val split for sanity; we won't block on poor scores, but this informs metadata
+    X_tr, X_te, y_tr, y_te = train_test_split(X, y, test_size=0.2, random_state=42)
+    pipeline = make_pipeline(trainer, params)
+    t0 = time.perf_counter()
+    pipeline.fit(X_tr, y_tr)
+    train_seconds = time.perf_counter() - t0
+    y_pred = pipeline.predict(X_te)
+    mae = float(mean_absolute_error(y_te, y_pred)) if len(y_te) > 0 else None
+    est = pipeline.steps[-1][1]
+    n_estimators = getattr(est, "n_iter_", None) or getattr(est, "n_estimators_", None)
+    return pipeline, {
+        "model_type": type(est).__name__,
+        "trainer": trainer,
+        "params": dict(params or {}),
+        "mae_val": mae,
+        "n_samples": int(len(y)),
+        "n_estimators": int(n_estimators) if n_estimators is not None else None,
+        "train_seconds": round(train_seconds, 4),
+    }
+
+
+def fit_quantiles(
+    X: np.ndarray,
+    y: np.ndarray,
+    trainer: str = "gbrt",
+    params: Optional[Dict[str, Any]] = None,
+) -> Tuple[Dict[str, Pipeline], Dict[str, Any]]:
+    """
+    Fit one quantile pipeline per QUANTILES entry on the same 80/20 split as fit_and_evaluate.
+    Returns ({name: pipeline}, stats) with the validation coverage of the outer interval.
+    """
+    from sklearn.model_selection import train_test_split
+
+    X_tr, X_te, y_tr, y_te = train_test_split(X, y, test_size=0.2, random_state=42)
+    t0 = time.perf_counter()
+    fitted = {name: make_quantile_pipeline(trainer, alpha, params).fit(X_tr, y_tr) for name, alpha in QUANTILES.items()}
+    train_seconds = time.perf_counter() - t0
+    coverage = None
+    if len(y_te) > 0:
+        preds = np.vstack([fitted[name].predict(X_te) for name in QUANTILES])
+        lo, hi = preds.min(axis=0), preds.max(axis=0)
+        coverage = float(np.mean((y_te >= lo) & (y_te <= hi)))
+    return fitted, {
+        "quantiles": dict(QUANTILES),
+        "interval_coverage_val": coverage,
+        "quantile_train_seconds": round(train_seconds, 4),
+    }
+
+
+def _load_legacy(cache_dir: str) -> Optional[Tuple[Pipeline, Dict[str, Any]]]:
+    path = os.path.join(cache_dir, MODEL_FILENAME)
+    meta_path = os.path.join(cache_dir, MODEL_META_FILENAME)
+    if not os.path.exists(path) or not os.path.exists(meta_path):
+        return None
+    try:
+        import joblib
+
+        pipeline = joblib.load(path)
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        return pipeline, meta
+    except Exception:
+        return None
+
+
+def _load_compiled_quantiles(vdir: str) -> Dict[str, CompiledTrees]:
+    out: Dict[str, CompiledTrees] = {}
+    for name in QUANTILES:
+        path = os.path.join(vdir, registry.compiled_quantile_filename(name))
+        if os.path.exists(path):
+            out[name] = CompiledTrees.load(path)
+    return out
+
+
 @dataclass
 class MLPriceModel:
-    pipeline: Pipeline
+    pipeline: Optional[Pipeline]  # None when loaded lightweight (compiled trees only)
     feature_order: List[str]
     version: str = "gbrt-v1"
+    meta: Dict[str, Any] = field(default_factory=dict)  # training stats/provenance from the meta file
+    compiled: Optional[CompiledTrees] = None
+    quantiles: Dict[str, Pipeline] = field(default_factory=dict)  # QUANTILES name -> fitted pipeline
+    compiled_quantiles: Dict[str, CompiledTrees] = field(default_factory=dict)
+    # version dir the sklearn pipelines are loaded from on demand (lightweight loads only)
+    source_dir: Optional[str] = field(default=None, repr=False, compare=False)
+    _pipelines_lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False, compare=False)
 
     def predict_price(self, feature_row: Dict[str, float]) -> float:
         X = np.array([[feature_row.get(k, 0.0) for k in self.feature_order]], dtype=float)
-        y = self.pipeline.predict(X)
-        return float(y[0])
-
-    def save(self, cache_dir: str) -> None:
-        ensure_dir(cache_dir)
-        joblib.dump(self.pipeline, os.path.join(cache_dir, MODEL_FILENAME))
+        return float(self.predict_batch(X)[0])
+
+    def _use_compiled(self, n_rows: int) -> bool:
+        limit = COMPILED_MAX_BATCH.get(self.meta.get("trainer", ""), COMPILED_MAX_BATCH_DEFAULT)
+        return n_rows <= limit or not self._ensure_pipelines()
+
+    def _ensure_pipelines(self) -> bool:
+        """
+        Load the sklearn pipelines of a lightweight model (once). False if they can't be loaded.
+        """
+        if self.pipeline is not None:
+            return True
+        if self.source_dir is None:
+            return False
+        with self._pipelines_lock:
+            if self.pipeline is None:
+                try:
+                    pipeline = registry.load_pipeline(self.source_dir)
+                    self.quantiles = registry.load_quantiles(self.source_dir) or self.quantiles
+                    self.pipeline = pipeline
+                except Exception:
+                    self.source_dir = None  # don't retry on every call
+                    return False
+        return True
+
+    def predict_batch(self, X: np.ndarray) -> np.ndarray:
+        # The compiled evaluator wins on interactive-sized inputs; sklearn's Cython traversal
+        # is faster on large batches (see COMPILED_MAX_BATCH).
+        if self.compiled is not None and self._use_compiled(len(X)):
+            return self.compiled.predict(X)
+        return self.pipeline.predict(X)
+
+    @property
+    def has_intervals(self) -> bool:
+        names = set(self.compiled_quantiles) | set(self.quantiles)
+        return len(names) >= 2
+
+    def predict_interval_batch(self, X: np.ndarray) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """
+        (lower, upper) quantile predictions for every row of X, or None without quantile models.
+        Uses the compiled quantile trees when present, as predict_batch does.
+        """
+        if not self.has_intervals:
+            return None
+        compiled_ok = self._use_compiled(len(X))
+        preds = []
+        for name in sorted(set(self.compiled_quantiles) | set(self.quantiles)):
+            ct = self.compiled_quantiles.get(name)
+            pipe = self.quantiles.get(name)
+            if ct is not None and (pipe is None or compiled_ok):
+                preds.append(ct.predict(X))
+            else:
+                preds.append(pipe.predict(X))
+        stacked = np.vstack(preds)
+        # independent quantile fits can cross; the band is always [min, max]
+        return stacked.min(axis=0), stacked.max(axis=0)
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Approximate in-memory size, used to budget the engine's model cache: the compiled
+        arrays, plus the pickled size of the sklearn pipeline when it is loaded.
+        """
+        size = self.compiled.nbytes if self.compiled is not None else 0
+        size += sum(ct.nbytes for ct in self.compiled_quantiles.values())
+        for pipe in [self.pipeline, *self.quantiles.values()]:
+            if pipe is not None:
+                size += len(pickle.dumps(pipe, protocol=pickle.HIGHEST_PROTOCOL))
+        return int(size)
+
+    def compile(self, X_check: np.ndarray, tol: float = 1e-6) -> bool:
+        """
+        Flatten the pipeline for fast inference, keeping it only if it matches sklearn's
+        predictions on `X_check` to within `tol`. The outcome is recorded in meta["compiled"].
+        """
+        try:
+            compiled = compile_pipeline(self.pipeline)
+            err = max_abs_error(compiled, self.pipeline, X_check)
+        except Exception as e:
+            self.compiled = None
+            self.meta["compiled"] = {"ok": False, "error": str(e)}
+            return False
+        ok = err <= tol
+        self.compiled = compiled if ok else None
+        self.meta["compiled"] = {"ok": ok, "max_abs_err": err, "n_checked": int(len(X_check)), "nbytes": compiled.nbytes}
+        self.compiled_quantiles = {}
+        for name, pipe in self.quantiles.items():
+            try:
+                ct = compile_pipeline(pipe)
+                if max_abs_error(ct, pipe, X_check) <= tol:
+                    self.compiled_quantiles[name] = ct
+            except Exception:
+                continue
+        if self.quantiles:
+            self.meta["compiled"]["quantiles"] = sorted(self.compiled_quantiles)
+        return ok
+
+    def save(self, cache_dir: str, keep: int = registry.DEFAULT_KEEP) -> str:
+        """
+        Publish as a new version in the cache_dir model registry and make it active.
+        Returns the artifact id.
+        """
         meta = {
+            **self.meta,
             "feature_order": self.feature_order,
             "version": self.version,
         }
-        with open(os.path.join(cache_dir, MODEL_META_FILENAME), "w", encoding="utf-8") as f:
-            json.dump(meta, f, indent=2)
+        artifact_id = registry.publish(
+            cache_dir, self.pipeline, meta,
+            compiled=self.compiled,
+            quantiles=self.quantiles or None,
+            compiled_quantiles=self.compiled_quantiles or None,
+            keep=keep,
+        )
+        self.meta = {**meta, "artifact_id": artifact_id}
+        return artifact_id
 
     @staticmethod
-    def load(cache_dir: str) -> Optional["MLPriceModel"]:
-        path = os.path.join(cache_dir, MODEL_FILENAME)
-        meta_path = os.path.join(cache_dir, MODEL_META_FILENAME)
-        if not os.path.exists(path) or not os.path.exists(meta_path):
-            return None
+    def load(cache_dir: str, mmap: bool = True, lightweight: bool = False) -> Optional["MLPriceModel"]:
+        """
+        Load the active registry version, falling back to the legacy flat
+        pricing_model.pkl/.meta.json in cache_dir. With `lightweight`, only the compiled trees
+        are loaded when the version has them; the sklearn pipelines are loaded the first time a
+        batch is too large for the compiled trees to be faster.
+        """
+        if lightweight:
+            try:
+                found = registry.active_meta(cache_dir)
+                if found is not None and os.path.exists(os.path.join(found[0], COMPILED_FILENAME)):
+                    vdir, meta = found
+                    compiled_q = _load_compiled_quantiles(vdir)
+                    return MLPriceModel(
+                        pipeline=None,
+                        feature_order=meta.get("feature_order", FEATURE_ORDER),
+                        version=meta.get("version", "gbrt-v1"),
+                        meta=meta,
+                        compiled=CompiledTrees.load(os.path.join(vdir, COMPILED_FILENAME)),
+                        compiled_quantiles=compiled_q,
+                        # only fall back to quantile pipelines if some were not compiled
+                        quantiles={} if len(compiled_q) == len(meta.get("quantiles") or {}) else registry.load_quantiles(vdir, mmap=mmap),
+                        source_dir=vdir,
+                    )
+            except Exception:
+                pass
         try:
-            pipeline = joblib.load(path)
-            with open(meta_path, "r", encoding="utf-8") as f:
-                meta = json.load(f)
-            feature_order = meta.get("feature_order", FEATURE_ORDER)
-            version = meta.get("version", "gbrt-v1")
-            return MLPriceModel(pipeline=pipeline, feature_order=feature_order, version=version)
+            loaded = registry.load_active(cache_dir, mmap=mmap)
         except Exception:
-            return None
-
-    @staticmethod
-    def train_from_data_dir(data_dir: str, cache_dir: str) -> Optional["MLPriceModel"]:
-        if not os.path.exists(data_dir):
-            return None
-
-        frames: List[pd.DataFrame] = []
-        for fname in os.listdir(data_dir):
-            if fname.lower().endswith(".csv") or fname.lower().endswith(".xlsx"):
-                path = os.path.join(data_dir, fname)
-                try:
-                    df = pd.read_csv(path) if path.lower().endswith(".csv") else pd.read_excel(path)
-                    frames.append(df)
-                except Exception:
-                    continue
-
-        if not frames:
-            return None
-
-        df_all = pd.concat(frames, ignore_index=True)
-        date_col, target_col, occ_col, pickup_col = _infer_cols(df_all)
-        if not date_col or not target_col:
-            return None
-
-        rows: List[Dict[str, float]] = []
-        targets: List[float] = []
-        for _, row in df_all.iterrows():
+            loaded = None
+        compiled: Optional[CompiledTrees] = None
+        quantiles: Dict[str, Pipeline] = {}
+        compiled_q: Dict[str, CompiledTrees] = {}
+        if loaded is not None:
+            vdir = registry.version_dir(cache_dir, loaded[1].get("artifact_id", ""))
+            cpath = os.path.join(vdir, COMPILED_FILENAME)
             try:
-                # prefer dayfirst=True for EU-style dates; fallback to default
-                dts = pd.to_datetime(row[date_col], dayfirst=True, errors="coerce")
-                if pd.isna(dts):
-                    dts = pd.to_datetime(row[date_col], errors="coerce")
-                if pd.isna(dts):
-                    continue
-                d = dts.date()
+                compiled = CompiledTrees.load(cpath) if os.path.exists(cpath) else None
+                compiled_q = _load_compiled_quantiles(vdir)
             except Exception:
-                continue
-            y = _safe_float(row[target_col])
-            if y is None or y <= 0:
-                continue
-            occ = _safe_float(row[occ_col]) if occ_col else None
-            if occ is not None and occ > 1.5:
-                occ = occ / 100.0
-            pickup = _safe_float(row[pickup_col]) if pickup_col else None
-            feats = build_features_for_date(
-                d=d,
-                published_rate=y,  # using historical rate as published baseline proxy
-                occupancy_pct=occ,
-                pickup_24h=pickup,
-                event_impact=0.0,  # historical unknown
-            )
-            rows.append(feats)
-            targets.append(y)
-
-        if not rows:
+                compiled, compiled_q = None, {}
+            try:
+                quantiles = registry.load_quantiles(vdir, mmap=mmap)
+            except Exception:
+                quantiles = {}
+        else:
+            loaded = _load_legacy(cache_dir)
+        if loaded is None:
             return None
+        pipeline, meta = loaded
+        feature_order = meta.get("feature_order", FEATURE_ORDER)
+        version = meta.get("version", "gbrt-v1")
+        return MLPriceModel(
+            pipeline=pipeline, feature_order=feature_order, version=version, meta=meta,
+            compiled=compiled, quantiles=quantiles, compiled_quantiles=compiled_q,
+        )
 
-        X = np.array([[r[k] for k in FEATURE_ORDER] for r in rows], dtype=float)
-        y = np.array(targets, dtype=float)
-
-        # Train/val split for sanity; we won't block on poor scores, but this informs metadata
-        X_tr, X_te, y_tr, y_te = train_test_split(X, y, test_size=0.2, random_state=42)
-        pipeline = Pipeline([
-            ("scaler", StandardScaler()),
-            ("gbrt", GradientBoostingRegressor(random_state=42)),
-        ])
-        pipeline.fit(X_tr, y_tr)
-        y_pred = pipeline.predict(X_te)
-        mae = float(mean_absolute_error(y_te, y_pred)) if len(y_te) > 0 else None
+    @staticmethod
+    def train_from_data_dir(
+        data_dir: str,
+        cache_dir: str,
+        trainer: str = "gbrt",
+        params: Optional[Dict[str, Any]] = None,
+        extra_meta: Optional[Dict[str, Any]] = None,
+        data: Optional[TrainingData] = None,
+    ) -> Optional["MLPriceModel"]:
+        """
+        Full retrain on every file in `data_dir` (or on a prebuilt `data` matrix, e.g. from the
+        feature store), then compile and publish into the cache_dir registry.
+        """
+        data = data if data is not None else load_training_matrix(data_dir)
+        if data is None:
+            return None
 
-        model = MLPriceModel(pipeline=pipeline, feature_order=FEATURE_ORDER)
+        pipeline, stats = fit_and_evaluate(data.X, data.y, trainer, params)
+        quantiles, q_stats = fit_quantiles(data.X, data.y, trainer, params)
+        model = MLPriceModel(
+            pipeline=pipeline,
+            feature_order=FEATURE_ORDER,
+            version=TRAINERS[trainer],
+            quantiles=quantiles,
+            meta={
+                **stats,
+                **q_stats,
+                "trained_through": str(data.dates.max()),
+                "schema": data.schema,
+                "data_files": data.files,
+                "incremental_updates": [],
+                **(extra_meta or {}),
+            },
+        )
+        model.compile(data.X)
         model.save(cache_dir)
-
-        # Save simple training metrics in meta
-        try:
-            meta_path = os.path.join(cache_dir, MODEL_META_FILENAME)
-            with open(meta_path, "r", encoding="utf-8") as f:
-                meta = json.load(f)
-            meta["mae_val"] = mae
-            meta["n_samples"] = int(len(y))
-            with open(meta_path, "w", encoding="utf-8") as f:
-                json.dump(meta, f, indent=2)
-        except Exception:
-            pass
-
         return model
 
-
-
+    @staticmethod
+    def train_incremental(
+        data_dir: str,
+        cache_dir: str,
+        *,
+        trainer: str = "gbrt",
+        trailing_days: int = 90,
+        extra_estimators: int = 25,
+        drift_tolerance: float = 2.0,
+        min_rows: int = 10,
+    ) -> Tuple[Optional["MLPriceModel"], Dict[str, Any]]:
+        """
+        Nightly update: warm-start the saved model with extra estimators fitted on rows newer than
+        the previous `trained_through` plus a `trailing_days` window. Only data files that are new or
+        changed since the last run are checked for new rows; when there are some, the window is read
+        from all files (unchanged history inside it included), keeping only rows inside the window.
+        Files with nothing new are recorded beside the active version (registry.mark_seen_files)
+        instead of publishing an unchanged model. Falls back to a full retrain when there is no usable
+        previous model, the feature order or inferred source columns changed, or the previous
+        model's MAE on the new rows exceeds `drift_tolerance` x its validation MAE.
+        Returns (model, report) where report["mode"] is "incremental", "full" or "noop".
+        """
+        def full(reason: str) -> Tuple[Optional["MLPriceModel"], Dict[str, Any]]:
+            return MLPriceModel.train_from_data_dir(data_dir, cache_dir, trainer=trainer), {"mode": "full", "reason": reason}
+
+        from sklearn.ensemble import GradientBoostingRegressor, HistGradientBoostingRegressor
+        from sklearn.metrics import mean_absolute_error
+
+        prev = MLPriceModel.load(cache_dir, mmap=False)  # arrays must be writable to warm-start
+        if prev is None or "trained_through" not in prev.meta:
+            return full("no previous incremental-capable model")
+        if prev.feature_order != FEATURE_ORDER:
+            return full("feature order changed")
+        est = prev.pipeline.steps[-1][1]
+        if not isinstance(est, (GradientBoostingRegressor, HistGradientBoostingRegressor)):
+            return full(f"cannot warm-start {type(est).__name__}")
+        if not os.path.exists(data_dir):
+            return prev, {"mode": "noop", "reason": "data dir missing"}
+
+        artifact_id = prev.meta.get("artifact_id", "")
+        seen = {**prev.meta.get("data_files", {}), **registry.read_seen_files(cache_dir, artifact_id)}
+        changed = [
+            os.path.basename(p) for p in _data_file_paths(data_dir)
+            if seen.get(os.path.basename(p)) != _file_stamp(p)
+        ]
+        if not changed:
+            return prev, {"mode": "noop", "reason": "no new or changed data files"}
+
+        data = load_training_matrix(data_dir, only_files=changed)
+        if data is None:
+            return prev, {"mode": "noop", "reason": "changed files had no usable rows", "files": changed}
+        if data.schema != prev.meta.get("schema"):
+            return full("source columns changed")
+
+        trained_through = np.datetime64(prev.meta["trained_through"], "D")
+        new_mask = data.dates > trained_through
+        n_new = int(new_mask.sum())
+        if n_new == 0:
+            # the model is unchanged: remember the files without publishing a new version
+            registry.mark_seen_files(cache_dir, artifact_id, data.files)
+            return prev, {"mode": "noop", "reason": "no rows after trained_through", "files": changed}
+
+        # the window spans unchanged files too, so read it from every file (window rows only)
+        window = load_training_matrix(data_dir, after=trained_through - np.timedelta64(trailing_days, "D"))
+        if window is None or window.schema != data.schema:
+            return full("source columns changed")
+        X_w, y_w = window.X, window.y
+        if len(y_w) < min_rows:
+            # keep the files unmarked so these rows are picked up once enough have arrived
+            return prev, {"mode": "noop", "reason": f"only {len(y_w)} rows in window", "files": changed}
+
+        mae_prev = prev.meta.get("mae_val")
+        mae_new = float(mean_absolute_error(data.y[new_mask], prev.pipeline.predict(data.X[new_mask])))
+        if mae_prev is not None and mae_new > drift_tolerance * max(float(mae_prev), 1.0):
+            return full(f"drift: mae on new rows {mae_new:.3f} vs validation {float(mae_prev):.3f}")
+
+        t0 = time.perf_counter()
+        if isinstance(est, HistGradientBoostingRegressor):
+            # sklearn re-bins on every fit, so the added trees use bins from the window rows; the existing
+            # trees split on raw thresholds and predict as before. Early stopping guards the added iterations
+            est.set_params(warm_start=True, max_iter=est.n_iter_ + extra_estimators)
+            X_fit = X_w
+        else:
+            est.set_params(warm_start=True, n_estimators=est.n_estimators_ + extra_estimators)
+            # reuse the fitted scaler: refitting it would invalidate the existing trees
+            X_fit = prev.pipeline[:-1].transform(X_w) if len(prev.pipeline.steps) > 1 else X_w
+        est.fit(X_fit, y_w)
+        train_seconds = time.perf_counter() - t0
+        n_estimators = getattr(est, "n_iter_", None) or getattr(est, "n_estimators_", None)
+
+        update = {
+            "at": datetime.now().isoformat(timespec="seconds"),
+            "files": changed,
+            "rows_added": n_new,
+            "window_rows": int(len(y_w)),
+            "from": str(data.dates[new_mask].min()),
+            "to": str(data.dates[new_mask].max()),
+            "mae_new_rows_before": mae_new,
+            "n_estimators": int(n_estimators) if n_estimators is not None else None,
+            "train_seconds": round(train_seconds, 4),
+        }
+        meta = dict(prev.meta)
+        meta.update({
+            "trained_through": str(max(trained_through, data.dates.max())),
+            "data_files": {**seen, **data.files},
+            "n_samples": int(meta.get("n_samples", 0)) + n_new,
+            "n_estimators": update["n_estimators"],
+            "incremental_updates": (list(meta.get("incremental_updates", [])) + [update])[-30:],
+        })
+        # quantile models are carried over unchanged; the next full retrain refreshes them
+        model = MLPriceModel(
+            pipeline=prev.pipeline, feature_order=prev.feature_order, version=prev.version, meta=meta,
+            quantiles=prev.quantiles,
+        )
+        model.compile(data.X)
+        model.save(cache_dir)
+        return model, {"mode": "incremental", **update}
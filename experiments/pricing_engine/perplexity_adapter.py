@@ -1,15 +1,16 @@
 from __future__ import annotations
 
+import atexit
 import os
 import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import date, datetime, timedelta
-from typing import Dict, List, Tuple, Iterable
-
-try:
-    # requires PERPLEXITY_API_KEY in env
-    from perplexity import Perplexity
-except Exception:  # pragma: no cover - optional at runtime
-    Perplexity = None  # type: ignore
+from itertools import accumulate
+from typing import Any, Dict, List, Optional, Tuple, Iterable
 
 from .utils import cache_path, read_json, write_json, to_iso
 
@@ -21,6 +22,12 @@ MONTH_NAMES = (
 )
 WEEKDAY_NAMES = ("monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday")
 
+# Impact added per explicit event day (stackable) and the cap on stacked impact
+EXPLICIT_EVENT_WEIGHT = 0.3
+MAX_DAILY_IMPACT = 0.9
+# Age after which stale-while-revalidate refreshes a cached entry, unless the caller sets one
+DEFAULT_SOFT_TTL_SECONDS = 24 * 3600.0
+
 # Regexes for simple date extraction from titles like:
 # - "November 12-14, 2025"
 # - "Nov 12, 2025"
@@ -50,6 +57,17 @@ _MONTH_TO_NUM = {
 }
 
 
+@dataclass
+class EventRecord:
+    """
+    An event covering the inclusive day span [start, end] with its own impact weight.
+    """
+    start: date
+    end: date
+    weight: float = EXPLICIT_EVENT_WEIGHT
+    title: str = ""
+
+
 def _normalize_month(token: str) -> int | None:
     return _MONTH_TO_NUM.get(token.strip().lower())
 
@@ -60,39 +78,49 @@ def _clamp(d: date, start: date, end: date) -> date | None:
     return d
 
 
-def _iter_dates(start: date, end: date) -> Iterable[date]:
-    current = start
-    while current <= end:
-        yield current
-        current = current + timedelta(days=1)
-
-
-def _extract_date_spans(text: str, default_year: int, window_start: date, window_end: date) -> List[Tuple[date, date]]:
+@dataclass(frozen=True)
+class ParsedTitle:
     """
-    Extract likely date spans from a text using simple regex patterns.
-    Returned spans are clamped to [window_start, window_end] and filtered.
+    Window-independent parse of one title: raw date spans in match order plus keyword indicators.
     """
-    spans: List[Tuple[date, date]] = []
-    t = text.strip()
-    if not t:
-        return spans
+    spans: Tuple[Tuple[date, date], ...]
+    weekendish: bool
+    has_month: bool
+    has_weekday: bool
 
+
+# Bump when the patterns or keyword lists change so persisted parses are discarded
+_PARSER_VERSION = 1
+_TITLE_MEMO_FILENAME = "parsed_titles.json"
+_TITLE_MEMO_MAX = 50_000
+
+_TITLE_MEMO: "OrderedDict[Tuple[str, int], ParsedTitle]" = OrderedDict()
+_TITLE_MEMO_LOCK = threading.Lock()
+_TITLE_MEMO_LOADED: set = set()  # cache dirs whose persisted parses were merged in
+# The memo is shared by every cache dir, and each dir's file holds all of it: the generation counts
+# additions, and a dir needs saving while the generation it last saved is behind
+_TITLE_MEMO_GENERATION = 0
+_TITLE_MEMO_SAVED_GENERATION: Dict[str, int] = {}
+# Saves rewrite the whole file, so they are throttled and serialized: at most one every
+# _TITLE_MEMO_SAVE_INTERVAL seconds, one writer at a time, and a final flush at exit
+_TITLE_MEMO_SAVE_INTERVAL = float(os.getenv("FORESIGHT_TITLE_MEMO_SAVE_SECONDS", "60"))
+_TITLE_MEMO_SAVE_LOCK = threading.Lock()
+_TITLE_MEMO_LAST_SAVE: Dict[str, float] = {}
+
+
+def _raw_date_spans(t: str, default_year: int) -> List[Tuple[date, date]]:
+    spans: List[Tuple[date, date]] = []
     for p in _PATTERNS:
         for m in p.finditer(t):
             try:
                 # Pattern-dependent group interpretation
-                g = [g for g in m.groups() if g is not None]
-                # Try to map the match to (start_date, end_date)
                 if p is _PATTERNS[0]:
                     # "<Mon> <d> [, <yyyy>]"
                     mon_raw, day_str, year_str = m.groups()
                     mon = _normalize_month(mon_raw)
-                    day = int(day_str)
                     year = int(year_str) if year_str else default_year
-                    d = date(year, mon or 1, day)
-                    d = _clamp(d, window_start, window_end)
-                    if d:
-                        spans.append((d, d))
+                    d = date(year, mon or 1, int(day_str))
+                    spans.append((d, d))
                 elif p is _PATTERNS[1]:
                     # "<Mon> <d1>-<d2> [, <yyyy>]"
                     mon_raw, d1_str, d2_str, year_str = m.groups()
@@ -100,12 +128,7 @@ def _extract_date_spans(text: str, default_year: int, window_start: date, window
                     d1 = int(d1_str)
                     d2 = int(d2_str)
                     year = int(year_str) if year_str else default_year
-                    start_d = date(year, mon or 1, min(d1, d2))
-                    end_d = date(year, mon or 1, max(d1, d2))
-                    start_d = _clamp(start_d, window_start, window_end)
-                    end_d = _clamp(end_d, window_start, window_end)
-                    if start_d and end_d:
-                        spans.append((start_d, end_d))
+                    spans.append((date(year, mon or 1, min(d1, d2)), date(year, mon or 1, max(d1, d2))))
                 elif p is _PATTERNS[2]:
                     # "<d1>-<d2> <Mon> [<yyyy>]"
                     d1_str, d2_str, mon_raw, year_str = m.groups()
@@ -113,33 +136,139 @@ def _extract_date_spans(text: str, default_year: int, window_start: date, window
                     d1 = int(d1_str)
                     d2 = int(d2_str)
                     year = int(year_str) if year_str else default_year
-                    start_d = date(year, mon or 1, min(d1, d2))
-                    end_d = date(year, mon or 1, max(d1, d2))
-                    start_d = _clamp(start_d, window_start, window_end)
-                    end_d = _clamp(end_d, window_start, window_end)
-                    if start_d and end_d:
-                        spans.append((start_d, end_d))
+                    spans.append((date(year, mon or 1, min(d1, d2)), date(year, mon or 1, max(d1, d2))))
                 else:
                     # "<d> <Mon> [<yyyy>]"
                     day_str, mon_raw, year_str = m.groups()
                     mon = _normalize_month(mon_raw)
-                    day = int(day_str)
                     year = int(year_str) if year_str else default_year
-                    d = date(year, mon or 1, day)
-                    d = _clamp(d, window_start, window_end)
-                    if d:
-                        spans.append((d, d))
+                    d = date(year, mon or 1, int(day_str))
+                    spans.append((d, d))
             except Exception:
                 # Ignore parsing errors for any particular match
                 continue
+    return spans
+
+
+def parse_title(text: str, default_year: int) -> ParsedTitle:
+    """
+    Parse a title once per (title, default_year); repeated titles across overlapping windows and
+    refreshes are served from an in-process memo (persisted next to the event cache).
+    """
+    global _TITLE_MEMO_GENERATION
+    key = (text, int(default_year))
+    with _TITLE_MEMO_LOCK:
+        hit = _TITLE_MEMO.get(key)
+        if hit is not None:
+            _TITLE_MEMO.move_to_end(key)
+            return hit
+    t = text.strip()
+    lowered = t.lower()
+    parsed = ParsedTitle(
+        spans=tuple(_raw_date_spans(t, default_year)) if t else (),
+        weekendish=any(w in lowered for w in WEEKEND_WORDS),
+        has_month=any(m in lowered for m in MONTH_NAMES),
+        has_weekday=any(wd in lowered for wd in WEEKDAY_NAMES),
+    )
+    with _TITLE_MEMO_LOCK:
+        _TITLE_MEMO[key] = parsed
+        _TITLE_MEMO_GENERATION += 1
+        while len(_TITLE_MEMO) > _TITLE_MEMO_MAX:
+            _TITLE_MEMO.popitem(last=False)
+    return parsed
+
+
+def load_title_memo(cache_dir: str) -> None:
+    """
+    Merge persisted title parses from `cache_dir` into the in-process memo (once per directory).
+    """
+    global _TITLE_MEMO_GENERATION
+    with _TITLE_MEMO_LOCK:
+        if cache_dir in _TITLE_MEMO_LOADED:
+            return
+        _TITLE_MEMO_LOADED.add(cache_dir)
+    try:
+        data = read_json(os.path.join(cache_dir, _TITLE_MEMO_FILENAME))
+    except Exception:
+        data = None
+    if not data or data.get("version") != _PARSER_VERSION:
+        return
+    with _TITLE_MEMO_LOCK:
+        added = 0
+        for row in data.get("entries", []):
+            try:
+                title, year, spans, flags = row
+                key = (title, int(year))
+                if key not in _TITLE_MEMO:
+                    _TITLE_MEMO[key] = ParsedTitle(
+                        spans=tuple((date.fromisoformat(s), date.fromisoformat(e)) for s, e in spans),
+                        weekendish=bool(flags[0]),
+                        has_month=bool(flags[1]),
+                        has_weekday=bool(flags[2]),
+                    )
+                    added += 1
+            except Exception:
+                continue
+        if added:
+            _TITLE_MEMO_GENERATION += 1  # other dirs' files lack these
+
+
+def save_title_memo(cache_dir: str, *, force: bool = False) -> None:
+    """
+    Persist the memo to `cache_dir` if it gained entries since this directory was last saved, at
+    most once per _TITLE_MEMO_SAVE_INTERVAL per directory (unless `force`). A save already in
+    progress is not waited for: the directory stays dirty and the next call (or the exit flush)
+    writes it. Written to a temp file, then renamed.
+    """
+    if _TITLE_MEMO_SAVED_GENERATION.get(cache_dir, 0) >= _TITLE_MEMO_GENERATION:
+        return
+    if not force and time.monotonic() - _TITLE_MEMO_LAST_SAVE.get(cache_dir, float("-inf")) < _TITLE_MEMO_SAVE_INTERVAL:
+        return
+    if not _TITLE_MEMO_SAVE_LOCK.acquire(blocking=force):
+        return
+    try:
+        with _TITLE_MEMO_LOCK:
+            previous = _TITLE_MEMO_SAVED_GENERATION.get(cache_dir, 0)
+            if previous >= _TITLE_MEMO_GENERATION:
+                return
+            entries = [
+                [title, year, [[to_iso(s), to_iso(e)] for s, e in p.spans], [p.weekendish, p.has_month, p.has_weekday]]
+                for (title, year), p in _TITLE_MEMO.items()
+            ]
+            _TITLE_MEMO_SAVED_GENERATION[cache_dir] = _TITLE_MEMO_GENERATION
+        _TITLE_MEMO_LAST_SAVE[cache_dir] = time.monotonic()
+        path = os.path.join(cache_dir, _TITLE_MEMO_FILENAME)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            write_json(tmp, {"version": _PARSER_VERSION, "entries": entries})
+            os.replace(tmp, path)
+        except Exception:
+            with _TITLE_MEMO_LOCK:
+                _TITLE_MEMO_SAVED_GENERATION[cache_dir] = previous  # retry on a later call
+    finally:
+        _TITLE_MEMO_SAVE_LOCK.release()
+
+
+@atexit.register
+def _flush_title_memos() -> None:
+    for cache_dir in list(_TITLE_MEMO_LOADED):
+        save_title_memo(cache_dir, force=True)
+
 
-    # Merge overlapping/adjacent spans
-    if not spans:
-        return spans
-    spans.sort(key=lambda s: (s[0], s[1]))
+def _clamp_spans(spans: Iterable[Tuple[date, date]], window_start: date, window_end: date) -> List[Tuple[date, date]]:
+    """
+    Keep spans whose endpoints both fall inside the window, then merge overlapping/adjacent ones.
+    """
+    kept: List[Tuple[date, date]] = [
+        (s, e) for s, e in spans
+        if _clamp(s, window_start, window_end) and _clamp(e, window_start, window_end)
+    ]
+    if not kept:
+        return kept
+    kept.sort(key=lambda s: (s[0], s[1]))
     merged: List[Tuple[date, date]] = []
-    cur_s, cur_e = spans[0]
-    for s, e in spans[1:]:
+    cur_s, cur_e = kept[0]
+    for s, e in kept[1:]:
         if s <= (cur_e + timedelta(days=1)):
             cur_e = max(cur_e, e)
         else:
@@ -149,19 +278,140 @@ def _extract_date_spans(text: str, default_year: int, window_start: date, window
     return merged
 
 
-def _parse_indicators(text: str) -> Dict[str, bool]:
-    t = text.lower()
-    has_weekendish = any(w in t for w in WEEKEND_WORDS)
-    has_month = any(m in t for m in MONTH_NAMES)
-    has_weekday = any(wd in t for wd in WEEKDAY_NAMES)
-    return {
-        "weekendish": has_weekendish,
-        "has_month": has_month,
-        "has_weekday": has_weekday,
-    }
+@dataclass
+class EventImpacts:
+    """
+    Daily impacts plus cache freshness, as returned by `fetch_event_impacts_detailed`.
+    `age_seconds` is None when the result did not come from the cache.
+    """
+    daily: Dict[str, float]
+    sources: List[Dict[str, str]]
+    age_seconds: Optional[float] = None
+    stale: bool = False
+    refresh_scheduled: bool = False
 
 
-def fetch_event_impacts(
+# Background refreshes for stale-while-revalidate, de-duplicated per cache file
+_REFRESH_LOCK = threading.Lock()
+_REFRESH_INFLIGHT: Dict[str, Future] = {}
+_REFRESH_EXECUTOR: Optional[ThreadPoolExecutor] = None
+
+
+_PERPLEXITY_CLS: Any = None  # resolved on first use; False once the SDK is known to be missing
+
+
+def _perplexity_class() -> Any:
+    """
+    The Perplexity SDK client class, imported only when an external search is about to run
+    (None if the SDK is not installed).
+    """
+    global _PERPLEXITY_CLS
+    if _PERPLEXITY_CLS is None:
+        try:
+            # requires PERPLEXITY_API_KEY in env
+            from perplexity import Perplexity
+            _PERPLEXITY_CLS = Perplexity
+        except Exception:  # pragma: no cover - optional at runtime
+            _PERPLEXITY_CLS = False
+    return _PERPLEXITY_CLS or None
+
+
+def _external_available(disable_external: bool) -> bool:
+    return not disable_external and bool(os.getenv("PERPLEXITY_API_KEY")) and _perplexity_class() is not None
+
+
+def _entry_age_seconds(cpath: str, cached: Dict) -> float:
+    fetched_at = cached.get("fetched_at")
+    if fetched_at is None:
+        # entries written before fetched_at was recorded: fall back to file mtime
+        fetched_at = os.path.getmtime(cpath)
+    return max(0.0, time.time() - float(fetched_at))
+
+
+def _search_and_store(
+    *,
+    location: str,
+    start: date,
+    end: date,
+    cpath: str,
+    max_results: int,
+    events: List[EventRecord],
+    cache_dir: Optional[str] = None,
+) -> Optional[Tuple[Dict[str, float], List[Dict[str, str]]]]:
+    sources: List[Dict[str, str]] = []
+    try:
+        client = _perplexity_class()()
+        query = f"major public events in {location} between {to_iso(start)} and {to_iso(end)} that could increase hotel demand"
+        search = client.search.create(query=query, max_results=max_results)
+        for r in getattr(search, "results", []) or []:
+            title = getattr(r, "title", "") or ""
+            url = getattr(r, "url", "") or ""
+            sources.append({"title": title, "url": url})
+    except Exception:
+        # On any API or SDK error, fall back to empty signals
+        return None
+
+    daily = _build_daily(sources, start, end, events, cache_dir)
+    write_json(cpath, {"daily": daily, "sources": sources, "fetched_at": time.time()})
+    return daily, sources
+
+
+def _schedule_refresh(cpath: str, **kwargs) -> bool:
+    """
+    Run `_search_and_store` in the background unless a refresh for `cpath` is already in flight.
+    Returns True if this call scheduled a new refresh.
+    """
+    global _REFRESH_EXECUTOR
+    with _REFRESH_LOCK:
+        if cpath in _REFRESH_INFLIGHT:
+            return False
+        if _REFRESH_EXECUTOR is None:
+            _REFRESH_EXECUTOR = ThreadPoolExecutor(max_workers=2, thread_name_prefix="event-refresh")
+        fut = _REFRESH_EXECUTOR.submit(_search_and_store, cpath=cpath, **kwargs)
+        _REFRESH_INFLIGHT[cpath] = fut
+
+    def _done(_f: Future) -> None:
+        with _REFRESH_LOCK:
+            _REFRESH_INFLIGHT.pop(cpath, None)
+
+    fut.add_done_callback(_done)
+    return True
+
+
+def wait_for_refreshes(timeout: Optional[float] = None) -> None:
+    """
+    Block until background refreshes scheduled so far have finished (CLI/tests).
+    """
+    with _REFRESH_LOCK:
+        pending = list(_REFRESH_INFLIGHT.values())
+    for fut in pending:
+        try:
+            fut.result(timeout=timeout)
+        except Exception:
+            continue
+
+
+def record_event_sources(
+    *,
+    location: str,
+    start: date,
+    end: date,
+    cache_dir: str,
+    sources: List[Dict[str, str]],
+    max_results: int = 8,
+) -> Dict[str, float]:
+    """
+    Store `sources` (search results: [{title, url}]) as the cache entry a search for this range
+    would have written, so later calls replay them with `disable_external=True` (benchmarks,
+    incident replay). Returns the daily impacts built from them.
+    """
+    key = {"location": location, "start": to_iso(start), "end": to_iso(end), "max_results": max_results}
+    daily = _build_daily(sources, start, end, [], cache_dir)
+    write_json(cache_path(cache_dir, key), {"daily": daily, "sources": sources, "fetched_at": time.time()})
+    return daily
+
+
+def fetch_event_impacts_detailed(
     *,
     location: str,
     start: date,
@@ -170,14 +420,15 @@ def fetch_event_impacts(
     max_results: int = 8,
     disable_external: bool = False,
     force_refresh: bool = False,
-) -> Tuple[Dict[str, float], List[Dict[str, str]]]:
+    events: Optional[List[EventRecord]] = None,
+    stale_while_revalidate: bool = False,
+    soft_ttl_seconds: Optional[float] = None,
+) -> EventImpacts:
     """
-    Query Perplexity for events likely to impact hotel demand, and map to a daily impact score in [0,1].
-    Improvements over previous version:
-      - Safe import and graceful fallback if SDK or API key is missing
-      - Basic extraction of explicit date spans from result titles
-      - Prefer explicit dates (score≈0.6–0.8) over generic weekend boosts (0.3–0.5)
-      - Caching keyed by (location, start, end, max_results)
+    Same as `fetch_event_impacts`, but also reports cache age and supports stale-while-revalidate:
+    with `stale_while_revalidate=True` cached impacts are served immediately and, once older than
+    `soft_ttl_seconds` (default DEFAULT_SOFT_TTL_SECONDS), a background refresh is scheduled. A cache miss in this mode returns empty
+    signals and schedules the search, so the caller never waits on the external API.
     """
     key = {
         "location": location,
@@ -185,55 +436,146 @@ def fetch_event_impacts(
         "end": to_iso(end),
         "max_results": max_results,
     }
+    if events:
+        key["events"] = [(to_iso(e.start), to_iso(e.end), e.weight) for e in events]
     cpath = cache_path(cache_dir, key)
+    search_kwargs = dict(
+        location=location, start=start, end=end, max_results=max_results, events=events or [], cache_dir=cache_dir,
+    )
+
     if not force_refresh:
         cached = read_json(cpath)
         if cached:
-            return cached.get("daily", {}), cached.get("sources", [])
+            age = _entry_age_seconds(cpath, cached)
+            stale = age > (soft_ttl_seconds if soft_ttl_seconds is not None else DEFAULT_SOFT_TTL_SECONDS)
+            scheduled = False
+            if stale and stale_while_revalidate and _external_available(disable_external):
+                scheduled = _schedule_refresh(cpath, **search_kwargs)
+            return EventImpacts(
+                daily=cached.get("daily", {}),
+                sources=cached.get("sources", []),
+                age_seconds=age,
+                stale=stale,
+                refresh_scheduled=scheduled,
+            )
 
-    if disable_external or (Perplexity is None) or (not os.getenv("PERPLEXITY_API_KEY")):
-        return {}, []
+    if not _external_available(disable_external):
+        # Caller-supplied events still apply; don't cache so a later search can fill in sources
+        if events:
+            return EventImpacts(daily=_build_daily([], start, end, events), sources=[])
+        return EventImpacts(daily={}, sources=[])
 
-    sources: List[Dict[str, str]] = []
-    try:
-        client = Perplexity()
-        query = f"major public events in {location} between {to_iso(start)} and {to_iso(end)} that could increase hotel demand"
-        search = client.search.create(query=query, max_results=max_results)
-        for r in getattr(search, "results", []) or []:
-            title = getattr(r, "title", "") or ""
-            url = getattr(r, "url", "") or ""
-            sources.append({"title": title, "url": url})
-    except Exception:
-        # On any API or SDK error, fall back to empty signals
-        return {}, []
-
-    # Build impacts with preference for explicit date spans in titles
-    daily: Dict[str, float] = {to_iso(d): 0.0 for d in _iter_dates(start, end)}
-
-    # 1) Explicit spans → stronger signals (0.6–0.8)
-    for src in sources:
-        spans = _extract_date_spans(src.get("title", ""), default_year=start.year, window_start=start, window_end=end)
-        for s, e in spans:
-            for d in _iter_dates(s, e):
-                # stack multiple events but clamp to 0.9
-                key_iso = to_iso(d)
-                daily[key_iso] = min(0.9, round(daily[key_iso] + 0.3, 2))
-
-    # 2) If no explicit spans found at all, fall back to weekend-ish signals
-    if all(v == 0.0 for v in daily.values()):
-        indicators = [_parse_indicators(src.get("title", "")) for src in sources]
-        found_weekendish = any(ind["weekendish"] for ind in indicators)
-        found_rich_context = any(ind["has_month"] and ind["has_weekday"] for ind in indicators)
-        for d in _iter_dates(start, end):
-            iso = to_iso(d)
-            if d.weekday() in (4, 5, 6):  # Fri/Sat/Sun
-                if found_rich_context:
-                    daily[iso] = 0.5
-                elif found_weekendish:
-                    daily[iso] = 0.3
-
-    daily = {k: round(v, 2) for k, v in daily.items()}
-    write_json(cpath, {"daily": daily, "sources": sources})
-    return daily, sources
+    if stale_while_revalidate and not force_refresh:
+        scheduled = _schedule_refresh(cpath, **search_kwargs)
+        daily = _build_daily([], start, end, events) if events else {}
+        return EventImpacts(daily=daily, sources=[], refresh_scheduled=scheduled)
+
+    result = _search_and_store(cpath=cpath, **search_kwargs)
+    if result is None:
+        return EventImpacts(daily={}, sources=[])
+    return EventImpacts(daily=result[0], sources=result[1], age_seconds=0.0)
+
+
+def fetch_event_impacts(
+    *,
+    location: str,
+    start: date,
+    end: date,
+    cache_dir: str,
+    max_results: int = 8,
+    disable_external: bool = False,
+    force_refresh: bool = False,
+    events: Optional[List[EventRecord]] = None,
+) -> Tuple[Dict[str, float], List[Dict[str, str]]]:
+    """
+    Query Perplexity for events likely to impact hotel demand, and map to a daily impact score in [0,1].
+    Improvements over previous version:
+      - Safe import and graceful fallback if SDK or API key is missing
+      - Basic extraction of explicit date spans from result titles
+      - Prefer explicit dates (score≈0.6–0.8) over generic weekend boosts (0.3–0.5)
+      - Caching keyed by (location, start, end, max_results)
+      - Optional caller-supplied `events` (e.g. from a calendar feed) stacked with their own weights
+    """
+    res = fetch_event_impacts_detailed(
+        location=location,
+        start=start,
+        end=end,
+        cache_dir=cache_dir,
+        max_results=max_results,
+        disable_external=disable_external,
+        force_refresh=force_refresh,
+        events=events,
+    )
+    return res.daily, res.sources
+
+
+def _build_daily(
+    sources: List[Dict[str, str]],
+    start: date,
+    end: date,
+    events: List[EventRecord],
+    cache_dir: Optional[str] = None,
+) -> Dict[str, float]:
+    if cache_dir:
+        load_title_memo(cache_dir)
+    parsed = [(src.get("title", ""), parse_title(src.get("title", ""), start.year)) for src in sources]
+    if cache_dir:
+        save_title_memo(cache_dir)
 
+    # Explicit spans in titles → stronger signals (0.6–0.8 once stacked)
+    records: List[EventRecord] = list(events)
+    for title, p in parsed:
+        for s, e in _clamp_spans(p.spans, start, end):
+            records.append(EventRecord(start=s, end=e, title=title))
 
+    # If no explicit spans found at all, fall back to weekend-ish signals
+    fallback = 0.0
+    if not any(r.weight > 0 and r.start <= end and r.end >= start for r in records):
+        if any(p.has_month and p.has_weekday for _, p in parsed):
+            fallback = 0.5
+        elif any(p.weekendish for _, p in parsed):
+            fallback = 0.3
+    return build_daily_impacts(records, start, end, weekend_fallback=fallback)
+
+
+def build_daily_impacts(
+    records: Iterable[EventRecord],
+    start: date,
+    end: date,
+    *,
+    weekend_fallback: float = 0.0,
+    cap: float = MAX_DAILY_IMPACT,
+) -> Dict[str, float]:
+    """
+    Map event records onto a daily impact series over [start, end].
+    Weights are accumulated with a difference array over day ordinals, so the cost is
+    O(events + days) regardless of how long each event runs. Stacked impact is clamped
+    to [0, cap]; days not covered by any event get `weekend_fallback` on Fri/Sat/Sun.
+    """
+    origin = start.toordinal()
+    n = end.toordinal() - origin + 1
+    if n <= 0:
+        return {}
+    diff = [0.0] * (n + 1)
+    covered = [0] * (n + 1)
+    for r in records:
+        lo = max(r.start.toordinal(), origin) - origin
+        hi = min(r.end.toordinal() - origin, n - 1)
+        if lo > hi or r.weight <= 0:
+            continue
+        diff[lo] += r.weight
+        diff[hi + 1] -= r.weight
+        covered[lo] += 1
+        covered[hi + 1] -= 1
+
+    daily: Dict[str, float] = {}
+    first_dow = start.weekday()
+    for i, (total, count) in enumerate(zip(accumulate(diff[:n]), accumulate(covered[:n]))):
+        if count > 0:
+            v = min(cap, max(0.0, round(total, 2)))
+        elif weekend_fallback and (first_dow + i) % 7 in (4, 5, 6):  # Fri/Sat/Sun
+            v = round(weekend_fallback, 2)
+        else:
+            v = 0.0
+        daily[date.fromordinal(origin + i).isoformat()] = v
+    return daily
@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import cProfile
+import io
+import pstats
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, Optional
+
+
+StageHook = Callable[[str, float], None]
+
+
+class StageTimer:
+    """
+    Wall-clock stage timings in milliseconds. Each `lap(stage)` charges the time since the previous
+    lap (or construction) to `stage`; repeated stages accumulate. An optional hook receives every
+    (stage, ms) as it is recorded, e.g. to feed metrics or a sampling profiler.
+    """
+
+    def __init__(self, hook: Optional[StageHook] = None):
+        self.timings: Dict[str, float] = {}
+        self._hook = hook
+        self._start = self._last = time.perf_counter()
+
+    def lap(self, stage: str) -> float:
+        now = time.perf_counter()
+        ms = (now - self._last) * 1000.0
+        self._last = now
+        self.timings[stage] = round(self.timings.get(stage, 0.0) + ms, 3)
+        if self._hook is not None:
+            try:
+                self._hook(stage, ms)
+            except Exception:
+                pass  # instrumentation must never break scoring
+        return ms
+
+    def finish(self) -> Dict[str, float]:
+        self.timings["total"] = round((time.perf_counter() - self._start) * 1000.0, 3)
+        return self.timings
+
+
+@contextmanager
+def cprofile_to(path: str, *, top: int = 0, sort: str = "cumulative") -> Iterator[cProfile.Profile]:
+    """
+    Run the block under cProfile and dump the stats to `path` (open with `python -m pstats` or snakeviz).
+    With `top`, also print the `top` heaviest functions.
+    """
+    prof = cProfile.Profile()
+    prof.enable()
+    try:
+        yield prof
+    finally:
+        prof.disable()
+        prof.dump_stats(path)
+        if top:
+            buf = io.StringIO()
+            pstats.Stats(prof, stream=buf).sort_stats(sort).print_stats(top)
+            print(buf.getvalue())
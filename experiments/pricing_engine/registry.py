@@ -0,0 +1,288 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import shutil
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Tuple
+
+from .compiled import COMPILED_FILENAME
+from .utils import ensure_dir, read_json
+
+
+# Layout under <cache_dir>/models:
+#   versions/<artifact_id>/pricing_model.pkl + pricing_model.meta.json   (immutable)
+#                          [+ compiled.npz, flattened trees for fast inference]
+#                          [+ quantiles.pkl + compiled_<name>.npz, prediction-interval models]
+#   ACTIVE        artifact id currently served (swapped atomically)
+#   HISTORY.json  previously active ids, newest last (for rollback)
+REGISTRY_DIRNAME = "models"
+ARTIFACT_FILENAME = "pricing_model.pkl"
+ARTIFACT_META_FILENAME = "pricing_model.meta.json"
+QUANTILES_FILENAME = "quantiles.pkl"
+SEEN_FILES_FILENAME = "seen_files.json"
+DEFAULT_KEEP = 5
+# Per-(hotel, room type) models are full registries of their own under
+# <cache_dir>/shards/<hotel_id>/<room_type_code>/models; <cache_dir>/models stays the global fallback.
+SHARDS_DIRNAME = "shards"
+
+
+def registry_dir(cache_dir: str) -> str:
+    return os.path.join(cache_dir, REGISTRY_DIRNAME)
+
+
+def shard_dir(cache_dir: str, hotel_id: int | str, room_type_code: str) -> str:
+    """
+    Cache dir holding the registry for one (hotel, room type) shard.
+    """
+    safe_room = re.sub(r"[^A-Za-z0-9_.-]", "_", str(room_type_code)) or "_"
+    return os.path.join(cache_dir, SHARDS_DIRNAME, str(hotel_id), safe_room)
+
+
+def list_shards(cache_dir: str) -> List[Dict[str, Any]]:
+    """
+    Shards with an active model: [{hotel_id, room_type_code, active, cache_dir}].
+    """
+    root = os.path.join(cache_dir, SHARDS_DIRNAME)
+    out: List[Dict[str, Any]] = []
+    if not os.path.isdir(root):
+        return out
+    for hotel in sorted(os.listdir(root)):
+        hdir = os.path.join(root, hotel)
+        if not os.path.isdir(hdir):
+            continue
+        for room in sorted(os.listdir(hdir)):
+            sdir = os.path.join(hdir, room)
+            active = active_version(sdir)
+            if active:
+                out.append({"hotel_id": hotel, "room_type_code": room, "active": active, "cache_dir": sdir})
+    return out
+
+
+def _versions_dir(cache_dir: str) -> str:
+    return os.path.join(registry_dir(cache_dir), "versions")
+
+
+def version_dir(cache_dir: str, artifact_id: str) -> str:
+    return os.path.join(_versions_dir(cache_dir), artifact_id)
+
+
+def _atomic_write_text(path: str, text: str) -> None:
+    tmp = f"{path}.{uuid.uuid4().hex}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def active_version(cache_dir: str) -> Optional[str]:
+    path = os.path.join(registry_dir(cache_dir), "ACTIVE")
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            vid = f.read().strip()
+    except OSError:
+        return None
+    return vid or None
+
+
+def _history(cache_dir: str) -> List[str]:
+    data = read_json(os.path.join(registry_dir(cache_dir), "HISTORY.json"))
+    return list(data.get("history", [])) if data else []
+
+
+def set_active(cache_dir: str, artifact_id: str) -> None:
+    """
+    Point ACTIVE at an existing version. Readers see either the old or the new id, never a mix.
+    """
+    if not os.path.exists(os.path.join(version_dir(cache_dir, artifact_id), ARTIFACT_FILENAME)):
+        raise FileNotFoundError(f"model version {artifact_id} not found")
+    prev = active_version(cache_dir)
+    if prev == artifact_id:
+        return
+    history = _history(cache_dir)
+    if prev:
+        history.append(prev)
+    _atomic_write_text(os.path.join(registry_dir(cache_dir), "HISTORY.json"), json.dumps({"history": history[-50:]}))
+    _atomic_write_text(os.path.join(registry_dir(cache_dir), "ACTIVE"), artifact_id)
+
+
+def publish(
+    cache_dir: str,
+    pipeline: Any,
+    meta: Dict[str, Any],
+    *,
+    compiled: Any = None,
+    quantiles: Optional[Dict[str, Any]] = None,
+    compiled_quantiles: Optional[Dict[str, Any]] = None,
+    keep: int = DEFAULT_KEEP,
+    activate: bool = True,
+) -> str:
+    """
+    Write a new immutable, content-addressed version and (by default) promote it.
+    The artifact is staged in a temp dir and renamed into place, so a concurrent load never
+    sees a half-written file. Returns the artifact id.
+    """
+    import joblib  # imported per use, so reading compiled models never loads joblib/sklearn
+
+    ensure_dir(_versions_dir(cache_dir))
+    staging = os.path.join(registry_dir(cache_dir), f".staging-{uuid.uuid4().hex}")
+    ensure_dir(staging)
+    try:
+        pkl_path = os.path.join(staging, ARTIFACT_FILENAME)
+        # uncompressed so numpy arrays can be memory-mapped on load
+        joblib.dump(pipeline, pkl_path)
+        hashed = [pkl_path]
+        if quantiles:
+            joblib.dump(quantiles, os.path.join(staging, QUANTILES_FILENAME))
+            hashed.append(os.path.join(staging, QUANTILES_FILENAME))
+        h = hashlib.sha256()
+        for path in hashed:
+            with open(path, "rb") as f:
+                for chunk in iter(lambda: f.read(1 << 20), b""):
+                    h.update(chunk)
+        h.update(json.dumps(meta, sort_keys=True, default=str).encode("utf-8"))
+        if compiled is not None:
+            compiled.save(os.path.join(staging, COMPILED_FILENAME))
+        for name, ct in (compiled_quantiles or {}).items():
+            ct.save(os.path.join(staging, compiled_quantile_filename(name)))
+        artifact_id = h.hexdigest()[:16]
+        full_meta = {**meta, "artifact_id": artifact_id, "created_at": time.time()}
+        with open(os.path.join(staging, ARTIFACT_META_FILENAME), "w", encoding="utf-8") as f:
+            json.dump(full_meta, f, indent=2, default=str)
+        target = version_dir(cache_dir, artifact_id)
+        if os.path.exists(target):
+            shutil.rmtree(staging, ignore_errors=True)  # identical artifact already published
+        else:
+            os.rename(staging, target)
+    except Exception:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+    if activate:
+        set_active(cache_dir, artifact_id)
+    prune(cache_dir, keep=keep)
+    return artifact_id
+
+
+def read_seen_files(cache_dir: str, artifact_id: str) -> Dict[str, Any]:
+    """
+    Data files (name -> stamp) a version was checked against without changing it; see mark_seen_files.
+    """
+    data = read_json(os.path.join(version_dir(cache_dir, artifact_id), SEEN_FILES_FILENAME)) if artifact_id else None
+    return dict(data.get("files", {})) if data else {}
+
+
+def mark_seen_files(cache_dir: str, artifact_id: str, files: Dict[str, Any]) -> None:
+    """
+    Record data files as seen by an existing version without publishing a new one. The record sits
+    beside the immutable artifact (it is not part of its hash), so ACTIVE, HISTORY and pruning are
+    untouched, and it goes away with the version.
+    """
+    vdir = version_dir(cache_dir, artifact_id)
+    if not artifact_id or not os.path.isdir(vdir):
+        return
+    merged = {**read_seen_files(cache_dir, artifact_id), **files}
+    _atomic_write_text(os.path.join(vdir, SEEN_FILES_FILENAME), json.dumps({"files": merged}, indent=2))
+
+
+def compiled_quantile_filename(name: str) -> str:
+    return f"compiled_{name}.npz"
+
+
+def load_quantiles(vdir: str, *, mmap: bool = True) -> Dict[str, Any]:
+    """
+    Quantile pipelines stored with a version ({name: pipeline}); empty if it has none.
+    """
+    path = os.path.join(vdir, QUANTILES_FILENAME)
+    if not os.path.exists(path):
+        return {}
+    import joblib
+
+    return joblib.load(path, mmap_mode="r" if mmap else None)
+
+
+def list_versions(cache_dir: str) -> List[Dict[str, Any]]:
+    """
+    Published versions, newest first: [{artifact_id, created_at, version, active}].
+    """
+    root = _versions_dir(cache_dir)
+    if not os.path.exists(root):
+        return []
+    active = active_version(cache_dir)
+    out: List[Dict[str, Any]] = []
+    for vid in os.listdir(root):
+        meta = read_json(os.path.join(root, vid, ARTIFACT_META_FILENAME)) or {}
+        out.append({
+            "artifact_id": vid,
+            "created_at": meta.get("created_at", 0.0),
+            "version": meta.get("version"),
+            "active": vid == active,
+        })
+    out.sort(key=lambda v: v["created_at"], reverse=True)
+    return out
+
+
+def prune(cache_dir: str, keep: int = DEFAULT_KEEP) -> List[str]:
+    """
+    Delete all but the newest `keep` versions; the active version is always kept.
+    """
+    removed: List[str] = []
+    for i, v in enumerate(list_versions(cache_dir)):
+        if i < keep or v["active"]:
+            continue
+        shutil.rmtree(version_dir(cache_dir, v["artifact_id"]), ignore_errors=True)
+        removed.append(v["artifact_id"])
+    return removed
+
+
+def rollback(cache_dir: str) -> Optional[str]:
+    """
+    Re-activate the most recent previously active version that still exists. Returns its id.
+    """
+    active = active_version(cache_dir)
+    history = _history(cache_dir)
+    while history:
+        vid = history.pop()
+        if vid != active and os.path.exists(os.path.join(version_dir(cache_dir, vid), ARTIFACT_FILENAME)):
+            _atomic_write_text(os.path.join(registry_dir(cache_dir), "HISTORY.json"), json.dumps({"history": history}))
+            _atomic_write_text(os.path.join(registry_dir(cache_dir), "ACTIVE"), vid)
+            return vid
+    return None
+
+
+def active_meta(cache_dir: str) -> Optional[Tuple[str, Dict[str, Any]]]:
+    """
+    (version dir, meta) of the active version, without loading the artifact.
+    """
+    vid = active_version(cache_dir)
+    if not vid:
+        return None
+    vdir = version_dir(cache_dir, vid)
+    meta = read_json(os.path.join(vdir, ARTIFACT_META_FILENAME))
+    if meta is None:
+        return None
+    return vdir, meta
+
+
+def load_active(cache_dir: str, *, mmap: bool = True) -> Optional[Tuple[Any, Dict[str, Any]]]:
+    """
+    Load (pipeline, meta) of the active version. With `mmap`, large numpy arrays in the
+    artifact are memory-mapped read-only instead of copied into each worker.
+    """
+    found = active_meta(cache_dir)
+    if found is None:
+        return None
+    vdir, meta = found
+    return load_pipeline(vdir, mmap=mmap), meta
+
+
+def load_pipeline(vdir: str, *, mmap: bool = True) -> Any:
+    """
+    The sklearn pipeline stored with a version.
+    """
+    import joblib
+
+    return joblib.load(os.path.join(vdir, ARTIFACT_FILENAME), mmap_mode="r" if mmap else None)
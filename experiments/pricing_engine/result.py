@@ -0,0 +1,323 @@
+from __future__ import annotations
+
+import csv
+import io
+import json
+from datetime import date
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, TextIO, Tuple, Union, overload
+
+import numpy as np
+
+
+# Known drivers in the order the engine appends them (heuristics, then ML, guardrails, smoothing).
+# Decoding a bitmask in table order therefore reproduces each day's driver list exactly.
+DRIVER_NAMES: Tuple[str, ...] = (
+    "Weekend uplift",
+    "Midweek softness",
+    "Seasonality",
+    "Event impact",
+    "High occupancy",
+    "Low occupancy softness",
+    "High pickup",
+    "ML model",
+    "Guardrail min",
+    "Guardrail max",
+    "Smoothing",
+)
+DRIVER_BITS_DTYPE = np.uint32
+MAX_DRIVERS = 32
+
+COLUMNS = ["date", "room_type_code", "price_rec", "price_min", "price_max", "drivers"]
+
+
+class DriverTable:
+    """
+    Name table for driver bitmasks: bit i is `names[i]`. Starts from DRIVER_NAMES; names the engine
+    has never produced are appended on first use (up to MAX_DRIVERS).
+    """
+
+    def __init__(self, names: Sequence[str] = DRIVER_NAMES):
+        self.names: List[str] = list(names)
+        self._bits: Dict[str, int] = {n: 1 << i for i, n in enumerate(self.names)}
+
+    def bit(self, name: str) -> int:
+        b = self._bits.get(name)
+        if b is None:
+            if len(self.names) >= MAX_DRIVERS:
+                raise ValueError(f"more than {MAX_DRIVERS} distinct drivers")
+            b = 1 << len(self.names)
+            self.names.append(name)
+            self._bits[name] = b
+        return b
+
+    def encode(self, drivers: Iterable[str]) -> int:
+        bits = 0
+        for name in drivers:
+            bits |= self.bit(name)
+        return bits
+
+
+class PricingRow:
+    """
+    Read-only view of one day of a PricingResult, with the attributes of the old PricingItem.
+    """
+
+    __slots__ = ("_result", "_i")
+
+    def __init__(self, result: "PricingResult", i: int):
+        self._result = result
+        self._i = i
+
+    @property
+    def date(self) -> str:
+        return self._result.date_at(self._i)
+
+    @property
+    def room_type_code(self) -> str:
+        return self._result.room_type_code
+
+    @property
+    def price_rec(self) -> float:
+        return float(self._result.price_rec[self._i])
+
+    @property
+    def price_min(self) -> float:
+        return float(self._result.price_min[self._i])
+
+    @property
+    def price_max(self) -> float:
+        return float(self._result.price_max[self._i])
+
+    @property
+    def drivers(self) -> List[str]:
+        return self._result.drivers_at(self._i)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {c: getattr(self, c) for c in COLUMNS}
+
+    def __repr__(self) -> str:
+        return f"PricingRow({self.to_dict()!r})"
+
+
+class PricingResult:
+    """
+    Scored days for one room type, stored column-wise: date ordinals (int32), prices (float64) and a
+    uint32 driver bitmask per day over a shared name table. Behaves as a read-only sequence of
+    PricingRow views, and serializes straight to JSON/CSV without per-day objects.
+    The arrays are read-only, so results can be shared (e.g. from the result cache) without copying.
+    """
+
+    __slots__ = ("room_type_code", "date_ordinals", "price_rec", "price_min", "price_max", "driver_bits", "driver_names", "_fragments")
+
+    def __init__(
+        self,
+        room_type_code: str,
+        date_ordinals: np.ndarray,
+        price_rec: np.ndarray,
+        price_min: np.ndarray,
+        price_max: np.ndarray,
+        driver_bits: np.ndarray,
+        driver_names: Sequence[str] = DRIVER_NAMES,
+    ):
+        self.room_type_code = room_type_code
+        self.date_ordinals = _frozen(date_ordinals, np.int32)
+        self.price_rec = _frozen(price_rec, np.float64)
+        self.price_min = _frozen(price_min, np.float64)
+        self.price_max = _frozen(price_max, np.float64)
+        self.driver_bits = _frozen(driver_bits, DRIVER_BITS_DTYPE)
+        self.driver_names: Tuple[str, ...] = tuple(driver_names)
+        self._fragments: Optional[Dict[int, Tuple[List[str], str, str]]] = None
+
+    # -------- construction --------
+    @classmethod
+    def empty(cls, room_type_code: str) -> "PricingResult":
+        z = np.zeros(0)
+        return cls(room_type_code, z, z, z, z, z)
+
+    @classmethod
+    def from_records(cls, records: Sequence[Dict[str, Any]], room_type_code: str = "") -> "PricingResult":
+        """
+        From per-day dicts with the PricingItem fields (e.g. an old cached result).
+        """
+        table = DriverTable()
+        return cls(
+            records[0]["room_type_code"] if records else room_type_code,
+            np.array([date.fromisoformat(r["date"]).toordinal() for r in records], dtype=np.int32),
+            np.array([r["price_rec"] for r in records], dtype=float),
+            np.array([r["price_min"] for r in records], dtype=float),
+            np.array([r["price_max"] for r in records], dtype=float),
+            np.array([table.encode(r.get("drivers") or []) for r in records], dtype=DRIVER_BITS_DTYPE),
+            table.names,
+        )
+
+    @classmethod
+    def concat(cls, parts: Sequence["PricingResult"], room_type_code: str = "") -> "PricingResult":
+        """
+        Consecutive results of one room type over one driver table (a table only ever appends names,
+        so the longest one decodes every part).
+        """
+        if not parts:
+            return cls.empty(room_type_code)
+        return cls(
+            parts[0].room_type_code,
+            np.concatenate([p.date_ordinals for p in parts]),
+            np.concatenate([p.price_rec for p in parts]),
+            np.concatenate([p.price_min for p in parts]),
+            np.concatenate([p.price_max for p in parts]),
+            np.concatenate([p.driver_bits for p in parts]),
+            max((p.driver_names for p in parts), key=len),
+        )
+
+    def to_columns(self) -> Dict[str, Any]:
+        """
+        JSON-able columnar form (the result cache's on-disk format); `from_columns` inverts it.
+        """
+        return {
+            "room_type_code": self.room_type_code,
+            "date_ordinals": self.date_ordinals.tolist(),
+            "price_rec": self.price_rec.tolist(),
+            "price_min": self.price_min.tolist(),
+            "price_max": self.price_max.tolist(),
+            "driver_bits": self.driver_bits.tolist(),
+            "driver_names": list(self.driver_names),
+        }
+
+    @classmethod
+    def from_columns(cls, data: Dict[str, Any]) -> "PricingResult":
+        return cls(
+            data["room_type_code"],
+            np.asarray(data["date_ordinals"]),
+            np.asarray(data["price_rec"]),
+            np.asarray(data["price_min"]),
+            np.asarray(data["price_max"]),
+            np.asarray(data["driver_bits"]),
+            data["driver_names"],
+        )
+
+    # -------- sequence of rows --------
+    def __len__(self) -> int:
+        return int(self.date_ordinals.shape[0])
+
+    @overload
+    def __getitem__(self, i: int) -> PricingRow: ...
+
+    @overload
+    def __getitem__(self, i: slice) -> "PricingResult": ...
+
+    def __getitem__(self, i: Union[int, slice]) -> Union[PricingRow, "PricingResult"]:
+        if isinstance(i, slice):
+            return PricingResult(
+                self.room_type_code, self.date_ordinals[i], self.price_rec[i], self.price_min[i],
+                self.price_max[i], self.driver_bits[i], self.driver_names,
+            )
+        n = len(self)
+        if i < 0:
+            i += n
+        if not 0 <= i < n:
+            raise IndexError("PricingResult index out of range")
+        return PricingRow(self, i)
+
+    def __iter__(self) -> Iterator[PricingRow]:
+        for i in range(len(self)):
+            yield PricingRow(self, i)
+
+    def date_at(self, i: int) -> str:
+        return date.fromordinal(int(self.date_ordinals[i])).isoformat()
+
+    def drivers_at(self, i: int) -> List[str]:
+        return list(self._fragment(int(self.driver_bits[i]))[0])
+
+    @property
+    def dates(self) -> List[str]:
+        return [date.fromordinal(o).isoformat() for o in self.date_ordinals.tolist()]
+
+    @property
+    def nbytes(self) -> int:
+        return int(
+            self.date_ordinals.nbytes + self.price_rec.nbytes + self.price_min.nbytes
+            + self.price_max.nbytes + self.driver_bits.nbytes
+        )
+
+    def to_records(self) -> List[Dict[str, Any]]:
+        return [row.to_dict() for row in self]
+
+    # -------- serialization --------
+    def _fragment(self, bits: int) -> Tuple[List[str], str, str]:
+        # (names, JSON array, CSV field) per distinct bitmask, decoded once per result
+        if self._fragments is None:
+            self._fragments = {}
+        frag = self._fragments.get(bits)
+        if frag is None:
+            names = [n for k, n in enumerate(self.driver_names) if bits >> k & 1]
+            frag = (names, json.dumps(names), "|".join(names))
+            self._fragments[bits] = frag
+        return frag
+
+    def _columns(self) -> Iterator[Tuple[str, float, float, float, int]]:
+        dates = self.dates
+        return zip(dates, self.price_rec.tolist(), self.price_min.tolist(), self.price_max.tolist(), self.driver_bits.tolist())
+
+    def _json_objects(self, leading: Sequence[Tuple[str, Any]] = ()) -> Iterator[str]:
+        # repr() of nan/inf is not JSON; such a price is an engine bug, so refuse rather than emit it
+        for name in ("price_rec", "price_min", "price_max"):
+            col = getattr(self, name)
+            if not np.isfinite(col).all():
+                bad = int(np.flatnonzero(~np.isfinite(col))[0])
+                raise ValueError(f"non-finite {name} on {self.date_at(bad)} for {self.room_type_code}: {col[bad]}")
+        prefix = "".join(f"{json.dumps(name)}: {json.dumps(value)}, " for name, value in leading)
+        room = json.dumps(self.room_type_code)
+        for d, rec, lo, hi, bits in self._columns():
+            yield (
+                f'{{{prefix}"date": "{d}", "room_type_code": {room}, "price_rec": {rec!r}, "price_min": {lo!r}, '
+                f'"price_max": {hi!r}, "drivers": {self._fragment(bits)[1]}}}'
+            )
+
+    def to_json(self) -> str:
+        """
+        JSON array of per-day objects, byte-for-byte what json.dumps(self.to_records()) gives.
+        Raises ValueError if a price is NaN or infinite (which json.dumps would write as invalid JSON).
+        """
+        return "[" + ", ".join(self._json_objects()) + "]"
+
+    def write_ndjson(self, f: TextIO, *, leading: Sequence[Tuple[str, Any]] = ()) -> None:
+        """
+        One JSON object per day and line (full-precision prices, drivers as a list).
+        """
+        f.writelines(obj + "\n" for obj in self._json_objects(leading))
+
+    def driver_lists(self) -> List[List[str]]:
+        """
+        Per-day driver name lists; days with the same drivers share one (do not mutate) list.
+        """
+        return [self._fragment(bits)[0] for bits in self.driver_bits.tolist()]
+
+    def write_csv(self, f: TextIO, *, header: bool = True, leading: Sequence[Tuple[str, Any]] = ()) -> None:
+        """
+        The CLI's CSV layout: prices with 2 decimals, drivers joined by "|".
+        `leading` (name, value) pairs are prepended as constant columns, e.g. hotel_id in a combined file.
+        """
+        w = csv.writer(f)
+        if header:
+            w.writerow([name for name, _ in leading] + COLUMNS)
+        prefix = tuple(value for _, value in leading)
+        room = self.room_type_code
+        w.writerows(
+            (*prefix, d, room, f"{rec:.2f}", f"{lo:.2f}", f"{hi:.2f}", self._fragment(bits)[2])
+            for d, rec, lo, hi, bits in self._columns()
+        )
+
+    def to_csv(self, *, header: bool = True, leading: Sequence[Tuple[str, Any]] = ()) -> str:
+        buf = io.StringIO()
+        self.write_csv(buf, header=header, leading=leading)
+        return buf.getvalue()
+
+    def __repr__(self) -> str:
+        return f"PricingResult(room_type_code={self.room_type_code!r}, days={len(self)})"
+
+
+def _frozen(values: Any, dtype: Any) -> np.ndarray:
+    arr = np.asarray(values, dtype=dtype)
+    if arr.flags.writeable:
+        arr = arr.copy() if arr.base is not None or arr is values else arr
+        arr.flags.writeable = False
+    return arr
@@ -0,0 +1,210 @@
+from __future__ import annotations
+
+import hashlib
+import itertools
+import os
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .model import MLPriceModel, TrainingData, load_training_matrix, make_pipeline
+from .utils import ensure_dir, sha1_of_obj
+
+
+# Small default grids; each candidate is evaluated on every walk-forward fold
+DEFAULT_GRIDS: Dict[str, Dict[str, List[Any]]] = {
+    "gbrt": {
+        "n_estimators": [100, 200],
+        "learning_rate": [0.05, 0.1],
+        "max_depth": [2, 3, 4],
+    },
+    "hist": {
+        "learning_rate": [0.05, 0.1],
+        "max_leaf_nodes": [15, 31],
+        "min_samples_leaf": [10, 20],
+    },
+}
+
+
+def walk_forward_splits(dates: np.ndarray, n_folds: int = 3, min_train_days: int = 365) -> List[Tuple[np.datetime64, np.datetime64]]:
+    """
+    Expanding-window folds over time: fold k trains on rows before cutoff_k and tests on
+    [cutoff_k, cutoff_{k+1}). Cutoffs are spaced evenly after the first `min_train_days`,
+    so no fold ever trains on data later than what it is evaluated on.
+    Returns [(cutoff, test_end)] with test_end exclusive.
+    """
+    lo = dates.min() + np.timedelta64(min_train_days, "D")
+    hi = dates.max() + np.timedelta64(1, "D")
+    if lo >= hi or n_folds < 1:
+        return []
+    span = (hi - lo).astype(int)
+    edges = [lo + np.timedelta64(int(round(span * k / n_folds)), "D") for k in range(n_folds + 1)]
+    return [(edges[k], edges[k + 1]) for k in range(n_folds) if edges[k] < edges[k + 1]]
+
+
+# Fold sets kept under <cache_dir>/cv; older ones (other data or splits) are deleted
+CV_KEEP = 3
+
+
+def _prune_folds(cv_root: str, current: str, keep: int = CV_KEEP) -> None:
+    # newest first by last use; the current set is always kept
+    try:
+        keys = [k for k in os.listdir(cv_root) if os.path.isdir(os.path.join(cv_root, k))]
+    except OSError:
+        return
+    keys.sort(key=lambda k: os.path.getmtime(os.path.join(cv_root, k)), reverse=True)
+    for k in [k for k in keys if k != current][max(0, keep - 1):]:
+        shutil.rmtree(os.path.join(cv_root, k), ignore_errors=True)
+
+
+def _cache_folds(data: TrainingData, splits: List[Tuple[np.datetime64, np.datetime64]], cache_dir: str) -> List[Dict[str, str]]:
+    """
+    Write each fold's train/test matrices once as .npy (keyed by data + split fingerprint),
+    so pool workers memory-map them instead of receiving pickled copies. Only the CV_KEEP most
+    recently used fold sets are kept.
+    """
+    h = hashlib.sha1()
+    for arr in (data.X, data.y, data.dates.astype("int64")):
+        h.update(np.ascontiguousarray(arr).tobytes())
+    key = sha1_of_obj({"data": h.hexdigest(), "splits": [(str(a), str(b)) for a, b in splits]})
+    root = os.path.join(cache_dir, "cv", key)
+    ensure_dir(root)
+    os.utime(root)  # mark as used for pruning
+    _prune_folds(os.path.dirname(root), key)
+    folds: List[Dict[str, str]] = []
+    for k, (cutoff, test_end) in enumerate(splits):
+        tr = data.dates < cutoff
+        te = (data.dates >= cutoff) & (data.dates < test_end)
+        paths = {name: os.path.join(root, f"fold{k}_{name}.npy") for name in ("X_tr", "y_tr", "X_te", "y_te")}
+        if not all(os.path.exists(p) for p in paths.values()):
+            for name, arr in (("X_tr", data.X[tr]), ("y_tr", data.y[tr]), ("X_te", data.X[te]), ("y_te", data.y[te])):
+                tmp = paths[name] + f".{os.getpid()}.tmp.npy"
+                np.save(tmp, arr)
+                os.replace(tmp, paths[name])
+        folds.append({**paths, "cutoff": str(cutoff), "test_end": str(test_end)})
+    return folds
+
+
+def _limit_worker_threads(threads: int) -> None:
+    # Pool initializer: HGB (OpenMP) and BLAS would otherwise each start one thread per core in
+    # every worker process, oversubscribing the CPU by a factor of `workers`
+    try:
+        from threadpoolctl import threadpool_limits  # installed with scikit-learn
+    except ImportError:
+        return
+    threadpool_limits(limits=threads)
+
+
+def _evaluate_candidate(trainer: str, params: Dict[str, Any], folds: List[Dict[str, str]]) -> Dict[str, Any]:
+    # Top-level so it can run in a worker process
+    maes: List[Optional[float]] = []
+    t0 = time.perf_counter()
+    for f in folds:
+        X_tr, y_tr = np.load(f["X_tr"], mmap_mode="r"), np.load(f["y_tr"], mmap_mode="r")
+        X_te, y_te = np.load(f["X_te"], mmap_mode="r"), np.load(f["y_te"], mmap_mode="r")
+        if len(y_tr) == 0 or len(y_te) == 0:
+            maes.append(None)
+            continue
+        pipeline = make_pipeline(trainer, params)
+        pipeline.fit(X_tr, y_tr)
+        maes.append(float(np.mean(np.abs(pipeline.predict(X_te) - y_te))))
+    scored = [m for m in maes if m is not None]
+    return {
+        "params": params,
+        "fold_mae": maes,
+        "mean_mae": float(np.mean(scored)) if scored else None,
+        "seconds": round(time.perf_counter() - t0, 3),
+    }
+
+
+def _grid(grid: Dict[str, List[Any]]) -> List[Dict[str, Any]]:
+    keys = sorted(grid)
+    return [dict(zip(keys, combo)) for combo in itertools.product(*(grid[k] for k in keys))]
+
+
+def tune(
+    data_dir: str,
+    cache_dir: str,
+    *,
+    trainer: str = "gbrt",
+    grid: Optional[Dict[str, List[Any]]] = None,
+    n_folds: int = 3,
+    min_train_days: int = 365,
+    workers: Optional[int] = None,
+    data: Optional[TrainingData] = None,
+) -> Optional[Dict[str, Any]]:
+    """
+    Walk-forward cross-validated grid search over `trainer` params, candidates evaluated
+    across a process pool (each worker limited to its share of the cores). Uses `data` when
+    given, else loads the training matrix from `data_dir`. Returns the search report (best
+    params, per-fold metrics of the best candidate and every candidate's scores), or None if
+    the data can't be split.
+    """
+    data = data if data is not None else load_training_matrix(data_dir)
+    if data is None:
+        return None
+    splits = walk_forward_splits(data.dates, n_folds=n_folds, min_train_days=min_train_days)
+    if not splits:
+        return None
+    folds = _cache_folds(data, splits, cache_dir)
+    candidates = _grid(grid or DEFAULT_GRIDS[trainer])
+
+    cpus = os.cpu_count() or 1
+    workers = max(1, min(workers or cpus, len(candidates)))
+    t0 = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_limit_worker_threads, initargs=(max(1, cpus // workers),)) as pool:
+        results = list(pool.map(_evaluate_candidate, [trainer] * len(candidates), candidates, [folds] * len(candidates)))
+    scored = [r for r in results if r["mean_mae"] is not None]
+    if not scored:
+        return None
+    best = min(scored, key=lambda r: r["mean_mae"])
+    return {
+        "trainer": trainer,
+        "scheme": f"walk-forward expanding window, {len(splits)} folds, min_train_days={min_train_days}",
+        "best_params": best["params"],
+        "best_mean_mae": best["mean_mae"],
+        "folds": [
+            {"cutoff": f["cutoff"], "test_end": f["test_end"], "mae": m}
+            for f, m in zip(folds, best["fold_mae"])
+        ],
+        "candidates": sorted(results, key=lambda r: (r["mean_mae"] is None, r["mean_mae"] or 0.0)),
+        "workers": workers,
+        "search_seconds": round(time.perf_counter() - t0, 3),
+    }
+
+
+def tune_and_train(
+    data_dir: str,
+    cache_dir: str,
+    *,
+    trainer: str = "gbrt",
+    data: Optional[TrainingData] = None,
+    **kwargs,
+) -> Tuple[Optional[MLPriceModel], Optional[Dict[str, Any]]]:
+    """
+    Run `tune`, then train the final model on all data with the best params and record the
+    search report under meta["cv"]. The training matrix is loaded once for both (or `data` is
+    used, e.g. from the feature store). If the search can't run (too little history for a
+    walk-forward fold, or no candidate scored), the model is trained with default params and
+    meta["cv"] records why; the report returned is then None.
+    """
+    data = data if data is not None else load_training_matrix(data_dir)
+    if data is None:
+        return None, None
+    report = tune(data_dir, cache_dir, trainer=trainer, data=data, **kwargs)
+    if report is None:
+        splits = walk_forward_splits(
+            data.dates, n_folds=kwargs.get("n_folds", 3), min_train_days=kwargs.get("min_train_days", 365),
+        )
+        skipped = "insufficient history for walk-forward CV" if not splits else "no candidate could be scored"
+        model = MLPriceModel.train_from_data_dir(
+            data_dir, cache_dir, trainer=trainer, extra_meta={"cv": {"skipped": skipped}}, data=data,
+        )
+        return model, None
+    model = MLPriceModel.train_from_data_dir(
+        data_dir, cache_dir, trainer=trainer, params=report["best_params"], extra_meta={"cv": report}, data=data,
+    )
+    return model, report
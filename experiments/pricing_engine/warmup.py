@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date, timedelta
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional
+
+from .engine import load_data_snapshot, load_model_cached, score_dates
+from .event_store import get_city_event_store
+from .hotels import HotelConfig, load_hotel_configs
+from .utils import to_iso
+
+if TYPE_CHECKING:
+    from .feature_store import FeatureStore
+
+
+def warm_up(
+    *,
+    data_dir: str,
+    cache_dir: str,
+    days: int = 31,
+    hotels: Optional[Dict[int, HotelConfig]] = None,
+    workers: int = 4,
+    refresh_events: bool = False,
+    disable_ml: bool = False,
+    start: Optional[date] = None,
+    feature_store: "FeatureStore | None" = None,
+    progress: Optional[Callable[[str], None]] = print,
+) -> Dict:
+    """
+    Pre-populate the data snapshot, the global model, the city event store and, per configured hotel
+    and room type, its model shard (and its feature store rows, given the `feature_store` the server
+    scores with) for the next `days` days. One scoring pass per room type does the loading, on
+    `workers` threads. The result cache is not warmed: its keys include the exact from/to window,
+    and quotes ask for arbitrary windows, so entries for one fixed window would go unused.
+    Returns a summary with per-stage timings.
+    """
+    log = progress or (lambda _msg: None)
+    hotels = hotels if hotels is not None else load_hotel_configs()
+    start = start or date.today()
+    end = start + timedelta(days=max(1, days) - 1)
+    timings: Dict[str, float] = {}
+
+    t0 = time.perf_counter()
+    load_data_snapshot(data_dir)
+    timings["data_snapshot"] = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    model = None if disable_ml else load_model_cached(cache_dir)[0]
+    timings["model"] = time.perf_counter() - t0
+    log(f"[warmup] data snapshot {timings['data_snapshot']:.2f}s, model {'loaded' if model else 'absent'} {timings['model']:.2f}s")
+
+    # One event refresh per city, however many hotels share it
+    t0 = time.perf_counter()
+    store = get_city_event_store(cache_dir)
+    locations = sorted({h.location for h in hotels.values() if h.location})
+    for loc in locations:
+        if refresh_events:
+            store.refresh(loc)
+        else:
+            store.get_array(loc, start, end)
+        log(f"[warmup] events ready for {loc}")
+    timings["events"] = time.perf_counter() - t0
+
+    jobs = [(h, rt) for h in hotels.values() for rt in (h.room_types or [])]
+    results: List[Dict] = []
+
+    def _run(h: HotelConfig, room_type: str) -> Dict:
+        t = time.perf_counter()
+        items, meta = score_dates(
+            hotel_id=h.hotel_id,
+            room_type_code=room_type,
+            from_date=to_iso(start),
+            to_date=to_iso(end),
+            location=h.location,
+            data_dir=data_dir,
+            cache_dir=cache_dir,
+            disable_perplexity=True,
+            event_store=store,
+            disable_ml=disable_ml,
+            feature_store=feature_store,
+        )
+        return {
+            "hotel_id": h.hotel_id,
+            "room_type_code": room_type,
+            "num_items": len(items),
+            "seconds": time.perf_counter() - t,
+            "model_scope": meta.get("model_scope"),
+        }
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = [pool.submit(_run, h, rt) for h, rt in jobs]
+        for n, fut in enumerate(as_completed(futures), start=1):
+            try:
+                r = fut.result()
+            except Exception as e:
+                log(f"[warmup] {n}/{len(jobs)} failed: {e}")
+                continue
+            results.append(r)
+            log(f"[warmup] {n}/{len(jobs)} hotel={r['hotel_id']} room_type={r['room_type_code']} "
+                f"days={r['num_items']} {r['seconds']:.2f}s model={r['model_scope'] or 'none'}")
+    timings["scoring"] = time.perf_counter() - t0
+
+    return {
+        "from": to_iso(start),
+        "to": to_iso(end),
+        "locations": locations,
+        "jobs": len(jobs),
+        "succeeded": len(results),
+        "results": results,
+        "timings": timings,
+    }
@@ -0,0 +1,195 @@
+from __future__ import annotations
+
+import gzip
+import os
+import uuid
+from datetime import date, datetime
+from typing import IO, Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .result import PricingResult
+from .utils import ensure_dir
+
+# Streaming output writers. Each write() appends one PricingResult (a job, or a chunk of one) to the
+# open output, so nothing is buffered beyond the result being written.
+# pyarrow is optional and only imported for Parquet.
+
+FORMATS: Dict[str, str] = {
+    "csv": ".csv",
+    "csv.gz": ".csv.gz",
+    "ndjson": ".ndjson",
+    "ndjson.gz": ".ndjson.gz",
+    "parquet": ".parquet",
+}
+
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+def extension(fmt: str) -> str:
+    try:
+        return FORMATS[fmt]
+    except KeyError:
+        raise ValueError(f"unknown output format {fmt!r}; expected one of {sorted(FORMATS)}") from None
+
+
+class ResultWriter:
+    """
+    Appends PricingResults to one output file. With `hotel_column`, every row gets a leading
+    hotel_id (needed when several hotels share a file; partitioned datasets keep it in the path).
+    """
+
+    def __init__(self, path: str, *, hotel_column: bool = False):
+        self.path = path
+        self.hotel_column = hotel_column
+        self.rows = 0
+
+    def _leading(self, hotel_id: int) -> Tuple[Tuple[str, Any], ...]:
+        return (("hotel_id", int(hotel_id)),) if self.hotel_column else ()
+
+    def write(self, items: PricingResult, hotel_id: int) -> None:
+        if len(items):
+            self._write(items, hotel_id)
+            self.rows += len(items)
+
+    def _write(self, items: PricingResult, hotel_id: int) -> None:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+    def __enter__(self) -> "ResultWriter":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+class _TextWriter(ResultWriter):
+    def __init__(self, path: str, *, hotel_column: bool = False, compress: bool = False):
+        super().__init__(path, hotel_column=hotel_column)
+        self._f: IO[str] = (
+            gzip.open(path, "wt", newline="", encoding="utf-8") if compress
+            else open(path, "w", newline="", encoding="utf-8")
+        )
+
+    def close(self) -> None:
+        if not self._f.closed:
+            self._f.close()
+
+
+class CsvWriter(_TextWriter):
+    """
+    The CLI's CSV layout (2-decimal prices, drivers joined by "|"); the header is written once.
+    """
+
+    def __init__(self, path: str, *, hotel_column: bool = False, compress: bool = False):
+        super().__init__(path, hotel_column=hotel_column, compress=compress)
+        self._header = True
+
+    def _write(self, items: PricingResult, hotel_id: int) -> None:
+        items.write_csv(self._f, header=self._header, leading=self._leading(hotel_id))
+        self._header = False
+
+    def close(self) -> None:
+        if self._header and not self._f.closed:
+            PricingResult.empty("").write_csv(self._f, leading=self._leading(0))  # header only
+            self._header = False
+        super().close()
+
+
+class NdjsonWriter(_TextWriter):
+    """
+    One JSON object per day: full-precision prices and drivers as a list.
+    """
+
+    def _write(self, items: PricingResult, hotel_id: int) -> None:
+        items.write_ndjson(self._f, leading=self._leading(hotel_id))
+
+
+class ParquetWriter(ResultWriter):
+    """
+    Typed columns: date as date32, prices as float64, room type dictionary-encoded, drivers as
+    list<string>. Each write() becomes one row group.
+    """
+
+    def __init__(self, path: str, *, hotel_column: bool = False):
+        super().__init__(path, hotel_column=hotel_column)
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise SystemExit("Parquet output needs pyarrow (pip install pyarrow); or use csv.gz / ndjson") from e
+        self._pa = pa
+        fields = [pa.field("hotel_id", pa.int32())] if hotel_column else []
+        fields += [
+            pa.field("date", pa.date32()),
+            pa.field("room_type_code", pa.dictionary(pa.int32(), pa.string())),
+            pa.field("price_rec", pa.float64()),
+            pa.field("price_min", pa.float64()),
+            pa.field("price_max", pa.float64()),
+            pa.field("drivers", pa.list_(pa.string())),
+        ]
+        self.schema = pa.schema(fields)
+        self._writer = pq.ParquetWriter(path, self.schema, compression="zstd")
+
+    def _write(self, items: PricingResult, hotel_id: int) -> None:
+        pa = self._pa
+        n = len(items)
+        cols: List[Any] = [pa.array(np.full(n, hotel_id, dtype=np.int32))] if self.hotel_column else []
+        cols += [
+            pa.array(items.date_ordinals - np.int32(_EPOCH_ORDINAL), type=pa.int32()).cast(pa.date32()),
+            pa.DictionaryArray.from_arrays(pa.array(np.zeros(n, dtype=np.int32)), pa.array([items.room_type_code])),
+            pa.array(items.price_rec),
+            pa.array(items.price_min),
+            pa.array(items.price_max),
+            pa.array(items.driver_lists(), type=pa.list_(pa.string())),
+        ]
+        self._writer.write_table(pa.Table.from_arrays(cols, schema=self.schema))
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+
+def open_writer(path: str, fmt: str, *, hotel_column: bool = False) -> ResultWriter:
+    extension(fmt)
+    if fmt == "parquet":
+        return ParquetWriter(path, hotel_column=hotel_column)
+    if fmt.startswith("ndjson"):
+        return NdjsonWriter(path, hotel_column=hotel_column, compress=fmt.endswith(".gz"))
+    return CsvWriter(path, hotel_column=hotel_column, compress=fmt.endswith(".gz"))
+
+
+class PartitionedDatasetWriter(ResultWriter):
+    """
+    Appends to a Hive-style dataset: <root>/hotel_id=<id>/run_date=<YYYY-MM-DD>/part-<ts>-<uid><ext>.
+    Every writer adds new part files and never rewrites existing ones, so repeated runs (and
+    concurrent processes) append safely. hotel_id and run_date live in the path, not the files;
+    pyarrow.dataset / pandas.read_parquet restore them as columns.
+    """
+
+    def __init__(self, root: str, fmt: str, *, run_date: Optional[date] = None):
+        super().__init__(root)
+        self.fmt = fmt
+        self._ext = extension(fmt)
+        self.run_date = (run_date or date.today()).isoformat()
+        self._part = f"part-{datetime.now().strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        self._writers: Dict[int, ResultWriter] = {}
+
+    def _write(self, items: PricingResult, hotel_id: int) -> None:
+        w = self._writers.get(hotel_id)
+        if w is None:
+            part_dir = os.path.join(self.path, f"hotel_id={int(hotel_id)}", f"run_date={self.run_date}")
+            ensure_dir(part_dir)
+            w = self._writers[hotel_id] = open_writer(os.path.join(part_dir, self._part + self._ext), self.fmt)
+        w.write(items, hotel_id)
+
+    @property
+    def paths(self) -> List[str]:
+        return [w.path for w in self._writers.values()]
+
+    def close(self) -> None:
+        for w in self._writers.values():
+            w.close()
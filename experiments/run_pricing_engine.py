@@ -1,21 +1,24 @@
 from __future__ import annotations
 
 import argparse
-import csv
+import json
 import os
-from datetime import datetime
+from contextlib import nullcontext
+from datetime import date, datetime
 from typing import List
 
 from pricing_engine.engine import score_dates
+from pricing_engine.profiling import cprofile_to
 from pricing_engine.utils import ensure_dir, load_env
+from pricing_engine.writers import FORMATS, PartitionedDatasetWriter, ResultWriter, extension, open_writer
 
 
 def parse_args() -> argparse.Namespace:
     p = argparse.ArgumentParser(description="Run experimental pricing engine and export CSV.")
     p.add_argument("--hotel-id", type=int, default=1)
     p.add_argument("--room-type", type=str, default="DLX-QUEEN")
-    p.add_argument("--from", dest="from_date", type=str, required=True, help="YYYY-MM-DD")
-    p.add_argument("--to", dest="to_date", type=str, required=True, help="YYYY-MM-DD")
+    p.add_argument("--from", dest="from_date", type=str, default=None, help="YYYY-MM-DD (optional with --train-model/--rollback-model)")
+    p.add_argument("--to", dest="to_date", type=str, default=None, help="YYYY-MM-DD")
     p.add_argument("--location", type=str, default="Dublin, Ireland", help="City, Country for events search")
     p.add_argument("--data-dir", type=str, default=os.path.abspath(os.path.join(os.getcwd(), "infra/foresight-data")))
     p.add_argument("--cache-dir", type=str, default=os.path.abspath(os.path.join(os.getcwd(), "experiments/cache")))
@@ -23,13 +26,113 @@ def parse_args() -> argparse.Namespace:
     p.add_argument("--disable-perplexity", action="store_true", help="Disable external Perplexity calls (use cache/fallback only)")
     p.add_argument("--max-perplexity-results", type=int, default=8, help="Max results to request from Perplexity")
     p.add_argument("--force-refresh-perplexity", action="store_true", help="Ignore cache for Perplexity and refresh")
+    p.add_argument("--stale-while-revalidate", action="store_true", help="Serve cached events immediately; refresh stale entries in the background")
+    p.add_argument("--perplexity-soft-ttl-hours", type=float, default=24.0, help="Age after which cached events are refreshed (with --stale-while-revalidate; default 24)")
     p.add_argument("--train-model", action="store_true", help="Train ML model from --data-dir and save into --cache-dir")
+    p.add_argument("--trainer", choices=["gbrt", "hist"], default="gbrt", help="Model to train: gbrt (original) or hist (fast histogram boosting)")
+    p.add_argument("--incremental", action="store_true", help="With --train-model: warm-start the saved model on new data only")
+    p.add_argument("--shard", action="store_true", help="Train/list/rollback the model for --hotel-id/--room-type instead of the global one")
+    p.add_argument("--tune", action="store_true", help="With --train-model: walk-forward CV grid search, then train with the best params")
+    p.add_argument("--tune-folds", type=int, default=3, help="Walk-forward folds for --tune")
+    p.add_argument("--tune-workers", type=int, default=None, help="Worker processes for --tune (default: CPU count)")
+    p.add_argument("--feature-store", action="store_true", help="Sync the data files into <cache-dir>/features.sqlite and read daily features (and training rows) from it")
+    p.add_argument("--list-models", action="store_true", help="List model versions in the --cache-dir registry")
+    p.add_argument("--rollback-model", action="store_true", help="Re-activate the previously active model version")
     p.add_argument("--disable-ml", action="store_true", help="Disable ML model usage (heuristics only)")
     p.add_argument("--ml-weight", type=float, default=0.6, help="Weight of ML prediction in ensemble [0..1]")
     p.add_argument("--smoothing-window", type=int, default=3, help="Rolling median window size for smoothing (>=1)")
+    p.add_argument("--profile", type=str, default=None, help="Run scoring under cProfile, dump stats to this path and print stage timings")
+    p.add_argument("--jobs-file", type=str, default=None, help="CSV or YAML list of jobs (hotel_id, room_type, from, to[, location, name]) to score in this process")
+    p.add_argument("--workers", type=int, default=4, help="With --jobs-file: parallel scoring jobs")
+    p.add_argument("--per-job-output", action="store_true", help="With --jobs-file: one file per job instead of one combined file")
+    p.add_argument("--format", choices=sorted(FORMATS), default="csv", help="Output format (parquet needs pyarrow)")
+    p.add_argument("--dataset", type=str, default=None, help="Append to a partitioned dataset here (hotel_id=/run_date=/part-*) instead of writing into --out-dir")
+    p.add_argument("--run-date", type=str, default=None, help="YYYY-MM-DD run_date partition for --dataset (default: today)")
+    p.add_argument("--chunk-days", type=int, default=None, help="Scan mode: score the range this many days at a time, writing each chunk as it finishes (same prices, bounded memory)")
     return p.parse_args()
 
 
+def open_output(args: argparse.Namespace, ts: str, label: str = "", *, hotel_column: bool = False) -> ResultWriter:
+    """
+    Writer for --dataset (partitioned, appending), else a new pricing_<ts>[_<label>] file in --out-dir.
+    """
+    if args.dataset:
+        run_date = date.fromisoformat(args.run_date) if args.run_date else None
+        return PartitionedDatasetWriter(args.dataset, args.format, run_date=run_date)
+    name = f"pricing_{ts}_{label.replace(os.sep, '-')}" if label else f"pricing_{ts}"
+    return open_writer(os.path.join(args.out_dir, name + extension(args.format)), args.format, hotel_column=hotel_column)
+
+
+def output_paths(writer: ResultWriter) -> List[str]:
+    return writer.paths if isinstance(writer, PartitionedDatasetWriter) else [writer.path]
+
+
+def run_batch(args: argparse.Namespace, feature_store) -> None:
+    """
+    --jobs-file: score every job in one process (shared data snapshot, model and caches), stream the
+    results into one combined file with a leading hotel_id column, one file per job, or the --dataset,
+    and write a JSON timing summary.
+    """
+    from pricing_engine.batch import load_jobs, run_jobs
+
+    jobs = load_jobs(args.jobs_file)
+    ts = datetime.now().strftime("%Y%m%d-%H%M%S")
+    # One shared writer (combined file or dataset), or one per job; rows are written as each job finishes
+    shared = None if args.per_job_output and not args.dataset else open_output(args, ts, "batch", hotel_column=True)
+    outputs: List[str] = []
+
+    def _write(job, items, meta) -> None:
+        if shared is not None:
+            shared.write(items, job.hotel_id)
+            return
+        with open_output(args, ts, job.label()) as w:
+            w.write(items, job.hotel_id)
+        outputs.append(w.path)
+
+    profiler = cprofile_to(args.profile, top=15) if args.profile else nullcontext()
+    try:
+        with profiler:
+            summary = run_jobs(
+                jobs,
+                data_dir=args.data_dir,
+                cache_dir=args.cache_dir,
+                workers=args.workers,
+                default_location=args.location,
+                disable_ml=args.disable_ml,
+                on_result=_write,
+                disable_perplexity=args.disable_perplexity,
+                max_perplexity_results=args.max_perplexity_results,
+                force_refresh_perplexity=args.force_refresh_perplexity,
+                stale_while_revalidate=args.stale_while_revalidate,
+                event_soft_ttl_seconds=args.perplexity_soft_ttl_hours * 3600.0,
+                ml_weight=max(0.0, min(1.0, args.ml_weight)),
+                smoothing_window=max(1, args.smoothing_window),
+                feature_store=feature_store,
+            )
+    finally:
+        if shared is not None:
+            shared.close()
+            outputs = output_paths(shared)
+
+    summary["jobs_file"] = os.path.abspath(args.jobs_file)
+    summary["outputs"] = outputs
+    summary_path = os.path.join(args.out_dir, f"pricing_{ts}_batch_summary.json")
+    with open(summary_path, "w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=2)
+
+    stages = ", ".join(f"{k}={v:.2f}s" for k, v in summary["timings"].items())
+    print(f"[engine] batch: {summary['succeeded']}/{summary['jobs']} jobs, {summary['days']} days on "
+          f"{summary['workers']} workers ({stages})")
+    done = sorted((r for r in summary["results"] if r["ok"]), key=lambda r: -r["seconds"])
+    for r in done[:5]:
+        print(f"  {r['job']}  {r['seconds'] * 1000:.1f} ms  days={r['num_items']}{' (cached)' if r['cache_hit'] else ''}")
+    print(f"[engine] wrote {args.format} → {outputs[0]}" if len(outputs) == 1
+          else f"[engine] wrote {len(outputs)} {args.format} files → {args.dataset or args.out_dir}")
+    print(f"[engine] batch summary → {summary_path}")
+    if summary["failed"]:
+        raise SystemExit(1)
+
+
 def main() -> None:
     # Load .env from experiments/.env if present
     load_env()
@@ -37,52 +140,122 @@ def main() -> None:
     ensure_dir(args.cache_dir)
     ensure_dir(args.out_dir)
 
+    # Per-(hotel, room type) shards live in their own registry; the engine falls back to the global model
+    model_dir = args.cache_dir
+    if args.shard:
+        from pricing_engine import registry
+        model_dir = registry.shard_dir(args.cache_dir, args.hotel_id, args.room_type)
+
+    feature_store = None
+    if args.feature_store:
+        from pricing_engine.feature_store import get_feature_store
+        feature_store = get_feature_store(args.cache_dir)
+        feature_store.ingest_data_dir(args.hotel_id, args.room_type, args.data_dir)
+
     # Optional: Train ML model
     if args.train_model:
         from pricing_engine.model import MLPriceModel
-        model = MLPriceModel.train_from_data_dir(args.data_dir, args.cache_dir)
+        # None trains from the data files
+        store_data = feature_store.training_data(args.hotel_id, args.room_type) if feature_store is not None else None
+        if args.incremental:
+            if feature_store is not None:
+                raise SystemExit("--incremental updates from the data files; it can't be combined with --feature-store")
+            model, report = MLPriceModel.train_incremental(args.data_dir, model_dir, trainer=args.trainer)
+            print(f"[engine] {report.get('mode')} update: {report.get('reason') or str(report.get('rows_added')) + ' new rows'}")
+        elif args.tune:
+            from pricing_engine.tuning import tune_and_train
+            model, report = tune_and_train(
+                args.data_dir, model_dir, trainer=args.trainer, data=store_data,
+                n_folds=args.tune_folds, workers=args.tune_workers,
+            )
+            if report:
+                folds = ", ".join(f"{f['cutoff']}:{f['mae']:.2f}" if f["mae"] is not None else f"{f['cutoff']}:n/a" for f in report["folds"])
+                print(f"[engine] best params {report['best_params']} cv MAE {report['best_mean_mae']:.2f} ({folds})")
+            elif model is not None:
+                print(f"[engine] tuning skipped ({model.meta['cv']['skipped']}); trained with default params")
+        else:
+            model = MLPriceModel.train_from_data_dir(args.data_dir, model_dir, trainer=args.trainer, data=store_data)
         if model is None:
             print("[engine] training failed or no suitable data found")
         else:
-            print(f"[engine] trained ML model {model.version} and saved to {args.cache_dir}")
-        # If only training was requested, exit here
-        if args.from_date is None or args.to_date is None:
+            print(f"[engine] trained ML model {model.version} and saved to {model_dir}")
+
+    if args.list_models or args.rollback_model:
+        from pricing_engine import registry
+        if args.rollback_model:
+            vid = registry.rollback(model_dir)
+            print(f"[engine] rolled back to model {vid}" if vid else "[engine] no previous model version to roll back to")
+        for v in registry.list_versions(model_dir):
+            print(f"  {'*' if v['active'] else ' '} {v['artifact_id']}  {v['version']}  "
+                  f"{datetime.fromtimestamp(v['created_at']).isoformat(timespec='seconds')}")
+        if not args.shard:
+            for sh in registry.list_shards(args.cache_dir):
+                print(f"  shard hotel={sh['hotel_id']} room={sh['room_type_code']}  active {sh['active']}")
+
+    if args.jobs_file:
+        if args.chunk_days:
+            raise SystemExit("--chunk-days scans a single --from/--to range; it does not apply to --jobs-file")
+        run_batch(args, feature_store)
+        return
+
+    # If only training/model management was requested, exit here
+    if args.from_date is None or args.to_date is None:
+        if args.train_model or args.list_models or args.rollback_model:
             return
+        raise SystemExit("--from and --to are required to score dates")
+
+    ts = datetime.now().strftime("%Y%m%d-%H%M%S")
+    writer = open_output(args, ts)
+    preview: List = []
 
-    items, meta = score_dates(
-        hotel_id=args.hotel_id,
-        room_type_code=args.room_type,
-        from_date=args.from_date,
-        to_date=args.to_date,
-        location=args.location,
-        data_dir=args.data_dir,
-        cache_dir=args.cache_dir,
-        disable_perplexity=args.disable_perplexity,
-        max_perplexity_results=args.max_perplexity_results,
-        force_refresh_perplexity=args.force_refresh_perplexity,
-        disable_ml=args.disable_ml,
-        ml_weight=max(0.0, min(1.0, args.ml_weight)),
-        smoothing_window=max(1, args.smoothing_window),
-    )
+    def _emit(part) -> None:
+        writer.write(part, args.hotel_id)
+        preview.extend(part[: max(0, 6 - len(preview))])
+
+    profiler = cprofile_to(args.profile, top=15) if args.profile else nullcontext()
+    with writer:
+        with profiler:
+            items, meta = score_dates(
+                hotel_id=args.hotel_id,
+                room_type_code=args.room_type,
+                from_date=args.from_date,
+                to_date=args.to_date,
+                location=args.location,
+                data_dir=args.data_dir,
+                cache_dir=args.cache_dir,
+                disable_perplexity=args.disable_perplexity,
+                max_perplexity_results=args.max_perplexity_results,
+                force_refresh_perplexity=args.force_refresh_perplexity,
+                stale_while_revalidate=args.stale_while_revalidate,
+                event_soft_ttl_seconds=args.perplexity_soft_ttl_hours * 3600.0,
+                disable_ml=args.disable_ml,
+                ml_weight=max(0.0, min(1.0, args.ml_weight)),
+                smoothing_window=max(1, args.smoothing_window),
+                feature_store=feature_store,
+                chunk_days=args.chunk_days,
+                on_chunk=_emit if args.chunk_days else None,
+            )
+        # scan mode has already written every chunk
+        if not args.chunk_days:
+            _emit(items)
 
     # Print a preview
     print(f"[engine] scored {meta['num_items']} days "
           f"(hotel_id={meta['hotel_id']} room_type={meta['room_type_code']} location={meta['location']})")
-    for row in items[:5]:
+    for row in preview[:5]:
         print(f"  {row.date}  rec={row.price_rec:.2f}  min={row.price_min:.2f}  max={row.price_max:.2f}  drivers={', '.join(row.drivers)}")
-    if len(items) > 5:
+    if meta["num_items"] > 5:
         print("  ...")
+    if args.profile:
+        print("[engine] stage timings (ms): " + ", ".join(f"{k}={v:.1f}" for k, v in meta.get("timings", {}).items()))
+        print(f"[engine] cProfile stats → {args.profile}")
 
-    # Write CSV
-    ts = datetime.now().strftime("%Y%m%d-%H%M%S")
-    out_path = os.path.join(args.out_dir, f"pricing_{ts}.csv")
-    with open(out_path, "w", newline="", encoding="utf-8") as f:
-        w = csv.writer(f)
-        w.writerow(["date", "room_type_code", "price_rec", "price_min", "price_max", "drivers"])
-        for r in items:
-            w.writerow([r.date, r.room_type_code, f"{r.price_rec:.2f}", f"{r.price_min:.2f}", f"{r.price_max:.2f}", "|".join(r.drivers)])
-
-    print(f"[engine] wrote CSV → {out_path}")
+    if args.chunk_days:
+        print(f"[engine] scan mode: {meta['chunks']} chunks of {meta['chunk_days']} days")
+    for path in output_paths(writer):
+        print(f"[engine] wrote {args.format} → {path}")
+    if meta.get("events_refresh_scheduled"):
+        print("[engine] event cache is stale; refreshing in the background")
     if meta.get("sources"):
         print(f"[engine] perplexity sources ({len(meta['sources'])}):")
         for s in meta["sources"][:5]:
@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+import argparse
+import os
+import time
+
+from pricing_engine.hotels import load_hotel_configs
+from pricing_engine.utils import ensure_dir, load_env
+from pricing_engine.warmup import warm_up
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Warm the data, model, event (and feature store) caches for upcoming dates.")
+    p.add_argument("--days", type=int, default=31, help="Number of days from today to pre-score")
+    p.add_argument("--hotels-file", type=str, default=None, help="JSON list of {hotel_id, location, room_types}")
+    p.add_argument("--data-dir", type=str, default=os.path.abspath(os.path.join(os.getcwd(), "infra/foresight-data")))
+    p.add_argument("--cache-dir", type=str, default=os.path.abspath(os.path.join(os.getcwd(), "experiments/cache")))
+    p.add_argument("--workers", type=int, default=4, help="Parallel scoring jobs")
+    p.add_argument("--refresh-events", action="store_true", help="Force a Perplexity refresh per city (needs API key)")
+    p.add_argument("--disable-ml", action="store_true", help="Skip loading models")
+    p.add_argument("--feature-store", action="store_true", help="Also ingest each room type into <cache-dir>/features.sqlite (as the backend with FORESIGHT_FEATURE_STORE=on)")
+    return p.parse_args()
+
+
+def main() -> None:
+    load_env()
+    args = parse_args()
+    ensure_dir(args.cache_dir)
+    feature_store = None
+    if args.feature_store:
+        from pricing_engine.feature_store import get_feature_store
+        feature_store = get_feature_store(args.cache_dir)
+    t0 = time.perf_counter()
+    summary = warm_up(
+        data_dir=args.data_dir,
+        cache_dir=args.cache_dir,
+        days=args.days,
+        hotels=load_hotel_configs(args.hotels_file),
+        workers=args.workers,
+        refresh_events=args.refresh_events,
+        disable_ml=args.disable_ml,
+        feature_store=feature_store,
+    )
+    stages = ", ".join(f"{k}={v:.2f}s" for k, v in summary["timings"].items())
+    print(f"[warmup] {summary['succeeded']}/{summary['jobs']} jobs for {summary['from']}..{summary['to']} "
+          f"in {time.perf_counter() - t0:.2f}s ({stages})")
+
+
+if __name__ == "__main__":
+    main()